@@ -0,0 +1,106 @@
+"""Compare the single-pass lesson parser with the previous BeautifulSoup implementation.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parser [fixture.html ...] [--rounds N]
+"""
+
+import argparse
+import os
+import statistics
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable
+
+from bs4 import BeautifulSoup
+
+from src.config import BLOCK_HOURS, LOCATION
+from src.models.lesson import Lesson
+from src.scraper.lesson_parser import parse_lesson_date, parse_lessons
+from src.scraper.scheduler_scraper import extract_lessons_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+DEFAULT_FIXTURE = os.path.join(FIXTURES_DIR, "planzajec_semester.html")
+
+
+def parse_page_soup(html: str) -> list[dict[str, Any]]:
+    """Reference implementation: the per-lesson find() loop the scraper used before."""
+    soup = BeautifulSoup(html, "html.parser")
+    schedule_data: list[dict[str, Any]] = []
+    lessons = soup.find("div", class_="lessons hidden")
+    for lesson in lessons.find_all("div", class_="lesson"):
+        lesson_date = datetime.strptime(lesson.find("span", class_="date").text, "%Y_%m_%d")
+        block_id = lesson.find("span", class_="block_id").text
+        name = lesson.find("span", class_="name").text.replace("<br>", " ").strip()
+        info = lesson.find("span", class_="info").text
+        block_time = BLOCK_HOURS.get(block_id, {})
+        schedule_data.append(
+            {
+                "Subject": name,
+                "Start Date": lesson_date.strftime("%d/%m/%Y"),
+                "Start Time": block_time.get("START", ""),
+                "End Date": lesson_date.strftime("%d/%m/%Y"),
+                "End Time": block_time.get("END", ""),
+                "All Day Event": False,
+                "Description": info,
+                "Location": LOCATION,
+                "Private": True,
+            }
+        )
+    return schedule_data
+
+
+def parse_page_fast(html: str) -> list[Lesson]:
+    data, error = parse_lessons(extract_lessons_html(html) or "")
+    if error:
+        raise ValueError(error)
+    return data
+
+
+def measure(parse: Callable[[str], list[Any]], html: str, rounds: int) -> dict[str, float]:
+    timings: list[float] = []
+    for _ in range(rounds):
+        parse_lesson_date.cache_clear()
+        started = time.perf_counter()
+        parse(html)
+        timings.append(time.perf_counter() - started)
+
+    parse_lesson_date.cache_clear()
+    tracemalloc.start()
+    parse(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_ms": statistics.median(timings) * 1000,
+        "p95_ms": sorted(timings)[int(len(timings) * 0.95) - 1] * 1000 if len(timings) > 1 else timings[0] * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", nargs="*", default=[DEFAULT_FIXTURE])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    for path in args.fixtures:
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+
+        expected = parse_page_soup(html)
+        if [lesson.to_dict() for lesson in parse_page_fast(html)] != expected:
+            raise SystemExit(f"{path}: parsers disagree")
+
+        print(f"{os.path.basename(path)}: {len(html) / 1024:.1f} KiB, {len(expected)} lessons")
+        for name, parse in (("beautifulsoup", parse_page_soup), ("single-pass", parse_page_fast)):
+            stats = measure(parse, html, args.rounds)
+            print(
+                f"  {name:<14} median {stats['median_ms']:8.2f} ms  "
+                f"p95 {stats['p95_ms']:8.2f} ms  peak alloc {stats['peak_kib']:9.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Offline end-to-end benchmark: parse throughput, scrape latency and Calendar sync cost.
+
+Everything runs against local fakes: recorded pages from ``benchmarks/fixtures``
+served by a stand-in WAT server, and an in-memory Calendar v3 API (batch endpoint
+included) with configurable latency and 429 injection. No network access or
+Google account is needed, so it can run in CI:
+
+    python -m benchmarks.bench_pipeline [--rate-limit 0.05] [--json out.json] [--baseline base.json]
+
+With ``--baseline`` the run fails (exit code 1) when an API call count grows or a
+latency regresses by more than ``--tolerance`` compared to a previous ``--json`` output.
+"""
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, replace
+from typing import Any
+
+from benchmarks.fake_wat import FakeWatServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+FIXTURES = ("planzajec_empty.html", "planzajec_week.html", "planzajec_semester.html")
+GROUP = "BENCH1"
+
+# Keys whose growth is a regression regardless of --tolerance.
+CALL_KEYS = ("http_requests", "batches", "sub_requests", "wat_requests")
+
+
+def _read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def _configure_environment(wat: FakeWatServer, storage_dir: str) -> None:
+    """Point the application at the fakes. Must run before anything from ``src`` is imported."""
+    os.environ["WAT_BASE_URL"] = wat.base_url
+    os.environ.setdefault("STORAGE_DIR", storage_dir)
+    os.environ.setdefault("CALENDAR_BACKOFF_BASE_SECONDS", "0.01")
+    os.environ.setdefault("CALENDAR_BACKOFF_MAX_SECONDS", "0.2")
+    os.environ.setdefault("SCRAPER_BACKOFF_BASE_SECONDS", "0.01")
+
+
+def bench_parse(rounds: int) -> dict[str, Any]:
+    from benchmarks.bench_parser import parse_page_fast
+    from src.scraper.lesson_parser import parse_lesson_date
+
+    results: dict[str, Any] = {}
+    for name in FIXTURES[1:]:
+        html = _read_fixture(name)
+        timings: list[float] = []
+        lessons = 0
+        for _ in range(rounds):
+            parse_lesson_date.cache_clear()
+            started = time.perf_counter()
+            lessons = len(parse_page_fast(html))
+            timings.append(time.perf_counter() - started)
+        median = statistics.median(timings)
+        results[name] = {
+            "lessons": lessons,
+            "median_seconds": median,
+            "lessons_per_second": lessons / median,
+            "mib_per_second": len(html.encode("utf-8")) / median / 2**20,
+        }
+    return results
+
+
+def bench_scrape(wat: FakeWatServer, storage_dir: str) -> dict[str, Any]:
+    from src.scraper.html_cache import DiskHtmlCache
+    from src.scraper.http_client import ScraperClient
+    from src.scraper.scheduler_scraper import scrape_schedule_changes
+
+    client = ScraperClient(min_host_interval=0)
+    cache = DiskHtmlCache(os.path.join(storage_dir, "bench_cache"), ttl_seconds=3600, max_entries=64)
+    results: dict[str, Any] = {}
+    for label in ("cold", "conditional"):
+        before = wat.stats()["requests"]
+        started = time.perf_counter()
+        data, error, changed = scrape_schedule_changes(GROUP, "bench", cache=cache, client=client)
+        if error:
+            raise SystemExit(f"Scrape failed: {error}")
+        results[label] = {
+            "seconds": time.perf_counter() - started,
+            "lessons": len(data),
+            "changed": changed,
+            "wat_requests": wat.stats()["requests"] - before,
+        }
+    results["not_modified_responses"] = wat.stats()["not_modified"]
+    return results
+
+
+def bench_sync(latency: float, rate_limit: float, seed: int) -> dict[str, Any]:
+    from benchmarks.bench_parser import parse_page_fast
+    from benchmarks.fake_calendar import FakeCalendarServer
+    from src.google_api.update_google_calendar import update_calendar_with_schedule
+
+    lessons = parse_page_fast(_read_fixture("planzajec_semester.html"))
+    window = (min(lesson.day for lesson in lessons), max(lesson.day for lesson in lessons))
+    edited = [
+        replace(lesson, description=f"{lesson.description} (changed)") if index % 10 == 0 else lesson
+        for index, lesson in enumerate(lessons)
+        if index % 20 != 1
+    ]
+
+    fake = FakeCalendarServer(latency=latency, rate_limit_ratio=rate_limit, seed=seed).start()
+    service = fake.service()
+    results: dict[str, Any] = {}
+    try:
+        for label, data in (("initial", lessons), ("unchanged", lessons), ("edited", edited)):
+            fake.reset_calls()
+            started = time.perf_counter()
+            result = update_calendar_with_schedule(service, data, GROUP, window)
+            seconds = time.perf_counter() - started
+            if result is None:
+                raise SystemExit(f"Sync '{label}' failed")
+            results[label] = {"seconds": seconds, "result": asdict(result), **fake.stats()}
+    finally:
+        fake.stop()
+    return results
+
+
+def _flatten(report: dict[str, Any], prefix: str = "") -> dict[str, float]:
+    flat: dict[str, float] = {}
+    for key, value in report.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{path}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+
+def compare(report: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Regressions of ``report`` against ``baseline``: more API calls, or slower beyond ``tolerance``."""
+    current, previous = _flatten(report), _flatten(baseline)
+    regressions: list[str] = []
+    for path, old in previous.items():
+        new = current.get(path)
+        if new is None:
+            continue
+        name = path.rsplit(".", 1)[-1]
+        if name in CALL_KEYS and new > old:
+            regressions.append(f"{path}: {old:g} -> {new:g} calls")
+        elif name.endswith("seconds") and not name.startswith("median") and new > old * (1 + tolerance):
+            regressions.append(f"{path}: {old:.3f}s -> {new:.3f}s")
+        elif name.endswith("per_second") and new < old / (1 + tolerance):
+            regressions.append(f"{path}: {old:.1f} -> {new:.1f}/s")
+    return regressions
+
+
+def print_report(report: dict[str, Any]) -> None:
+    print("Parse throughput")
+    for name, stats in report["parse"].items():
+        print(
+            f"  {name:<26} {stats['lessons']:4d} lessons  {stats['median_seconds'] * 1000:7.2f} ms  "
+            f"{stats['lessons_per_second']:9.0f} lessons/s  {stats['mib_per_second']:6.2f} MiB/s"
+        )
+    print("Scrape (fake WAT server)")
+    for label in ("cold", "conditional"):
+        stats = report["scrape"][label]
+        print(
+            f"  {label:<12} {stats['seconds'] * 1000:8.1f} ms  {stats['lessons']} lessons  "
+            f"changed={stats['changed']}  requests={stats['wat_requests']}"
+        )
+    print("Calendar sync (fake Calendar API)")
+    for label, stats in report["sync"].items():
+        result = stats["result"]
+        print(
+            f"  {label:<10} {stats['seconds'] * 1000:8.1f} ms  http={stats.get('http_requests', 0)} "
+            f"batches={stats.get('batches', 0)} sub-requests={stats.get('sub_requests', 0)} "
+            f"429s={stats.get('rate_limited', 0)}  inserted={result['inserted']} patched={result['patched']} "
+            f"deleted={result['deleted']} unchanged={result['unchanged']} failed={result['failed']}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20, help="parse rounds per fixture")
+    parser.add_argument("--wat-latency", type=float, default=0.05, help="seconds added to every fake WAT response")
+    parser.add_argument("--api-latency", type=float, default=0.02, help="seconds added to every fake Calendar call")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of batched sub-requests answered with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="fail on regressions against this earlier --json report")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed relative slowdown against the baseline")
+    args = parser.parse_args()
+
+    storage_dir = tempfile.mkdtemp(prefix="wat-bench-")
+    wat = FakeWatServer({GROUP: _read_fixture("planzajec_semester.html")}, latency=args.wat_latency)
+    _configure_environment(wat, storage_dir)
+    wat.start()
+    from src.utils.custom_logger import google_api_logger, main_logger, scheduler_logger
+
+    for logger in (main_logger, scheduler_logger, google_api_logger):
+        logger.setLevel(logging.WARNING)
+
+    try:
+        report = {
+            "parse": bench_parse(args.rounds),
+            "scrape": bench_scrape(wat, storage_dir),
+            "sync": bench_sync(args.api_latency, args.rate_limit, args.seed),
+        }
+    finally:
+        wat.stop()
+
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("No regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
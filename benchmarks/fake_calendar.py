@@ -0,0 +1,243 @@
+"""Local fake of the Calendar v3 API, including the batch endpoint, for offline benchmarks."""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import httplib2
+import pytz
+from googleapiclient.discovery import Resource, build_from_document
+from googleapiclient.discovery_cache import get_static_doc
+
+from src.config import TIMEZONE
+
+_LOCAL_TZ = pytz.timezone(TIMEZONE)
+
+Reply = tuple[int, Any]
+
+
+def _rate_limited() -> Reply:
+    return 429, {"error": {"code": 429, "message": "Rate Limit Exceeded", "errors": [{"reason": "rateLimitExceeded"}]}}
+
+
+def _not_found() -> Reply:
+    return 404, {"error": {"code": 404, "message": "Not Found", "errors": [{"reason": "notFound"}]}}
+
+
+def _event_start(event: dict[str, Any]) -> datetime:
+    start = event["start"]["dateTime"]
+    moment = datetime.fromisoformat(start)
+    if moment.tzinfo is None:
+        moment = pytz.timezone(event["start"].get("timeZone", TIMEZONE)).localize(moment)
+    return moment
+
+
+class FakeCalendarServer:
+    """In-memory Calendar API served over HTTP.
+
+    Supports the calls the sync makes (calendarList.list, calendars.insert/delete,
+    events.list/insert/patch/delete) both directly and through ``/batch/calendar/v3``.
+    Every batch waits ``latency`` seconds; each batched sub-request fails with 429
+    with probability ``rate_limit_ratio`` (seeded, so runs are reproducible).
+    """
+
+    def __init__(self, latency: float = 0.0, rate_limit_ratio: float = 0.0, seed: int = 0) -> None:
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.calendars: dict[str, dict[str, Any]] = {}
+        self.events: dict[str, dict[str, dict[str, Any]]] = {}
+        self.calls: Counter[str] = Counter()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-calendar", daemon=True)
+
+    @property
+    def root_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FakeCalendarServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def service(self) -> Resource:
+        """A real ``googleapiclient`` Calendar resource whose requests (batches included) hit this server."""
+        document = json.loads(get_static_doc("calendar", "v3"))
+        document["rootUrl"] = self.root_url
+        document["baseUrl"] = f"{self.root_url}{document['servicePath']}"
+        return build_from_document(document, http=httplib2.Http(timeout=30))
+
+    def reset_calls(self) -> None:
+        with self._lock:
+            self.calls.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self.calls)
+
+    # --- API -------------------------------------------------------------------------------------
+
+    def dispatch(self, method: str, path: str, body: bytes, batched: bool) -> Reply:
+        url = urlsplit(path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        payload = json.loads(body) if body else {}
+        if parts[:2] != ["calendar", "v3"]:
+            return _not_found()
+        parts = parts[2:]
+
+        with self._lock:
+            self.calls["sub_requests" if batched else "direct_requests"] += 1
+            if batched and self.rate_limit_ratio and self._random.random() < self.rate_limit_ratio:
+                self.calls["rate_limited"] += 1
+                return _rate_limited()
+
+            if parts == ["users", "me", "calendarList"] and method == "GET":
+                self.calls["calendarList.list"] += 1
+                entries = [{"id": cid, "summary": c["summary"]} for cid, c in self.calendars.items()]
+                offset = int(query.get("pageToken", "0"))
+                page_size = int(query.get("maxResults", "100"))
+                response: dict[str, Any] = {"items": entries[offset : offset + page_size]}
+                if offset + page_size < len(entries):
+                    response["nextPageToken"] = str(offset + page_size)
+                return 200, response
+            if parts == ["calendars"] and method == "POST":
+                self.calls["calendars.insert"] += 1
+                calendar_id = f"{uuid.uuid4().hex}@group.calendar.fake"
+                self.calendars[calendar_id] = {"id": calendar_id, **payload}
+                self.events[calendar_id] = {}
+                return 200, self.calendars[calendar_id]
+            if len(parts) == 2 and parts[0] == "calendars" and method == "DELETE":
+                self.calls["calendars.delete"] += 1
+                if self.calendars.pop(parts[1], None) is None:
+                    return _not_found()
+                self.events.pop(parts[1], None)
+                return 204, None
+            if len(parts) >= 3 and parts[0] == "calendars" and parts[2] == "events":
+                events = self.events.get(parts[1])
+                if events is None:
+                    return _not_found()
+                event_id = parts[3] if len(parts) > 3 else None
+                return self._events(method, events, event_id, query, payload)
+        return _not_found()
+
+    def _events(
+        self,
+        method: str,
+        events: dict[str, dict[str, Any]],
+        event_id: str | None,
+        query: dict[str, str],
+        payload: dict[str, Any],
+    ) -> Reply:
+        if event_id is None and method == "GET":
+            self.calls["events.list"] += 1
+            time_min = datetime.fromisoformat(query["timeMin"]) if "timeMin" in query else None
+            time_max = datetime.fromisoformat(query["timeMax"]) if "timeMax" in query else None
+            matching = [
+                event
+                for event in events.values()
+                if (time_min is None or _event_start(event) >= time_min)
+                and (time_max is None or _event_start(event) < time_max)
+            ]
+            offset = int(query.get("pageToken", "0"))
+            page_size = int(query.get("maxResults", "250"))
+            page = matching[offset : offset + page_size]
+            response: dict[str, Any] = {"items": page}
+            if offset + page_size < len(matching):
+                response["nextPageToken"] = str(offset + page_size)
+            return 200, response
+        if event_id is None and method == "POST":
+            self.calls["events.insert"] += 1
+            event = {"id": uuid.uuid4().hex, **payload}
+            events[event["id"]] = event
+            return 200, event
+        if event_id is not None and event_id not in events:
+            return _not_found()
+        if method == "PATCH":
+            self.calls["events.patch"] += 1
+            events[event_id].update(payload)
+            return 200, events[event_id]
+        if method == "DELETE":
+            self.calls["events.delete"] += 1
+            del events[event_id]
+            return 204, None
+        return _not_found()
+
+    # --- HTTP ------------------------------------------------------------------------------------
+
+    def _batch(self, content_type: str, body: bytes) -> tuple[str, bytes]:
+        message = BytesParser().parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        boundary = uuid.uuid4().hex
+        chunks: list[bytes] = []
+        for part in message.get_payload():
+            content_id = part["Content-ID"].strip("<>")
+            raw = part.get_payload(decode=True)
+            # The client serializes sub-requests with bare "\n" line endings; accept both.
+            head, *rest = re.split(rb"\r?\n\r?\n", raw, maxsplit=1)
+            sub_body = rest[0] if rest else b""
+            request_line = re.split(rb"\r?\n", head, maxsplit=1)[0].decode()
+            method, path, _ = request_line.split(" ", 2)
+            status, reply = self.dispatch(method, path, sub_body, batched=True)
+            reply_body = json.dumps(reply).encode() if reply is not None else b""
+            chunks.append(
+                f"--{boundary}\r\nContent-Type: application/http\r\nContent-ID: <response-{content_id}>\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\nContent-Length: {len(reply_body)}\r\n\r\n".encode()
+                + reply_body
+                + b"\r\n"
+            )
+        chunks.append(f"--{boundary}--\r\n".encode())
+        return f"multipart/mixed; boundary={boundary}", b"".join(chunks)
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def _handle(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                with fake._lock:
+                    fake.calls["http_requests"] += 1
+                if self.path.startswith("/batch/calendar/v3"):
+                    with fake._lock:
+                        fake.calls["batches"] += 1
+                    if fake.latency:
+                        time.sleep(fake.latency)
+                    content_type, reply_body = fake._batch(self.headers["Content-Type"], body)
+                    self._send(200, content_type, reply_body)
+                    return
+                if fake.latency:
+                    time.sleep(fake.latency)
+                status, reply = fake.dispatch(self.command, self.path, body, batched=False)
+                self._send(status, "application/json; charset=UTF-8", json.dumps(reply).encode() if reply else b"")
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+            def _send(self, status: int, content_type: str, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
@@ -0,0 +1,84 @@
+"""Local stand-in for planzajec.wcy.wat.edu.pl serving recorded fixture pages."""
+
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+
+class FakeWatServer:
+    """Serves ``/pl/rozklad?date=...&grupa_id=...`` from fixture pages, with ETag/304 support.
+
+    ``pages`` maps a group id to its HTML; unknown groups get ``default_page``.
+    ``latency`` seconds are added to every response to mimic the real site.
+    """
+
+    def __init__(self, pages: dict[str, str], default_page: str | None = None, latency: float = 0.0) -> None:
+        self.pages = pages
+        self.default_page = default_page
+        self.latency = latency
+        self.requests = 0
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-wat", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeWatServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"requests": self.requests, "not_modified": self.not_modified}
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                with fake._lock:
+                    fake.requests += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                url = urlsplit(self.path)
+                group = parse_qs(url.query).get("grupa_id", [""])[0]
+                page = fake.pages.get(group, fake.default_page)
+                if url.path != "/pl/rozklad" or page is None:
+                    self._send(404, b"Not found")
+                    return
+
+                body = page.encode("utf-8")
+                etag = f'"{hashlib.sha1(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    with fake._lock:
+                        fake.not_modified += 1
+                    self._send(304, b"", {"ETag": etag})
+                    return
+                self._send(200, body, {"ETag": etag, "Content-Type": "text/html; charset=utf-8"})
+
+            def _send(self, status: int, body: bytes, headers: dict[str, str] | None = None) -> None:
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
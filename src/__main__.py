@@ -0,0 +1,171 @@
+"""Command-line entry point: ``python -m src <command> ...``, without the web server or the scheduler."""
+
+import argparse
+import json
+import sys
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+from src.config import CALENDAR_NAME_TEMPLATE, FANOUT_MAX_WORKERS
+from src.export import iter_csv, iter_ics
+from src.jobs.fanout import GroupResult, RunSummary, plan_group, run_groups
+from src.scraper.range_scraper import semester_range
+
+EXPORT_FORMATS = ("json", "csv", "ics")
+
+
+def _iso_date(value: str) -> date:
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, expected YYYY-MM-DD") from None
+
+
+def _date_range(args: argparse.Namespace) -> tuple[date, date] | None:
+    """The range selected by ``--range`` or ``--start``/``--end``; raises ValueError for an invalid one."""
+    if args.range == "semester":
+        return semester_range()
+    if not args.start and not args.end:
+        return None
+    if not args.start or not args.end:
+        raise ValueError("--start and --end must be given together")
+    if args.start > args.end:
+        raise ValueError("--start must not be after --end")
+    return args.start, args.end
+
+
+def _print_plan(result: GroupResult) -> None:
+    if not result.ok:
+        print(f"{result.group}: failed: {result.error}")
+        return
+    print(f"{result.group}: {len(result.lessons or [])} lessons scraped in {result.scrape_seconds:.2f}s")
+    if not result.previews:
+        print("  every calendar is up to date")
+    for user_id, plan in result.previews.items():
+        if plan is None:
+            print(f"  {user_id}: no plan (no schedule, no token or the Calendar API failed)")
+            continue
+        counts, cost = plan.counts(), plan.cost
+        print(
+            f"  {user_id}: {counts['insert']} insert, {counts['patch']} patch, {counts['delete']} delete, "
+            f"{plan.unchanged} unchanged"
+            + (", calendar to create" if counts["create_calendar"] else "")
+        )
+        print(
+            f"    {cost.http_requests} HTTP requests ({cost.read_requests} reads, {cost.batches} batches), "
+            f"{cost.quota_units} quota units, ~{cost.expected_seconds:.1f}s"
+        )
+        for operation in plan.operations:
+            if operation["op"] != "create_calendar":
+                label = operation.get("summary", operation["key"])
+                print(f"    {operation['op']:<6} {operation.get('start', ''):<25} {label}")
+
+
+def plan(args: argparse.Namespace) -> int:
+    results = [plan_group(group, date_range=args.date_range) for group in args.groups]
+    if args.json:
+        json.dump([result.as_dict() for result in results], sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    else:
+        for result in results:
+            _print_plan(result)
+    return 0 if all(result.ok for result in results) else 1
+
+
+def _write_export(result: GroupResult, export_format: str, output_dir: Path, stamp: datetime) -> Path:
+    path = output_dir / f"{result.group}.{export_format}"
+    lessons = result.lessons or []
+    if export_format == "ics":
+        with path.open("wb") as file:
+            file.writelines(iter_ics(CALENDAR_NAME_TEMPLATE.format(group=result.group), lessons, stamp))
+    elif export_format == "csv":
+        # newline="": the csv module writes its own CRLF line endings.
+        with path.open("w", encoding="utf-8", newline="") as file:
+            file.writelines(iter_csv(lessons))
+    else:
+        with path.open("w", encoding="utf-8") as file:
+            json.dump([lesson.to_dict() for lesson in lessons], file, ensure_ascii=False, indent=2)
+    return path
+
+
+def _print_report(summary: RunSummary) -> None:
+    """Per-group timings and the run totals, on stderr so that stdout stays machine-readable."""
+    for result in sorted(summary.results, key=lambda result: result.group):
+        status = f"stale: {result.stale_reason}" if result.stale else "ok" if result.ok else f"failed: {result.error}"
+        print(
+            f"{result.group:<16} {len(result.lessons or []):>5} lessons  scrape {result.scrape_seconds:6.2f}s  "
+            f"sync {result.sync_seconds:6.2f}s  {status}",
+            file=sys.stderr,
+        )
+    print(
+        f"{summary.succeeded}/{len(summary.results)} groups, {summary.lessons} lessons in {summary.wall_seconds:.2f}s "
+        f"({summary.groups_per_second:.2f} groups/s), scraper client: {summary.client_stats}",
+        file=sys.stderr,
+    )
+
+
+def export(args: argparse.Namespace) -> int:
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary = run_groups(
+        args.groups, "Automated Scheduler Bot", sync=args.sync, max_workers=args.workers, date_range=args.date_range
+    )
+    stamp = datetime.now(timezone.utc)
+    for result in summary.results:
+        if result.ok:
+            path = _write_export(result, args.format, output_dir, stamp)
+            print(path)
+    if args.report == "json":
+        json.dump(summary.as_dict(), sys.stderr, ensure_ascii=False, indent=2)
+        print(file=sys.stderr)
+    else:
+        _print_report(summary)
+    return 0 if not summary.failed and not summary.stale else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src", description="WAT Scheduler command line.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    groups = argparse.ArgumentParser(add_help=False)
+    groups.add_argument("groups", nargs="+", metavar="GROUP")
+    groups.add_argument("--range", choices=["semester"], help="Every week of the current semester.")
+    groups.add_argument("--start", type=_iso_date, help="First day of a custom range (YYYY-MM-DD, requires --end).")
+    groups.add_argument("--end", type=_iso_date, help="Last day of a custom range (YYYY-MM-DD, requires --start).")
+
+    plan_parser = commands.add_parser(
+        "plan",
+        parents=[groups],
+        help="Scrape groups and show what the calendar sync would change, without changing anything.",
+    )
+    plan_parser.add_argument("--json", action="store_true", help="Print the full plans as JSON.")
+    plan_parser.set_defaults(func=plan)
+
+    export_parser = commands.add_parser(
+        "export",
+        parents=[groups],
+        help="Scrape groups in parallel, write one file per group and print a timing report.",
+    )
+    export_parser.add_argument("--format", choices=EXPORT_FORMATS, default="json", help="Export format.")
+    export_parser.add_argument("--output-dir", default=".", help="Directory for the <GROUP>.<format> files.")
+    export_parser.add_argument("--sync", action="store_true", help="Also sync each group to its calendars.")
+    export_parser.add_argument(
+        "--workers", type=int, default=FANOUT_MAX_WORKERS, help="Groups scraped (and synced) concurrently."
+    )
+    export_parser.add_argument("--report", choices=["text", "json"], default="text", help="Timing report format.")
+    export_parser.set_defaults(func=export)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        args.date_range = _date_range(args)
+    except ValueError as e:
+        parser.error(str(e))
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,30 +1,54 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import contextvars
 import json
 import os
-import sys
-from typing import Any
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Any, Callable
 
-from apscheduler.schedulers.background import BackgroundScheduler
 from flasgger import Swagger
 from flask import Flask, Response, jsonify, redirect, request, session
-from google_auth_oauthlib.flow import Flow
 from werkzeug import run_simple
 
 from src.config import (
+    BLOCK_HOURS,
+    CALENDAR_NAME_TEMPLATE,
     CREDENTIALS_PATH,
-    DEFAULT_GROUP,
+    DEFAULT_USER,
+    ICAL_MAX_AGE_SECONDS,
+    NDJSON_QUEUE_SIZE,
+    POLL_MAX_GROUPS_PER_TICK,
+    POLL_TICK_MINUTES,
     REDIRECT_URI,
-    SCHEDULE_INTERVAL_HOURS,
+    SCHEDULE_GROUPS,
+    SCHEDULE_RANGE,
+    SCHEDULE_RUN_ON_STARTUP,
+    SCHEDULER_LOCK_PATH,
+    SCHEDULER_LOCK_RETRY_SECONDS,
     SCOPES,
+    SCRAPE_RESULT_TTL_SECONDS,
     TOKEN_PATH,
 )
-from src.google_api.update_google_calendar import main as update_google_calendar
-from src.scraper.scheduler_scraper import scrape_schedule
+from src.export.ical import feed_etag, ics_cache, iter_ics
+from src.jobs.fanout import plan_group, process_group, run_groups
+from src.jobs.job_queue import Job, job_queue
+from src.jobs.poll_planner import poll_planner
+from src.scraper.lesson_parser import NO_LESSONS_ERROR
+from src.scraper.range_scraper import semester_range
+from src.store.lesson_index import lesson_index, week_range
+from src.store.snapshot_store import snapshot_store
+from src.store.subscription_store import subscription_store
 from src.utils.custom_logger import main_logger as logger
+from src.utils.metrics import app_startup_seconds, registry, scheduler_leader
+from src.utils.process_lock import ProcessLock
+from src.utils.progress import ProgressChannel, progress_sink
 
-print(f"Python path: {sys.path}")
-print(f"Current working directory: {os.getcwd()}")
-print(f"Contents of current directory: {os.listdir('.')}")
-print(f"Contents of /app directory: {os.listdir('/app')}")
+if TYPE_CHECKING:
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from google_auth_oauthlib.flow import Flow
 
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "change-me")
@@ -60,6 +84,120 @@ swagger_template: dict[str, Any] = {
                 "error": {"type": "string", "example": "Internal server error"}
             },
         },
+        "Job": {
+            "type": "object",
+            "properties": {
+                "id": {"type": "string", "example": "3f2a9c0e5b7d4e1f8a6b2c9d0e1f2a3b"},
+                "kind": {"type": "string", "example": "scrape"},
+                "key": {"type": "string", "example": "scrape:WCY25IX1S4"},
+                "status": {"type": "string", "enum": ["queued", "running", "succeeded", "failed"]},
+                "created_at": {"type": "number"},
+                "started_at": {"type": "number"},
+                "finished_at": {"type": "number"},
+                "queue_seconds": {"type": "number"},
+                "run_seconds": {"type": "number"},
+                "result": {"type": "object"},
+                "error": {"type": "string"},
+            },
+        },
+        "Schedule": {
+            "type": "object",
+            "properties": {
+                "group": {"type": "string", "example": "WCY25IX1S4"},
+                "scraped_at": {"type": "string", "example": "2024-10-01T06:00:00+00:00"},
+                "lessons": {
+                    "type": "array",
+                    "items": {
+                        "allOf": [
+                            {"$ref": "#/definitions/Lesson"},
+                            {
+                                "type": "object",
+                                "properties": {
+                                    "key": {"type": "string", "example": "2024-10-01|block1|Matematyka"},
+                                    "first_seen": {"type": "string"},
+                                    "last_seen": {"type": "string"},
+                                },
+                            },
+                        ]
+                    },
+                },
+            },
+        },
+        "ScheduleChanges": {
+            "type": "object",
+            "properties": {
+                "group": {"type": "string", "example": "WCY25IX1S4"},
+                "since": {"type": "number", "description": "Unix time the changes are newer than."},
+                "next_since": {"type": "number", "description": "Pass as since on the next poll."},
+                "changes": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "id": {"type": "integer"},
+                            "key": {"type": "string"},
+                            "change": {"type": "string", "enum": ["added", "updated", "removed"]},
+                            "at": {"type": "string"},
+                            "lesson": {"$ref": "#/definitions/Lesson"},
+                        },
+                    },
+                },
+            },
+        },
+        "GroupLessons": {
+            "type": "object",
+            "properties": {
+                "group": {"type": "string", "example": "WCY25IX1S4"},
+                "scraped_at": {"type": "string", "example": "2024-10-01T06:00:00+00:00"},
+                "lessons": {"type": "array", "items": {"$ref": "#/definitions/Lesson"}},
+            },
+        },
+        "FreeBlocks": {
+            "type": "object",
+            "properties": {
+                "group": {"type": "string", "example": "WCY25IX1S4"},
+                "days": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "date": {"type": "string", "example": "2024-10-01"},
+                            "free": {
+                                "type": "array",
+                                "items": {
+                                    "type": "object",
+                                    "properties": {
+                                        "block": {"type": "string", "example": "block3"},
+                                        "start": {"type": "string", "example": "11:40"},
+                                        "end": {"type": "string", "example": "13:15"},
+                                    },
+                                },
+                            },
+                        },
+                    },
+                },
+            },
+        },
+        "Subscriptions": {
+            "type": "object",
+            "properties": {
+                "user": {"type": "string", "example": "alice"},
+                "groups": {"type": "array", "items": {"type": "string"}, "example": ["WCY25IX1S4"]},
+            },
+        },
+        "PollState": {
+            "type": "object",
+            "properties": {
+                "group": {"type": "string", "example": "WCY25IX1S4"},
+                "change_rate": {"type": "number", "example": 0.3},
+                "interval_hours": {"type": "number", "example": 18.5},
+                "checks": {"type": "integer"},
+                "changes": {"type": "integer"},
+                "checked_at": {"type": "number", "description": "Unix time of the last scheduled check."},
+                "changed_at": {"type": "number", "description": "Unix time a check last found a change."},
+                "next_run_at": {"type": "number", "description": "Unix time of the next scheduled check."},
+            },
+        },
         "Message": {
             "type": "object",
             "properties": {
@@ -90,36 +228,122 @@ def _ensure_credentials_file() -> None:
         json.dump(credentials, f)
 
 
-_ensure_credentials_file()
+def _oauth_flow(**kwargs: Any) -> "Flow":
+    from google_auth_oauthlib.flow import Flow
 
+    _ensure_credentials_file()
+    with open(CREDENTIALS_PATH, "r") as f:
+        client_config = json.load(f)
+    return Flow.from_client_config(client_config, scopes=SCOPES, redirect_uri=REDIRECT_URI, **kwargs)
 
-def scheduled_job() -> None:
-    logger.info("Starting scheduled job")
-    user_agent = "Automated Scheduler Bot"
 
-    logger.info(f"Scraping schedule for group: {DEFAULT_GROUP}")
-    data, error = scrape_schedule(DEFAULT_GROUP, user_agent)
-    if error:
-        logger.error(f"Error from scrape_schedule: {error}")
+def _bound_account(user_id: str) -> str | None:
+    """Google account ``user_id`` belongs to; a token stored before accounts were bound is asked for its own."""
+    from src.google_api.calendar_service import calendar_accounts, google_account
+
+    account = subscription_store.google_account(user_id)
+    if account is None and calendar_accounts.has_token(user_id):
+        creds = calendar_accounts.manager(user_id).credentials()
+        if creds is None:
+            return None
+        try:
+            account = google_account(creds)
+        except Exception as e:
+            logger.warning(f"Could not identify the Google account of {user_id}: {e}")
+            return None
+        subscription_store.bind_account(user_id, account)
+    return account
+
+
+def _session_user_error(user_id: str) -> tuple[Response, int] | None:
+    """403 unless this session completed the OAuth flow for ``user_id``; None when it did."""
+    if session.get("user_id") == user_id:
+        return None
+    return jsonify({"error": f"Not signed in as {user_id}, authorize through /login?user={user_id} first"}), 403
+
+
+def _scheduled_range() -> tuple[date, date] | None:
+    return semester_range() if SCHEDULE_RANGE == "semester" else None
+
+
+def scheduled_groups() -> list[str]:
+    """``SCHEDULE_GROUPS`` plus every group somebody is subscribed to, each scraped once per run."""
+    return list(dict.fromkeys(SCHEDULE_GROUPS + subscription_store.groups()))
+
+
+def scheduled_job() -> None:
+    """Scrape the groups that are due according to their adaptive polling interval."""
+    groups = poll_planner.due(scheduled_groups(), limit=POLL_MAX_GROUPS_PER_TICK)
+    if not groups:
         return
+    logger.info(f"Starting scheduled job for groups: {', '.join(groups)}")
+    date_range = _scheduled_range()
+    summary = run_groups(groups, user_agent="Automated Scheduler Bot", date_range=date_range)
+    for result in summary.results:
+        if result.error == NO_LESSONS_ERROR:
+            # A week without lessons (e.g. a break) is an empty plan: while it stays empty the interval grows.
+            lessons = []
+        elif result.ok and not result.stale:
+            lessons = result.lessons
+        else:
+            # A failed or stale scrape learned nothing: the planner retries it at the minimum interval.
+            lessons = None
+        poll_planner.observe(result.group, lessons, date_range)
+    logger.info(f"Job completed: {summary.succeeded} succeeded, {summary.failed} failed")
+
 
-    logger.info("Successfully scraped schedule")
-    logger.info(f"Scraped data: {data[:2] if data else 'No data'}...")
+scheduler_lock = ProcessLock(SCHEDULER_LOCK_PATH)
+scheduler: "BackgroundScheduler | None" = None
+_startup_lock = threading.Lock()
 
-    logger.info("Updating Google Calendar")
-    update_google_calendar(data)
-    logger.info("Job completed")
 
+def _wait_for_scheduler_lock() -> None:
+    # Take over when the process holding the lock exits (e.g. a recycled gunicorn worker).
+    while not scheduler_lock.try_acquire():
+        time.sleep(SCHEDULER_LOCK_RETRY_SECONDS)
+    _start_scheduler()
 
-scheduler = BackgroundScheduler()
-scheduler.add_job(func=scheduled_job, trigger="interval", hours=SCHEDULE_INTERVAL_HOURS)
-scheduler.start()
-logger.info("Scheduler started")
+
+def _start_scheduler() -> None:
+    """Start the scheduler in the one process holding the scheduler lock; other workers only serve requests."""
+    global scheduler
+    if not scheduler_lock.try_acquire():
+        logger.info(f"Scheduler already running in another process ({SCHEDULER_LOCK_PATH} is locked)")
+        scheduler_leader.set(0)
+        threading.Thread(target=_wait_for_scheduler_lock, name="scheduler-lock", daemon=True).start()
+        return
+
+    from apscheduler.schedulers.background import BackgroundScheduler
+
+    scheduler = BackgroundScheduler()
+    # The job only looks for due groups; each group's own interval lives in the poll planner.
+    # With next_run_time set the first look happens right away, on the scheduler's thread.
+    first_run = datetime.now() if SCHEDULE_RUN_ON_STARTUP else None
+    scheduler.add_job(
+        func=scheduled_job,
+        trigger="interval",
+        minutes=POLL_TICK_MINUTES,
+        next_run_time=first_run,
+        id="scheduled_job",
+        max_instances=1,
+        coalesce=True,
+    )
+    scheduler.start()
+    scheduler_leader.set(1)
+    logger.info(f"Scheduler started in process {os.getpid()}")
 
 
 def create_app() -> Flask:
-    with app.app_context():
-        scheduled_job()
+    """Application factory for gunicorn: starts background work once per process and returns immediately."""
+    with _startup_lock:
+        if app.config.get("STARTED"):
+            return app
+        _ensure_credentials_file()
+        _start_scheduler()
+        app.config["STARTED"] = True
+        startup = time.perf_counter() - _IMPORT_STARTED
+        app_startup_seconds.set(startup)
+        logger.info(f"Application started in {startup:.2f}s")
     return app
 
 
@@ -146,17 +370,33 @@ def home() -> str:
 
 
 @app.route("/login", methods=["GET"])
-def login() -> Response:
+def login() -> Response | tuple[Response, int]:
     """
     Start Google OAuth2 authorization flow.
     ---
+    parameters:
+      - name: user
+        in: query
+        type: string
+        required: false
+        description: Account the token is stored for (defaults to the single default account).
     responses:
       302:
         description: Redirect to Google consent screen.
+      400:
+        description: Invalid user id.
+        schema:
+          $ref: '#/definitions/Error'
     """
-    with open(CREDENTIALS_PATH, "r") as f:
-        client_config = json.load(f)
-    flow = Flow.from_client_config(client_config, scopes=SCOPES, redirect_uri=REDIRECT_URI)
+    from src.google_api.calendar_service import calendar_accounts
+
+    user_id = request.args.get("user", DEFAULT_USER)
+    try:
+        calendar_accounts.token_path(user_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    session["oauth_user"] = user_id
+    flow = _oauth_flow()
     auth_url, state = flow.authorization_url(prompt="consent")
     session["oauth_state"] = state
     session["code_verifier"] = flow.code_verifier
@@ -165,7 +405,7 @@ def login() -> Response:
 
 
 @app.route("/oauth2callback", methods=["GET"])
-def oauth2callback() -> Response:
+def oauth2callback() -> Response | tuple[Response, int]:
     """
     Google OAuth2 callback. Exchanges authorization code for credentials.
     ---
@@ -182,37 +422,68 @@ def oauth2callback() -> Response:
         description: CSRF state token.
     responses:
       302:
-        description: Redirect to home on success.
+        description: Redirect to home on success; this session is then signed in as the authorized user.
+      403:
+        description: The user id belongs to another Google account.
+        schema:
+          $ref: '#/definitions/Error'
+      502:
+        description: The authorized Google account could not be identified.
+        schema:
+          $ref: '#/definitions/Error'
     """
-    with open(CREDENTIALS_PATH, "r") as f:
-        client_config = json.load(f)
-    flow = Flow.from_client_config(
-        client_config,
-        scopes=SCOPES,
-        state=session.get("oauth_state"),
-        redirect_uri=REDIRECT_URI,
-    )
+    from src.google_api.calendar_service import calendar_accounts, google_account
+
+    flow = _oauth_flow(state=session.get("oauth_state"))
     flow.fetch_token(
         authorization_response=request.url,
         code_verifier=session.get("code_verifier"),
     )
-    creds = flow.credentials
-    with open(TOKEN_PATH, "w") as token:
-        token.write(creds.to_json())
-    logger.info("Token saved to token.json")
+    user_id = session.get("oauth_user", DEFAULT_USER)
+    try:
+        account = google_account(flow.credentials)
+    except Exception as e:
+        logger.error(f"Could not identify the Google account authorized for {user_id}: {e}")
+        return jsonify({"error": "Could not identify the authorized Google account"}), 502
+    bound = _bound_account(user_id)
+    if bound is not None and bound != account:
+        logger.warning(f"Refused to store a token of another Google account for user {user_id}")
+        return jsonify({"error": f"User {user_id} belongs to another Google account"}), 403
+    calendar_accounts.manager(user_id).save(flow.credentials)
+    subscription_store.bind_account(user_id, account)
+    session["user_id"] = user_id
+    # The token may belong to another Google account than before: find its calendars and fill them again.
+    subscription_store.forget_calendars(user_id)
+    subscription_store.forget_synced(user_id)
+    logger.info(f"Token saved for user {user_id}")
     return redirect("/")
 
 
 @app.route("/delete-token", methods=["DELETE"])
 def delete_token() -> tuple[Response, int]:
     """
-    Delete the stored Google OAuth2 token.
+    Delete the stored Google OAuth2 token. Only a session signed in as that user (through /login) may do so;
+    the user id is then free to be authorized by any Google account.
     ---
+    parameters:
+      - name: user
+        in: query
+        type: string
+        required: false
+        description: Account whose token is deleted (defaults to the default account).
     responses:
       200:
         description: Token deleted.
         schema:
           $ref: '#/definitions/Message'
+      400:
+        description: Invalid user id.
+        schema:
+          $ref: '#/definitions/Error'
+      403:
+        description: This session is not signed in as the user.
+        schema:
+          $ref: '#/definitions/Error'
       404:
         description: Token not found.
         schema:
@@ -222,9 +493,25 @@ def delete_token() -> tuple[Response, int]:
         schema:
           $ref: '#/definitions/Error'
     """
+    from src.google_api.calendar_service import calendar_accounts
+
+    user_id = request.args.get("user", DEFAULT_USER)
     try:
-        if os.path.exists(TOKEN_PATH):
-            os.remove(TOKEN_PATH)
+        token_path = calendar_accounts.token_path(user_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    denied = _session_user_error(user_id)
+    if denied:
+        return denied
+    try:
+        if os.path.exists(token_path):
+            os.remove(token_path)
+            calendar_accounts.manager(user_id).invalidate()
+            # The next login may be another Google account with other calendars, all still to be filled.
+            subscription_store.forget_calendars(user_id)
+            subscription_store.forget_synced(user_id)
+            subscription_store.unbind_account(user_id)
+            session.pop("user_id", None)
             logger.info("Token deleted")
             return jsonify({"message": "Token deleted successfully"}), 200
         logger.info("Token not found")
@@ -234,10 +521,90 @@ def delete_token() -> tuple[Response, int]:
         return jsonify({"error": "Internal server error"}), 500
 
 
+def _requested_range() -> tuple[date, date] | None:
+    """Date range from ``?range=semester`` or ``?start=YYYY-MM-DD&end=YYYY-MM-DD``; None means current week."""
+    if request.args.get("range") == "semester":
+        return semester_range()
+    start, end = request.args.get("start"), request.args.get("end")
+    if not start and not end:
+        return None
+    if not start or not end:
+        raise ValueError("Both start and end are required")
+    date_range = (date.fromisoformat(start), date.fromisoformat(end))
+    if date_range[0] > date_range[1]:
+        raise ValueError("start must not be after end")
+    return date_range
+
+
+def _parse_since(value: str | None) -> float:
+    """Unix time from ``?since=`` given as a number or an ISO 8601 datetime (UTC when naive)."""
+    if not value:
+        return 0.0
+    try:
+        return float(value)
+    except ValueError:
+        moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def _queried_days() -> tuple[date | None, date | None]:
+    """Days selected by ``?date=YYYY-MM-DD`` or ``?week=YYYY-Www``; ``(None, None)`` when neither is given."""
+    if request.args.get("date"):
+        day = date.fromisoformat(request.args["date"])
+        return day, day
+    if request.args.get("week"):
+        return week_range(request.args["week"])
+    return None, None
+
+
+def _iso_timestamp(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def _wants_ndjson() -> bool:
+    return request.accept_mimetypes.best_match(["application/json", "application/x-ndjson"]) == "application/x-ndjson"
+
+
+def _ndjson_response(run: Callable[[], dict[str, Any]]) -> Response:
+    """Run ``run`` on a worker thread and stream its progress events, then its result, as NDJSON lines."""
+    channel = ProgressChannel(NDJSON_QUEUE_SIZE)
+
+    def worker() -> None:
+        with progress_sink(channel.put):
+            try:
+                channel.put({"event": "done", "result": run()})
+            except Exception as e:
+                logger.exception(f"Streaming run failed: {e}")
+                channel.put({"event": "error", "error": str(e)})
+        channel.finish()
+
+    threading.Thread(target=contextvars.copy_context().run, args=(worker,), name="ndjson", daemon=True).start()
+    lines = (json.dumps(event, ensure_ascii=False) + "\n" for event in channel)
+    return Response(lines, mimetype="application/x-ndjson", headers={"X-Accel-Buffering": "no"})
+
+
+def _accepted(job: Job) -> tuple[Response, int, dict[str, str]]:
+    # A reused job has already finished: answer with its result right away.
+    return jsonify(job.as_dict()), 200 if job.done else 202, {"Location": f"/jobs/{job.id}"}
+
+
 @app.route("/scrape/<group>", methods=["POST"])
-def scrape(group: str) -> tuple[Response, int]:
+def scrape(group: str) -> tuple[Response, int, dict[str, str]] | tuple[Response, int]:
     """
-    Scrape WAT schedule for a given group and sync to Google Calendar.
+    Queue a scrape of the WAT schedule for a given group and its Google Calendar sync.
+    Concurrent requests for the same group are merged into one job, and a request shortly
+    after the same scrape succeeded gets that result without scraping again.
+    With Accept: application/x-ndjson the scrape runs within the request instead and its
+    progress is streamed, one JSON object per line: a lesson event per lesson as weeks are
+    parsed, sync_plan and sync_batch events from the calendar update, then done or error.
+    If the WAT site fails (or its circuit breaker is open) and the group was scraped before,
+    the job succeeds with the last good schedule, marked stale, and is retried in the
+    background; calendars are only synced from a successful scrape.
+    With dry_run=1 nothing is synced or stored: the result lists, per calendar, the event
+    inserts, patches and deletes the sync would make and its estimated API calls, batches,
+    quota and latency.
     ---
     parameters:
       - name: group
@@ -245,15 +612,45 @@ def scrape(group: str) -> tuple[Response, int]:
         type: string
         required: true
         description: Group ID (e.g. WCY25IX1S4).
+      - name: range
+        in: query
+        type: string
+        enum: [semester]
+        required: false
+        description: Scrape every week of the current semester instead of the current week.
+      - name: start
+        in: query
+        type: string
+        format: date
+        required: false
+        description: First day of a custom range (requires end).
+      - name: end
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Last day of a custom range (requires start).
+      - name: dry_run
+        in: query
+        type: boolean
+        required: false
+        description: Only plan the calendar sync (see the plan field of the job result).
+    produces:
+      - application/json
+      - application/x-ndjson
     responses:
       200:
-        description: List of scraped lessons.
+        description: >
+          The same scrape succeeded with fresh data within SCRAPE_RESULT_TTL_SECONDS; its finished job.
+          For application/x-ndjson, the stream of progress events.
         schema:
-          type: array
-          items:
-            $ref: '#/definitions/Lesson'
+          $ref: '#/definitions/Job'
+      202:
+        description: Job queued (or merged into an in-flight job). Poll the Location header.
+        schema:
+          $ref: '#/definitions/Job'
       400:
-        description: Scraping error.
+        description: Invalid date range.
         schema:
           $ref: '#/definitions/Error'
       500:
@@ -262,39 +659,518 @@ def scrape(group: str) -> tuple[Response, int]:
           $ref: '#/definitions/Error'
     """
     logger.info(f"Received request for group: {group}")
+    try:
+        date_range = _requested_range()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date range: {e}"}), 400
+
     try:
         user_agent = request.headers.get("User-Agent")
         logger.info(f"Using User-Agent: {user_agent}")
 
-        data, error = scrape_schedule(group, user_agent)
-        if error:
-            logger.error(f"Error from scrape_schedule: {error}")
-            return jsonify({"error": error}), 400
+        dry_run = request.args.get("dry_run", "").lower() in ("1", "true", "yes")
 
-        logger.info("Successfully scraped schedule")
-        update_google_calendar(data)
-        logger.info("Successfully updated Google Calendar")
+        def scrape_job(include_lessons: bool = True) -> dict[str, Any]:
+            if dry_run:
+                result = plan_group(group, user_agent, date_range=date_range)
+            else:
+                result = process_group(group, user_agent, date_range=date_range)
+            if not result.ok:
+                raise RuntimeError(result.error)
+            return result.as_dict(include_lessons=include_lessons)
 
-        return jsonify(data), 200
+        if _wants_ndjson():
+            # The lessons were already streamed one by one; the final event only carries the summary.
+            return _ndjson_response(lambda: scrape_job(include_lessons=False))
+        kind = "plan" if dry_run else "scrape"
+        key = f"{kind}:{group}" if date_range is None else f"{kind}:{group}:{date_range[0]}:{date_range[1]}"
+        # A plan describes the calendars as they are now, so it is never served from an earlier run,
+        # and a stale fallback is only an answer to its own failed scrape: the next request tries again.
+        reuse_seconds = 0.0 if dry_run else SCRAPE_RESULT_TTL_SECONDS
+        job, _ = job_queue.submit(
+            kind, key, scrape_job, reuse_seconds=reuse_seconds, reuse_if=lambda result: not result.get("stale")
+        )
+        return _accepted(job)
     except Exception as e:
         logger.exception(f"An error occurred: {e}")
         return jsonify({"error": "Internal server error"}), 500
 
 
 @app.route("/run-job", methods=["POST"])
-def run_job() -> tuple[str, int]:
+def run_job() -> Response | tuple[Response, int, dict[str, str]]:
+    """
+    Queue the scheduled scrape-and-sync job for all configured and subscribed groups.
+    With Accept: application/x-ndjson the run happens within the request and streams the
+    same events as /scrape, plus a group event as each group finishes.
+    ---
+    produces:
+      - application/json
+      - application/x-ndjson
+    responses:
+      200:
+        description: For application/x-ndjson, the stream of progress events.
+      202:
+        description: Job queued (or merged into an in-flight run).
+        schema:
+          $ref: '#/definitions/Job'
+    """
+
+    def run() -> dict[str, Any]:
+        summary = run_groups(scheduled_groups(), user_agent="Automated Scheduler Bot", date_range=_scheduled_range())
+        return summary.as_dict()
+
+    if _wants_ndjson():
+        return _ndjson_response(run)
+    job, _ = job_queue.submit("run-job", "run-job", run)
+    return _accepted(job)
+
+
+@app.route("/schedule/<group>", methods=["GET"])
+def schedule(group: str) -> tuple[Response, int]:
     """
-    Manually trigger the scheduled scrape-and-sync job.
+    Lessons of a group from the last stored scrape, without contacting the WAT site.
     ---
+    parameters:
+      - name: group
+        in: path
+        type: string
+        required: true
+        description: Group ID (e.g. WCY25IX1S4).
+      - name: start
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Only lessons on or after this day.
+      - name: end
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Only lessons on or before this day.
     responses:
       200:
-        description: Job executed successfully.
+        description: Stored lessons with first-seen and last-seen timestamps.
+        schema:
+          $ref: '#/definitions/Schedule'
+      400:
+        description: Invalid date.
+        schema:
+          $ref: '#/definitions/Error'
+      404:
+        description: The group was never scraped.
+        schema:
+          $ref: '#/definitions/Error'
+      503:
+        description: The snapshot store is disabled.
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    if snapshot_store is None:
+        return jsonify({"error": "Snapshot store is disabled"}), 503
+    try:
+        start = date.fromisoformat(request.args["start"]) if request.args.get("start") else None
+        end = date.fromisoformat(request.args["end"]) if request.args.get("end") else None
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date: {e}"}), 400
+
+    scraped_at = snapshot_store.scraped_at(group)
+    if scraped_at is None:
+        return jsonify({"error": f"No stored schedule for group {group}"}), 404
+    lessons = snapshot_store.lessons(group, start, end)
+    return jsonify(
+        {"group": group, "scraped_at": _iso_timestamp(scraped_at), "lessons": [item.as_dict() for item in lessons]}
+    ), 200
+
+
+@app.route("/schedule/<group>/changes", methods=["GET"])
+def schedule_changes(group: str) -> tuple[Response, int]:
+    """
+    Lessons added, updated or removed since a point in time.
+    ---
+    parameters:
+      - name: group
+        in: path
+        type: string
+        required: true
+        description: Group ID (e.g. WCY25IX1S4).
+      - name: since
+        in: query
+        type: string
+        required: false
+        description: ISO 8601 datetime or unix timestamp; defaults to the whole history.
+    responses:
+      200:
+        description: Changes in the order they were recorded.
+        schema:
+          $ref: '#/definitions/ScheduleChanges'
+      400:
+        description: Invalid since value.
+        schema:
+          $ref: '#/definitions/Error'
+      503:
+        description: The snapshot store is disabled.
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    if snapshot_store is None:
+        return jsonify({"error": "Snapshot store is disabled"}), 503
+    try:
+        since = _parse_since(request.args.get("since"))
+    except ValueError as e:
+        return jsonify({"error": f"Invalid since: {e}"}), 400
+
+    changes = snapshot_store.changes(group, since)
+    next_since = changes[-1].at if changes else since
+    return jsonify(
+        {
+            "group": group,
+            "since": since,
+            "next_since": next_since,
+            "changes": [change.as_dict() for change in changes],
+        }
+    ), 200
+
+
+@app.route("/groups/<group>/lessons", methods=["GET"])
+def group_lessons(group: str) -> Response | tuple[Response, int]:
+    """
+    Lessons of a group from the in-memory index of its stored schedule, without contacting the WAT site.
+    ---
+    parameters:
+      - name: group
+        in: path
+        type: string
+        required: true
+        description: Group ID (e.g. WCY25IX1S4).
+      - name: date
+        in: query
+        type: string
+        format: date
+        required: false
+        description: Only lessons on this day.
+      - name: week
+        in: query
+        type: string
+        required: false
+        description: Only lessons in this ISO week (e.g. 2024-W46).
+      - name: subject
+        in: query
+        type: string
+        required: false
+        description: Only lessons whose subject contains this text (case-insensitive).
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag of a previous answer; unchanged schedules get 304.
+    responses:
+      200:
+        description: Matching lessons in day and block order.
+        schema:
+          $ref: '#/definitions/GroupLessons'
+      304:
+        description: The schedule has not changed since the given ETag.
+      400:
+        description: Invalid date or week.
+        schema:
+          $ref: '#/definitions/Error'
+      404:
+        description: The group was never scraped.
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    try:
+        start, end = _queried_days()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date or week: {e}"}), 400
+    index = lesson_index.get(group)
+    if index is None:
+        return jsonify({"error": f"No stored schedule for group {group}"}), 404
+    if index.content_hash in request.if_none_match:
+        response = Response(status=304)
+    else:
+        response = jsonify(
+            {
+                "group": group,
+                "scraped_at": _iso_timestamp(index.scraped_at) if index.scraped_at else None,
+                "lessons": index.lessons(start, end, request.args.get("subject")),
+            }
+        )
+    response.set_etag(index.content_hash)
+    return response
+
+
+@app.route("/groups/<group>/free-blocks", methods=["GET"])
+def group_free_blocks(group: str) -> Response | tuple[Response, int]:
+    """
+    Blocks of BLOCK_HOURS without a lesson, per day, from the in-memory index.
+    ---
+    parameters:
+      - name: group
+        in: path
+        type: string
+        required: true
+        description: Group ID (e.g. WCY25IX1S4).
+      - name: date
+        in: query
+        type: string
+        format: date
+        required: false
+        description: A single day.
+      - name: week
+        in: query
+        type: string
+        required: false
+        description: Every day of this ISO week (e.g. 2024-W46). Defaults to the current week.
+    responses:
+      200:
+        description: Free blocks of each requested day.
+        schema:
+          $ref: '#/definitions/FreeBlocks'
+      304:
+        description: The schedule has not changed since the given ETag.
+      400:
+        description: Invalid date or week.
+        schema:
+          $ref: '#/definitions/Error'
+      404:
+        description: The group was never scraped.
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    try:
+        start, end = _queried_days()
+    except ValueError as e:
+        return jsonify({"error": f"Invalid date or week: {e}"}), 400
+    if start is None or end is None:
+        start = date.today() - timedelta(days=date.today().weekday())
+        end = start + timedelta(days=6)
+    index = lesson_index.get(group)
+    if index is None:
+        return jsonify({"error": f"No stored schedule for group {group}"}), 404
+    if index.content_hash in request.if_none_match:
+        response = Response(status=304)
+    else:
+        days = []
+        day = start
+        while day <= end:
+            free = [
+                {"block": block_id, "start": BLOCK_HOURS[block_id]["START"], "end": BLOCK_HOURS[block_id]["END"]}
+                for block_id in index.free_blocks(day)
+            ]
+            days.append({"date": day.isoformat(), "free": free})
+            day += timedelta(days=1)
+        response = jsonify({"group": group, "days": days})
+    response.set_etag(index.content_hash)
+    return response
+
+
+@app.route("/ical/<group>.ics", methods=["GET"])
+def ical(group: str) -> Response | tuple[Response, int, dict[str, str]] | tuple[Response, int]:
+    """
+    Subscribable iCalendar feed of a group's stored schedule.
+    ---
+    produces:
+      - text/calendar
+    parameters:
+      - name: group
+        in: path
+        type: string
+        required: true
+        description: Group ID (e.g. WCY25IX1S4).
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag of a previously fetched feed.
+    responses:
+      200:
+        description: The feed, streamed when it is not cached yet.
         schema:
           type: string
+      304:
+        description: The feed has not changed since the given ETag.
+      503:
+        description: The group has not been scraped yet (a scrape is queued) or the snapshot store is disabled.
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    if snapshot_store is None:
+        return jsonify({"error": "Snapshot store is disabled"}), 503
+    changed_at = snapshot_store.last_changed(group)
+    if changed_at is None:
+        job, _ = job_queue.submit(
+            "scrape", f"ical:{group}", lambda: process_group(group, "Automated Scheduler Bot", sync=False).as_dict()
+        )
+        return (
+            jsonify({"error": f"No stored schedule for group {group} yet, scrape queued"}),
+            503,
+            {"Retry-After": "30", "Location": f"/jobs/{job.id}"},
+        )
+
+    name = CALENDAR_NAME_TEMPLATE.format(group=group)
+    stamp = datetime.fromtimestamp(changed_at, timezone.utc)
+    etag = feed_etag(name, stamp)
+
+    if etag in request.if_none_match:
+        response = Response(status=304)
+    else:
+        body = ics_cache.get(name, etag)
+        if body is None:
+            lessons = [item.lesson for item in snapshot_store.lessons(group)]
+            body = ics_cache.stream(name, etag, iter_ics(name, lessons, stamp))
+        response = Response(body, mimetype="text/calendar")
+        response.headers["Content-Disposition"] = f'inline; filename="{group}.ics"'
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = f"public, max-age={ICAL_MAX_AGE_SECONDS}"
+    return response
+
+
+@app.route("/users/<user_id>/subscriptions", methods=["GET"])
+def subscriptions(user_id: str) -> tuple[Response, int]:
+    """
+    Groups whose schedule is synced to a user's Google Calendar.
+    ---
+    parameters:
+      - name: user_id
+        in: path
+        type: string
+        required: true
+        description: Account authorized through /login?user=<user_id>.
+    responses:
+      200:
+        description: Subscribed groups.
+        schema:
+          $ref: '#/definitions/Subscriptions'
+    """
+    return jsonify({"user": user_id, "groups": subscription_store.groups(user_id)}), 200
+
+
+@app.route("/users/<user_id>/subscriptions/<group>", methods=["PUT", "DELETE"])
+def subscription(user_id: str, group: str) -> tuple[Response, int]:
+    """
+    Subscribe a user's calendar to a group (PUT) or unsubscribe it (DELETE).
+    Every scheduled run scrapes each subscribed group once and syncs it to all of its subscribers.
+    Only a session signed in as the user (through /login?user=<user_id>) may change its subscriptions.
+    ---
+    parameters:
+      - name: user_id
+        in: path
+        type: string
+        required: true
+        description: Account authorized through /login?user=<user_id>.
+      - name: group
+        in: path
+        type: string
+        required: true
+        description: Group ID (e.g. WCY25IX1S4).
+    responses:
+      200:
+        description: Subscription already existed (PUT) or was removed (DELETE).
+        schema:
+          $ref: '#/definitions/Subscriptions'
+      201:
+        description: Subscription created.
+        schema:
+          $ref: '#/definitions/Subscriptions'
+      400:
+        description: Invalid user id.
+        schema:
+          $ref: '#/definitions/Error'
+      403:
+        description: This session is not signed in as the user.
+        schema:
+          $ref: '#/definitions/Error'
+      404:
+        description: No such subscription.
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    from src.google_api.calendar_service import calendar_accounts
+
+    try:
+        calendar_accounts.token_path(user_id)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    denied = _session_user_error(user_id)
+    if denied:
+        return denied
+
+    if request.method == "PUT":
+        created = subscription_store.subscribe(user_id, group)
+        if created:
+            logger.info(f"User {user_id} subscribed to {group}")
+        return jsonify({"user": user_id, "groups": subscription_store.groups(user_id)}), 201 if created else 200
+
+    if not subscription_store.unsubscribe(user_id, group):
+        return jsonify({"error": f"User {user_id} is not subscribed to {group}"}), 404
+    logger.info(f"User {user_id} unsubscribed from {group}")
+    return jsonify({"user": user_id, "groups": subscription_store.groups(user_id)}), 200
+
+
+@app.route("/polling", methods=["GET"])
+def polling() -> tuple[Response, int]:
+    """
+    Adaptive polling state of every scheduled group: change rate, current interval and next run.
+    ---
+    responses:
+      200:
+        description: Polling state per group, the next due first.
+        schema:
+          type: object
+          properties:
+            groups:
+              type: array
+              items:
+                $ref: '#/definitions/PollState'
+    """
+    states = [poll_planner.state(group) for group in scheduled_groups()]
+    states.sort(key=lambda state: state.next_run_at)
+    return jsonify({"groups": [state.as_dict() for state in states]}), 200
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    """
+    Prometheus metrics for scraping, parsing, Calendar API batches and per-group jobs.
+    ---
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Metrics in the Prometheus text exposition format.
+        schema:
+          type: string
+    """
+    return Response(registry.render(), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id: str) -> tuple[Response, int]:
+    """
+    Status, timings and result of a queued job.
+    ---
+    parameters:
+      - name: job_id
+        in: path
+        type: string
+        required: true
+        description: Job ID returned by /scrape/<group> or /run-job.
+    responses:
+      200:
+        description: Job state.
+        schema:
+          $ref: '#/definitions/Job'
+      404:
+        description: Unknown or expired job.
+        schema:
+          $ref: '#/definitions/Error'
     """
-    scheduled_job()
-    logger.info("Job executed successfully")
-    return "Job executed successfully", 200
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.as_dict()), 200
 
 
 if __name__ == "__main__":
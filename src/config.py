@@ -1,21 +1,124 @@
 import os
 
+# --- Storage ---
+STORAGE_DIR: str = os.getenv("STORAGE_DIR", "/storage")
+
 # --- Google OAuth ---
 SCOPES: list[str] = ["https://www.googleapis.com/auth/calendar"]
-TOKEN_PATH: str = "/storage/token.json"
+TOKEN_PATH: str = os.path.join(STORAGE_DIR, "token.json")
+# Tokens of additional accounts, one <user_id>.json per user; DEFAULT_USER keeps using TOKEN_PATH.
+TOKENS_DIR: str = os.path.join(STORAGE_DIR, "tokens")
+DEFAULT_USER: str = "default"
+TOKEN_REFRESH_MARGIN_SECONDS: int = int(os.getenv("TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+GOOGLE_HTTP_TIMEOUT_SECONDS: float = float(os.getenv("GOOGLE_HTTP_TIMEOUT_SECONDS", "60"))
 REDIRECT_URI: str = "https://scheduler-wat-v2-2024-production.up.railway.app/oauth2callback"
 
+# --- Google Calendar ---
+CALENDAR_NAME_TEMPLATE: str = "WAT-calendar {group}"
+LEGACY_CALENDAR_PREFIX: str = "WAT-calendar+"
+CALENDAR_BATCH_SIZE: int = int(os.getenv("CALENDAR_BATCH_SIZE", "50"))
+CALENDAR_BATCH_MIN_SIZE: int = int(os.getenv("CALENDAR_BATCH_MIN_SIZE", "5"))
+CALENDAR_BATCH_MAX_ATTEMPTS: int = int(os.getenv("CALENDAR_BATCH_MAX_ATTEMPTS", "5"))
+CALENDAR_BACKOFF_BASE_SECONDS: float = float(os.getenv("CALENDAR_BACKOFF_BASE_SECONDS", "1"))
+CALENDAR_BACKOFF_MAX_SECONDS: float = float(os.getenv("CALENDAR_BACKOFF_MAX_SECONDS", "32"))
+# Latency assumed by sync dry runs until this process has timed real Calendar API batches.
+CALENDAR_BATCH_SECONDS_ESTIMATE: float = float(os.getenv("CALENDAR_BATCH_SECONDS_ESTIMATE", "1.5"))
+CALENDAR_READ_SECONDS_ESTIMATE: float = float(os.getenv("CALENDAR_READ_SECONDS_ESTIMATE", "0.3"))
+
 # --- Paths ---
 CREDENTIALS_PATH: str = "credentials.json"
 
+# --- Logging ---
+LOG_DIR: str = os.getenv("LOG_DIR", "logs")
+# "text" keeps the human-readable file format, "json" writes one JSON object per line.
+LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")
+LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
 # --- Scheduler ---
 DEFAULT_GROUP: str = os.getenv("DEFAULT_GROUP", "WCY25IX1S4")
 SCHEDULE_INTERVAL_HOURS: int = 36
+SCHEDULER_LOCK_PATH: str = os.path.join(STORAGE_DIR, "scheduler.lock")
+SCHEDULER_LOCK_RETRY_SECONDS: float = float(os.getenv("SCHEDULER_LOCK_RETRY_SECONDS", "60"))
+# Run the first scheduled job right after startup (in the background) instead of one interval later.
+SCHEDULE_RUN_ON_STARTUP: bool = os.getenv("SCHEDULE_RUN_ON_STARTUP", "1") == "1"
+SCHEDULE_GROUPS: list[str] = [
+    group.strip() for group in os.getenv("SCHEDULE_GROUPS", DEFAULT_GROUP).split(",") if group.strip()
+]
+# "week" scrapes the current week, "semester" every week of the current semester.
+SCHEDULE_RANGE: str = os.getenv("SCHEDULE_RANGE", "week")
+FANOUT_MAX_WORKERS: int = int(os.getenv("FANOUT_MAX_WORKERS", "4"))
+SCRAPE_HOST_MIN_INTERVAL_SECONDS: float = float(os.getenv("SCRAPE_HOST_MIN_INTERVAL_SECONDS", "1.0"))
+SCRAPE_GROUP_MIN_INTERVAL_SECONDS: float = float(os.getenv("SCRAPE_GROUP_MIN_INTERVAL_SECONDS", "10.0"))
+
+# --- Adaptive polling ---
+# Each group is polled between these bounds: more often while its plan keeps changing, less while it is stable.
+# New groups start at SCHEDULE_INTERVAL_HOURS.
+POLL_MIN_INTERVAL_HOURS: float = float(os.getenv("POLL_MIN_INTERVAL_HOURS", "4"))
+POLL_MAX_INTERVAL_HOURS: float = float(os.getenv("POLL_MAX_INTERVAL_HOURS", "96"))
+# Weight of the latest check in the per-group change rate (exponential moving average).
+POLL_CHANGE_RATE_ALPHA: float = float(os.getenv("POLL_CHANGE_RATE_ALPHA", "0.3"))
+# Every next run is moved by up to this fraction of the interval, so groups drift apart instead of lining up.
+POLL_JITTER_RATIO: float = float(os.getenv("POLL_JITTER_RATIO", "0.1"))
+# How often the scheduler looks for due groups, and how many it starts per look at most.
+POLL_TICK_MINUTES: float = float(os.getenv("POLL_TICK_MINUTES", "5"))
+POLL_MAX_GROUPS_PER_TICK: int = int(os.getenv("POLL_MAX_GROUPS_PER_TICK", "8"))
+# Groups without polling state get their first run spread over this many minutes.
+POLL_STARTUP_SPREAD_MINUTES: float = float(os.getenv("POLL_STARTUP_SPREAD_MINUTES", "10"))
+POLL_STATE_DB_PATH: str = os.path.join(STORAGE_DIR, "polling.sqlite3")
+
+# --- Job queue ---
+JOB_QUEUE_MAX_WORKERS: int = int(os.getenv("JOB_QUEUE_MAX_WORKERS", "2"))
+JOB_RETENTION_SECONDS: int = int(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+# Progress events buffered for a streaming (application/x-ndjson) response before the work waits for the client.
+NDJSON_QUEUE_SIZE: int = int(os.getenv("NDJSON_QUEUE_SIZE", "1000"))
+# A /scrape request this soon after the same scrape succeeded gets that job's result instead of a new run.
+SCRAPE_RESULT_TTL_SECONDS: float = float(os.getenv("SCRAPE_RESULT_TTL_SECONDS", "60"))
+
+# --- Snapshot store ---
+SNAPSHOT_STORE_ENABLED: bool = os.getenv("SNAPSHOT_STORE_ENABLED", "1") == "1"
+SNAPSHOT_DB_PATH: str = os.path.join(STORAGE_DIR, "schedule.sqlite3")
+
+# --- Subscriptions ---
+SUBSCRIPTIONS_DB_PATH: str = os.path.join(STORAGE_DIR, "subscriptions.sqlite3")
+SYNC_MAX_WORKERS: int = int(os.getenv("SYNC_MAX_WORKERS", "4"))
+ACCOUNT_MAX_CONCURRENT_SYNCS: int = int(os.getenv("ACCOUNT_MAX_CONCURRENT_SYNCS", "1"))
+ACCOUNT_SYNC_MIN_INTERVAL_SECONDS: float = float(os.getenv("ACCOUNT_SYNC_MIN_INTERVAL_SECONDS", "1.0"))
+
+# --- iCalendar feed ---
+ICAL_CACHE_MAX_ENTRIES: int = int(os.getenv("ICAL_CACHE_MAX_ENTRIES", "256"))
+ICAL_MAX_AGE_SECONDS: int = int(os.getenv("ICAL_MAX_AGE_SECONDS", "3600"))
 
 # --- Scraper ---
+WAT_BASE_URL: str = os.getenv("WAT_BASE_URL", "https://planzajec.wcy.wat.edu.pl").rstrip("/")
 LOCATION: str = "academic grounds"
 TIMEZONE: str = "Europe/Warsaw"
 
+SCRAPER_CONNECT_TIMEOUT_SECONDS: float = float(os.getenv("SCRAPER_CONNECT_TIMEOUT_SECONDS", "5"))
+SCRAPER_READ_TIMEOUT_SECONDS: float = float(os.getenv("SCRAPER_READ_TIMEOUT_SECONDS", "30"))
+SCRAPER_MAX_RETRIES: int = int(os.getenv("SCRAPER_MAX_RETRIES", "3"))
+SCRAPER_BACKOFF_BASE_SECONDS: float = float(os.getenv("SCRAPER_BACKOFF_BASE_SECONDS", "0.5"))
+SCRAPER_BACKOFF_MAX_SECONDS: float = float(os.getenv("SCRAPER_BACKOFF_MAX_SECONDS", "10"))
+SCRAPER_MAX_CONCURRENCY_PER_HOST: int = int(os.getenv("SCRAPER_MAX_CONCURRENCY_PER_HOST", "4"))
+SCRAPER_POOL_SIZE: int = int(os.getenv("SCRAPER_POOL_SIZE", "10"))
+SCRAPER_VERIFY_TLS: bool = os.getenv("SCRAPER_VERIFY_TLS", "0") == "1"
+# After this many consecutive failed requests to a host, requests to it fail fast for SCRAPER_CIRCUIT_RESET_SECONDS.
+SCRAPER_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("SCRAPER_CIRCUIT_FAILURE_THRESHOLD", "5"))
+SCRAPER_CIRCUIT_RESET_SECONDS: float = float(os.getenv("SCRAPER_CIRCUIT_RESET_SECONDS", "60"))
+# A failed scrape is answered from the last good schedule and retried in the background with these bounds.
+REVALIDATE_BASE_SECONDS: float = float(os.getenv("REVALIDATE_BASE_SECONDS", "30"))
+REVALIDATE_MAX_SECONDS: float = float(os.getenv("REVALIDATE_MAX_SECONDS", "900"))
+REVALIDATE_MAX_ATTEMPTS: int = int(os.getenv("REVALIDATE_MAX_ATTEMPTS", "8"))
+
+RANGE_MAX_WORKERS: int = int(os.getenv("RANGE_MAX_WORKERS", "4"))
+SEMESTER_WINTER_START: str = os.getenv("SEMESTER_WINTER_START", "10-01")
+SEMESTER_SUMMER_START: str = os.getenv("SEMESTER_SUMMER_START", "02-16")
+SEMESTER_SUMMER_END: str = os.getenv("SEMESTER_SUMMER_END", "06-30")
+
+HTML_CACHE_ENABLED: bool = os.getenv("HTML_CACHE_ENABLED", "1") == "1"
+HTML_CACHE_DIR: str = os.path.join(STORAGE_DIR, "html_cache")
+HTML_CACHE_TTL_SECONDS: int = int(os.getenv("HTML_CACHE_TTL_SECONDS", str(3 * 24 * 3600)))
+HTML_CACHE_MAX_ENTRIES: int = int(os.getenv("HTML_CACHE_MAX_ENTRIES", "512"))
+
 BLOCK_HOURS: dict[str, dict[str, str]] = {
     "block1": {"START": "08:00", "END": "09:35"},
     "block2": {"START": "09:50", "END": "11:25"},
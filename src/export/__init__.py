@@ -0,0 +1,2 @@
+from .csv_export import CSV_FIELDS, iter_csv
+from .ical import ics_cache, iter_ics
@@ -0,0 +1,33 @@
+import csv
+import io
+from collections.abc import Iterator
+
+from src.models.lesson import Lesson
+
+# Column order of Google Calendar's CSV import, the shape of Lesson.to_dict().
+CSV_FIELDS = [
+    "Subject",
+    "Start Date",
+    "Start Time",
+    "End Date",
+    "End Time",
+    "All Day Event",
+    "Description",
+    "Location",
+    "Private",
+]
+
+
+def iter_csv(lessons: list[Lesson]) -> Iterator[str]:
+    """Render ``lessons`` as a Google Calendar import CSV, one line at a time (header first)."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for lesson in lessons:
+        writer.writerow(lesson.to_dict())
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Only the header is left when there were no lessons.
+    if buffer.tell():
+        yield buffer.getvalue()
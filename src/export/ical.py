@@ -0,0 +1,135 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from datetime import datetime, time, timezone
+
+import pytz
+
+from src.config import ICAL_CACHE_MAX_ENTRIES, TIMEZONE
+from src.models.lesson import Lesson, keyed_lessons
+
+_LOCAL_TZ = pytz.timezone(TIMEZONE)
+
+# Events are joined into chunks of this many before being yielded to the response stream.
+EVENTS_PER_CHUNK = 50
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Fold a content line to 75 octets as required by RFC 5545."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts: list[str] = []
+    limit = 75
+    while encoded:
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte UTF-8 sequence.
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc(lesson: Lesson, moment: time) -> str:
+    local = _LOCAL_TZ.localize(datetime.combine(lesson.day, moment))
+    return local.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def feed_etag(name: str, stamp: datetime) -> str:
+    """ETag of the feed ``name`` whose lessons last changed at ``stamp``, known without reading the lessons.
+
+    Every added, updated or removed lesson moves the group's last change, and
+    with it ``stamp`` (also the DTSTAMP of every event), so the ETag changes
+    exactly when the rendered feed does.
+    """
+    return hashlib.sha1(f"{name}|{stamp.isoformat()}".encode("utf-8")).hexdigest()
+
+
+def _event(uid_prefix: str, key: str, lesson: Lesson, dtstamp: str) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{hashlib.sha1(f'{uid_prefix}|{key}'.encode('utf-8')).hexdigest()}@wat-scheduler",
+        f"DTSTAMP:{dtstamp}",
+    ]
+    if lesson.start and lesson.end:
+        lines += [f"DTSTART:{_utc(lesson, lesson.start)}", f"DTEND:{_utc(lesson, lesson.end)}"]
+    else:
+        lines.append(f"DTSTART;VALUE=DATE:{lesson.day.strftime('%Y%m%d')}")
+    lines += [
+        f"SUMMARY:{_escape(lesson.subject)}",
+        f"DESCRIPTION:{_escape(lesson.description)}",
+        f"LOCATION:{_escape(lesson.location)}",
+        "CLASS:PRIVATE",
+        "END:VEVENT",
+    ]
+    return "".join(_fold(line) for line in lines)
+
+
+def iter_ics(name: str, lessons: list[Lesson], stamp: datetime) -> Iterator[bytes]:
+    """Render ``lessons`` as an iCalendar feed, yielded in chunks of ``EVENTS_PER_CHUNK`` events.
+
+    ``stamp`` becomes every event's DTSTAMP; keep it stable (e.g. the time of
+    the last change) so an unchanged schedule renders to identical bytes.
+    """
+    dtstamp = stamp.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//WAT Scheduler//Schedule feed//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+        f"X-WR-TIMEZONE:{TIMEZONE}",
+    ]
+    yield "".join(_fold(line) for line in header).encode("utf-8")
+
+    chunk: list[str] = []
+    for key, lesson in keyed_lessons(lessons).items():
+        chunk.append(_event(name, key, lesson, dtstamp))
+        if len(chunk) >= EVENTS_PER_CHUNK:
+            yield "".join(chunk).encode("utf-8")
+            chunk = []
+    chunk.append(_fold("END:VCALENDAR"))
+    yield "".join(chunk).encode("utf-8")
+
+
+class IcsCache:
+    """Rendered feeds by name, valid for one content hash each, with LRU eviction."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, name: str, etag: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(name)
+            return entry[1]
+
+    def put(self, name: str, etag: str, body: bytes) -> None:
+        with self._lock:
+            self._entries[name] = (etag, body)
+            self._entries.move_to_end(name)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stream(self, name: str, etag: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Pass ``chunks`` through and cache the whole body once the stream completes."""
+        rendered: list[bytes] = []
+        for chunk in chunks:
+            rendered.append(chunk)
+            yield chunk
+        self.put(name, etag, b"".join(rendered))
+
+
+ics_cache = IcsCache(ICAL_CACHE_MAX_ENTRIES)
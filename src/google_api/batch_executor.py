@@ -0,0 +1,189 @@
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+from googleapiclient.discovery import Resource
+from googleapiclient.errors import HttpError
+
+from src.config import (
+    CALENDAR_BACKOFF_BASE_SECONDS,
+    CALENDAR_BACKOFF_MAX_SECONDS,
+    CALENDAR_BATCH_MAX_ATTEMPTS,
+    CALENDAR_BATCH_MIN_SIZE,
+    CALENDAR_BATCH_SIZE,
+)
+from src.utils.custom_logger import google_api_logger as logger
+from src.utils.metrics import calendar_batch_seconds, google_api_errors_total
+from src.utils.progress import emit
+
+RATE_LIMIT_REASONS = frozenset({"rateLimitExceeded", "userRateLimitExceeded"})
+TRANSIENT_STATUS_CODES = frozenset({500, 502, 503, 504})
+
+
+def error_status(exception: Exception) -> int | None:
+    if isinstance(exception, HttpError):
+        return exception.resp.status
+    return None
+
+
+def is_rate_limited(exception: Exception) -> bool:
+    status = error_status(exception)
+    if status == 429:
+        return True
+    if status == 403 and isinstance(exception, HttpError):
+        details = exception.error_details if isinstance(exception.error_details, list) else []
+        return any(isinstance(d, dict) and d.get("reason") in RATE_LIMIT_REASONS for d in details)
+    return False
+
+
+def is_retryable(exception: Exception) -> bool:
+    return is_rate_limited(exception) or error_status(exception) in TRANSIENT_STATUS_CODES
+
+
+@dataclass
+class BatchReport:
+    size: int
+    latency_seconds: float
+    succeeded: int
+    failed: int
+    rate_limited: int
+
+
+@dataclass
+class BatchOutcome:
+    responses: dict[str, Any] = field(default_factory=dict)
+    errors: dict[str, Exception] = field(default_factory=dict)
+    reports: list[BatchReport] = field(default_factory=list)
+    retried: int = 0
+
+    @property
+    def batches(self) -> int:
+        return len(self.reports)
+
+    def summary(self) -> dict[str, Any]:
+        total = sum(report.size for report in self.reports)
+        latencies = sorted(report.latency_seconds for report in self.reports)
+        return {
+            "batches": self.batches,
+            "sub_requests": total,
+            "succeeded": len(self.responses),
+            "failed": len(self.errors),
+            "retried": self.retried,
+            "rate_limited": sum(report.rate_limited for report in self.reports),
+            "success_rate": round(sum(r.succeeded for r in self.reports) / total, 3) if total else 1.0,
+            "median_batch_seconds": round(latencies[len(latencies) // 2], 3) if latencies else 0.0,
+        }
+
+
+class BatchExecutor:
+    """Runs Calendar API requests through batch HTTP requests.
+
+    Tracks the outcome of every sub-request and re-queues only the ones that
+    failed with a rate-limit or transient error, with jittered exponential
+    backoff. The batch size follows AIMD: halved after a batch sees rate
+    limiting, grown again after clean batches.
+    """
+
+    def __init__(
+        self,
+        service: Resource,
+        max_size: int = CALENDAR_BATCH_SIZE,
+        min_size: int = CALENDAR_BATCH_MIN_SIZE,
+        max_attempts: int = CALENDAR_BATCH_MAX_ATTEMPTS,
+        backoff_base: float = CALENDAR_BACKOFF_BASE_SECONDS,
+        backoff_max: float = CALENDAR_BACKOFF_MAX_SECONDS,
+    ) -> None:
+        self.service = service
+        self.max_size = max_size
+        self.min_size = min(min_size, max_size)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.size = max_size
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def _run_batch(self, chunk: list[tuple[str, Any]]) -> tuple[dict[str, Any], dict[str, Exception], float]:
+        responses: dict[str, Any] = {}
+        errors: dict[str, Exception] = {}
+
+        def callback(request_id: str, response: Any, exception: Exception | None) -> None:
+            if exception is not None:
+                errors[request_id] = exception
+            else:
+                responses[request_id] = response
+
+        batch = self.service.new_batch_http_request(callback=callback)
+        for request_id, api_request in chunk:
+            batch.add(api_request, request_id=request_id)
+
+        started = time.perf_counter()
+        try:
+            batch.execute()
+        except Exception as e:
+            logger.error(f"Batch request of {len(chunk)} failed as a whole: {e}")
+            for request_id, _ in chunk:
+                if request_id not in responses:
+                    errors[request_id] = e
+        latency = time.perf_counter() - started
+        calendar_batch_seconds.observe(latency)
+        for error in errors.values():
+            google_api_errors_total.inc(status=str(error_status(error) or "transport"))
+        return responses, errors, latency
+
+    def execute(self, requests: list[tuple[str, Any]]) -> BatchOutcome:
+        outcome = BatchOutcome()
+        attempts: dict[str, int] = {}
+        pending = list(requests)
+
+        while pending:
+            chunk, pending = pending[: self.size], pending[self.size :]
+            responses, errors, latency = self._run_batch(chunk)
+            outcome.responses.update(responses)
+
+            retry: list[tuple[str, Any]] = []
+            rate_limited = 0
+            for request_id, api_request in chunk:
+                error = errors.get(request_id)
+                if error is None:
+                    continue
+                if is_rate_limited(error):
+                    rate_limited += 1
+                attempts[request_id] = attempts.get(request_id, 0) + 1
+                if is_retryable(error) and attempts[request_id] < self.max_attempts:
+                    retry.append((request_id, api_request))
+                else:
+                    logger.error(f"Error in batch request {request_id}: {error}")
+                    outcome.errors[request_id] = error
+
+            report = BatchReport(len(chunk), latency, len(responses), len(errors), rate_limited)
+            outcome.reports.append(report)
+            logger.info(
+                f"Batch of {report.size}: {report.succeeded} ok, {report.failed} failed "
+                f"({report.rate_limited} rate limited) in {latency:.2f}s"
+            )
+            emit(
+                "sync_batch",
+                size=report.size,
+                succeeded=report.succeeded,
+                failed=report.failed,
+                rate_limited=report.rate_limited,
+                seconds=round(latency, 3),
+                remaining=len(pending) + len(retry),
+            )
+
+            if rate_limited:
+                self.size = max(self.min_size, self.size // 2)
+            elif not errors:
+                self.size = min(self.max_size, self.size + max(1, self.max_size // 10))
+
+            if retry:
+                outcome.retried += len(retry)
+                delay = self._backoff(max(attempts[request_id] for request_id, _ in retry))
+                logger.warning(f"Retrying {len(retry)} sub-requests in {delay:.2f}s (batch size now {self.size})")
+                time.sleep(delay)
+                pending = retry + pending
+
+        return outcome
@@ -0,0 +1,62 @@
+from collections.abc import Iterator
+from typing import Any
+
+from googleapiclient.discovery import Resource
+from googleapiclient.errors import HttpError
+
+from src.config import LEGACY_CALENDAR_PREFIX
+from src.google_api.batch_executor import BatchExecutor, error_status
+from src.utils.custom_logger import google_api_logger as logger
+
+CALENDAR_LIST_FIELDS = "items(id,summary),nextPageToken"
+CALENDAR_LIST_PAGE_SIZE = 250
+
+
+def iter_calendars(service: Resource) -> Iterator[dict[str, Any]]:
+    """Every entry of the account's calendar list (id and summary only), across all pages."""
+    page_token: str | None = None
+    while True:
+        response = (
+            service.calendarList()
+            .list(pageToken=page_token, maxResults=CALENDAR_LIST_PAGE_SIZE, fields=CALENDAR_LIST_FIELDS)
+            .execute()
+        )
+        yield from response.get("items", [])
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return
+
+
+def find_calendar(service: Resource, summary: str) -> str | None:
+    for calendar_entry in iter_calendars(service):
+        if calendar_entry.get("summary") == summary:
+            return calendar_entry["id"]
+    return None
+
+
+def delete_calendars(service: Resource, calendar_ids: list[str]) -> int:
+    """Delete calendars in batch requests and return how many are gone (already missing ones count)."""
+    if not calendar_ids:
+        return 0
+    calendars = service.calendars()
+    requests = [
+        (f"delete-{index}", calendars.delete(calendarId=calendar_id)) for index, calendar_id in enumerate(calendar_ids)
+    ]
+    outcome = BatchExecutor(service).execute(requests)
+    failed = [error for error in outcome.errors.values() if error_status(error) not in (404, 410)]
+    return len(calendar_ids) - len(failed)
+
+
+def delete_old_calendars(service: Resource, prefix: str = LEGACY_CALENDAR_PREFIX) -> int:
+    """Delete every calendar whose name starts with ``prefix`` and return how many were deleted."""
+    try:
+        old = [entry for entry in iter_calendars(service) if entry.get("summary", "").startswith(prefix)]
+    except HttpError as error:
+        logger.error(f"Error occurred: {error}")
+        return 0
+    for calendar_entry in old:
+        logger.debug(f"Deleting calendar: {calendar_entry['summary']} (ID: {calendar_entry['id']})")
+    deleted = delete_calendars(service, [entry["id"] for entry in old])
+    if old:
+        logger.info(f"Deleted {deleted} of {len(old)} calendars named {prefix}*")
+    return deleted
@@ -0,0 +1,188 @@
+import os
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+import google_auth_httplib2
+import httplib2
+from google.auth.exceptions import RefreshError
+from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import Resource, build
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest
+
+from src.config import (
+    DEFAULT_USER,
+    GOOGLE_HTTP_TIMEOUT_SECONDS,
+    SCOPES,
+    TOKEN_PATH,
+    TOKEN_REFRESH_MARGIN_SECONDS,
+    TOKENS_DIR,
+)
+from src.utils.custom_logger import google_api_logger as logger
+
+
+class CalendarServiceManager:
+    """Process-wide owner of the Calendar credentials and the built API resource.
+
+    The resource is built once from the bundled (static) discovery document.
+    ``httplib2.Http`` is not thread-safe, so every thread gets its own
+    authorized transport through ``requestBuilder`` while sharing the resource.
+    Tokens are refreshed ahead of expiry under a lock and persisted atomically.
+    """
+
+    def __init__(self, token_path: str, scopes: list[str], refresh_margin_seconds: int) -> None:
+        self.token_path = token_path
+        self.scopes = scopes
+        self.refresh_margin = timedelta(seconds=refresh_margin_seconds)
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._credentials: Credentials | None = None
+        self._token_mtime: float | None = None
+        self._service: Resource | None = None
+
+    def _token_file_mtime(self) -> float | None:
+        try:
+            return os.path.getmtime(self.token_path)
+        except OSError:
+            return None
+
+    def _load(self) -> None:
+        mtime = self._token_file_mtime()
+        if mtime == self._token_mtime and self._credentials is not None:
+            return
+        self._token_mtime = mtime
+        self._credentials = None
+        self._service = None
+        if mtime is not None:
+            self._credentials = Credentials.from_authorized_user_file(self.token_path, self.scopes)
+
+    def _needs_refresh(self, creds: Credentials) -> bool:
+        if not creds.token or creds.expiry is None:
+            return not creds.valid
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        return creds.expiry - now <= self.refresh_margin
+
+    def save(self, creds: Credentials) -> None:
+        """Write ``creds`` to the token file atomically and make them current."""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.token_path) or ".", exist_ok=True)
+            tmp_path = f"{self.token_path}.tmp"
+            with open(tmp_path, "w") as token:
+                token.write(creds.to_json())
+            os.replace(tmp_path, self.token_path)
+            self._credentials = creds
+            self._token_mtime = self._token_file_mtime()
+
+    def invalidate(self) -> None:
+        """Forget cached credentials and the built resource (e.g. after the token file changed)."""
+        with self._lock:
+            self._credentials = None
+            self._token_mtime = None
+            self._service = None
+
+    def credentials(self) -> Credentials | None:
+        with self._lock:
+            self._load()
+            creds = self._credentials
+            if creds is None:
+                return None
+            if self._needs_refresh(creds):
+                if not creds.refresh_token:
+                    logger.info("No valid credentials found. Visit /login to authorize the application.")
+                    return None
+                logger.info("Refreshing credentials ahead of expiry")
+                try:
+                    creds.refresh(Request())
+                except RefreshError as e:
+                    logger.error(f"Could not refresh credentials: {e}")
+                    return None
+                logger.info("Saving credentials to token.json")
+                self.save(creds)
+            return creds
+
+    def _thread_http(self, creds: Credentials) -> google_auth_httplib2.AuthorizedHttp:
+        http = getattr(self._local, "http", None)
+        if http is None or http.credentials is not creds:
+            http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=GOOGLE_HTTP_TIMEOUT_SECONDS))
+            self._local.http = http
+        return http
+
+    def _build_request(self, http: Any, *args: Any, **kwargs: Any) -> HttpRequest:
+        creds = self.credentials()
+        if creds is None:
+            raise RefreshError("Google credentials are no longer available")
+        return HttpRequest(self._thread_http(creds), *args, **kwargs)
+
+    def service(self) -> Resource | None:
+        creds = self.credentials()
+        if creds is None:
+            return None
+        with self._lock:
+            if self._service is None:
+                try:
+                    logger.info("Building calendar service")
+                    self._service = build(
+                        "calendar",
+                        "v3",
+                        credentials=creds,
+                        static_discovery=True,
+                        cache_discovery=False,
+                        requestBuilder=self._build_request,
+                    )
+                except HttpError as error:
+                    logger.error(f"An error occurred: {error}")
+                    return None
+            return self._service
+
+
+def google_account(creds: Credentials) -> str:
+    """The Google account ``creds`` act for: the id of its primary calendar, i.e. its email address.
+
+    Raises ``HttpError`` when the Calendar API cannot be reached with ``creds``.
+    """
+    service = build("calendar", "v3", credentials=creds, static_discovery=True, cache_discovery=False)
+    return service.calendars().get(calendarId="primary", fields="id").execute()["id"]
+
+
+USER_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.@-]{1,64}$")
+
+
+class CalendarAccounts:
+    """One ``CalendarServiceManager`` per user, each with its own token file.
+
+    ``DEFAULT_USER`` keeps the original single-account ``TOKEN_PATH``; other
+    users' tokens live in ``TOKENS_DIR/<user_id>.json``.
+    """
+
+    def __init__(self, tokens_dir: str, default_token_path: str, scopes: list[str], refresh_margin_seconds: int) -> None:
+        self.tokens_dir = tokens_dir
+        self.default_token_path = default_token_path
+        self.scopes = scopes
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self._managers: dict[str, CalendarServiceManager] = {}
+        self._lock = threading.Lock()
+
+    def token_path(self, user_id: str) -> str:
+        if user_id == DEFAULT_USER:
+            return self.default_token_path
+        if not USER_ID_PATTERN.match(user_id):
+            raise ValueError(f"Invalid user id: {user_id!r}")
+        return os.path.join(self.tokens_dir, f"{user_id}.json")
+
+    def manager(self, user_id: str = DEFAULT_USER) -> CalendarServiceManager:
+        token_path = self.token_path(user_id)
+        with self._lock:
+            manager = self._managers.get(user_id)
+            if manager is None:
+                manager = CalendarServiceManager(token_path, self.scopes, self.refresh_margin_seconds)
+                self._managers[user_id] = manager
+            return manager
+
+    def has_token(self, user_id: str) -> bool:
+        return os.path.exists(self.token_path(user_id))
+
+
+calendar_accounts = CalendarAccounts(TOKENS_DIR, TOKEN_PATH, SCOPES, TOKEN_REFRESH_MARGIN_SECONDS)
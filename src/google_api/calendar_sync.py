@@ -0,0 +1,206 @@
+import hashlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any
+
+import pytz
+from googleapiclient.discovery import Resource
+
+from src.config import TIMEZONE
+from src.google_api.batch_executor import BatchExecutor, error_status
+from src.models.lesson import Lesson, keyed_lessons
+from src.utils.custom_logger import google_api_logger as logger
+from src.utils.progress import emit
+
+LESSON_KEY_PROPERTY = "watLessonKey"
+LESSON_HASH_PROPERTY = "watLessonHash"
+
+_LOCAL_TZ = pytz.timezone(TIMEZONE)
+
+
+@dataclass
+class SyncPlan:
+    inserts: list[dict[str, Any]] = field(default_factory=list)
+    patches: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
+    deletes: list[str] = field(default_factory=list)
+    unchanged: int = 0
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.inserts or self.patches or self.deletes)
+
+
+@dataclass
+class SyncResult:
+    calendar_id: str
+    inserted: int = 0
+    patched: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    failed: int = 0
+    batches: int = 0
+    retried: int = 0
+
+
+def _local_datetime(lesson: Lesson, moment: time | None) -> str:
+    return datetime.combine(lesson.day, moment or time.min).isoformat()
+
+
+def build_event(lesson: Lesson, key: str) -> dict[str, Any]:
+    event: dict[str, Any] = {
+        "summary": lesson.subject,
+        "location": lesson.location,
+        "description": lesson.description,
+        "start": {
+            "dateTime": _local_datetime(lesson, lesson.start),
+            "timeZone": TIMEZONE,
+        },
+        "end": {
+            "dateTime": _local_datetime(lesson, lesson.end),
+            "timeZone": TIMEZONE,
+        },
+    }
+    fingerprint = "|".join(
+        [event["summary"], event["location"], event["description"], event["start"]["dateTime"], event["end"]["dateTime"]]
+    )
+    event["extendedProperties"] = {
+        "private": {
+            LESSON_KEY_PROPERTY: key,
+            LESSON_HASH_PROPERTY: hashlib.sha1(fingerprint.encode("utf-8")).hexdigest(),
+        }
+    }
+    return event
+
+
+def build_desired_events(schedule_data: list[Lesson]) -> dict[str, dict[str, Any]]:
+    """Map lesson keys to event bodies. Repeated keys get an occurrence suffix."""
+    return {key: build_event(lesson, key) for key, lesson in keyed_lessons(schedule_data).items()}
+
+
+def schedule_window(window: tuple[date, date]) -> tuple[str, str]:
+    """RFC3339 [timeMin, timeMax) covering every day of ``window``."""
+    time_min = _LOCAL_TZ.localize(datetime.combine(window[0], time.min))
+    time_max = _LOCAL_TZ.localize(datetime.combine(window[1] + timedelta(days=1), time.min))
+    return time_min.isoformat(), time_max.isoformat()
+
+
+def list_managed_events(
+    service: Resource, calendar_id: str, time_min: str, time_max: str
+) -> dict[str, dict[str, Any]]:
+    """Return events tagged with a lesson key inside the window, keyed by that lesson key."""
+    existing: dict[str, dict[str, Any]] = {}
+    page_token: str | None = None
+    while True:
+        response = (
+            service.events()
+            .list(
+                calendarId=calendar_id,
+                timeMin=time_min,
+                timeMax=time_max,
+                singleEvents=True,
+                showDeleted=False,
+                maxResults=2500,
+                pageToken=page_token,
+                fields="items(id,extendedProperties/private),nextPageToken",
+            )
+            .execute()
+        )
+        for event in response.get("items", []):
+            private = event.get("extendedProperties", {}).get("private", {})
+            key = private.get(LESSON_KEY_PROPERTY)
+            if key:
+                existing[key] = event
+        page_token = response.get("nextPageToken")
+        if not page_token:
+            return existing
+
+
+def compute_sync_plan(
+    desired: dict[str, dict[str, Any]], existing: dict[str, dict[str, Any]]
+) -> SyncPlan:
+    plan = SyncPlan()
+    for key, event in desired.items():
+        current = existing.get(key)
+        if current is None:
+            plan.inserts.append(event)
+            continue
+        current_hash = current.get("extendedProperties", {}).get("private", {}).get(LESSON_HASH_PROPERTY)
+        if current_hash == event["extendedProperties"]["private"][LESSON_HASH_PROPERTY]:
+            plan.unchanged += 1
+        else:
+            plan.patches.append((current["id"], event))
+    for key, current in existing.items():
+        if key not in desired:
+            plan.deletes.append(current["id"])
+    return plan
+
+
+def apply_sync_plan(service: Resource, calendar_id: str, plan: SyncPlan) -> SyncResult:
+    events = service.events()
+    requests: list[tuple[str, Any]] = []
+    for index, body in enumerate(plan.inserts):
+        requests.append((f"insert-{index}", events.insert(calendarId=calendar_id, body=body)))
+    for index, (event_id, body) in enumerate(plan.patches):
+        requests.append((f"patch-{index}", events.patch(calendarId=calendar_id, eventId=event_id, body=body)))
+    for index, event_id in enumerate(plan.deletes):
+        requests.append((f"delete-{index}", events.delete(calendarId=calendar_id, eventId=event_id)))
+
+    outcome = BatchExecutor(service).execute(requests)
+    # An event that is already gone is as good as deleted.
+    failed = {
+        request_id
+        for request_id, error in outcome.errors.items()
+        if not (request_id.startswith("delete-") and error_status(error) in (404, 410))
+    }
+
+    def failed_count(kind: str) -> int:
+        return sum(1 for request_id in failed if request_id.startswith(f"{kind}-"))
+
+    logger.info(f"Batch summary for {calendar_id}: {outcome.summary()}")
+    return SyncResult(
+        calendar_id=calendar_id,
+        inserted=len(plan.inserts) - failed_count("insert"),
+        patched=len(plan.patches) - failed_count("patch"),
+        deleted=len(plan.deletes) - failed_count("delete"),
+        unchanged=plan.unchanged,
+        failed=len(failed),
+        batches=outcome.batches,
+        retried=outcome.retried,
+    )
+
+
+def sync_events(
+    service: Resource,
+    calendar_id: str,
+    schedule_data: list[Lesson],
+    window: tuple[date, date],
+    new_calendar: bool = False,
+) -> SyncResult:
+    """Bring the calendar in line with the scraped lessons, sending only the delta.
+
+    Only events inside ``window``, the days the scrape covered, are considered:
+    weeks that were not scraped are left untouched, while events of cancelled
+    lessons anywhere in the window, first and last day included, are deleted.
+    A ``new_calendar`` has no events yet, so it is not listed.
+    """
+    desired = build_desired_events(schedule_data)
+    existing: dict[str, dict[str, Any]] = {}
+    if not new_calendar:
+        time_min, time_max = schedule_window(window)
+        existing = list_managed_events(service, calendar_id, time_min, time_max)
+
+    plan = compute_sync_plan(desired, existing)
+    logger.info(
+        f"Sync plan for {calendar_id}: {len(plan.inserts)} inserts, {len(plan.patches)} patches, "
+        f"{len(plan.deletes)} deletes, {plan.unchanged} unchanged"
+    )
+    emit(
+        "sync_plan",
+        inserts=len(plan.inserts),
+        patches=len(plan.patches),
+        deletes=len(plan.deletes),
+        unchanged=plan.unchanged,
+    )
+    if plan.is_empty:
+        return SyncResult(calendar_id=calendar_id, unchanged=plan.unchanged)
+    return apply_sync_plan(service, calendar_id, plan)
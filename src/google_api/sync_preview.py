@@ -0,0 +1,123 @@
+import math
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from typing import Any
+
+from googleapiclient.discovery import Resource
+
+from src.config import CALENDAR_BATCH_SECONDS_ESTIMATE, CALENDAR_BATCH_SIZE, CALENDAR_READ_SECONDS_ESTIMATE
+from src.google_api.calendar_sync import (
+    LESSON_KEY_PROPERTY,
+    SyncPlan,
+    build_desired_events,
+    compute_sync_plan,
+    list_managed_events,
+    schedule_window,
+)
+from src.models.lesson import Lesson
+from src.utils.metrics import calendar_batch_seconds
+
+EVENTS_LIST_PAGE_SIZE = 2500
+
+
+@dataclass
+class SyncCost:
+    """Calendar API calls a sync would make. Every sub-request of a batch counts against the quota."""
+
+    read_requests: int
+    write_requests: int
+    batches: int
+    http_requests: int
+    quota_units: int
+    expected_seconds: float
+
+
+@dataclass
+class SyncPreview:
+    calendar_id: str | None
+    operations: list[dict[str, Any]] = field(default_factory=list)
+    unchanged: int = 0
+    cost: SyncCost | None = None
+
+    def counts(self) -> dict[str, int]:
+        counts = {"insert": 0, "patch": 0, "delete": 0, "create_calendar": 0}
+        for operation in self.operations:
+            counts[operation["op"]] += 1
+        return counts
+
+    def as_dict(self, include_operations: bool = True) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "calendar_id": self.calendar_id,
+            **self.counts(),
+            "unchanged": self.unchanged,
+            "cost": asdict(self.cost) if self.cost else None,
+        }
+        if include_operations:
+            data["operations"] = self.operations
+        return data
+
+
+def _event_operation(op: str, event: dict[str, Any], event_id: str | None = None) -> dict[str, Any]:
+    private = event.get("extendedProperties", {}).get("private", {})
+    operation: dict[str, Any] = {"op": op, "key": private.get(LESSON_KEY_PROPERTY)}
+    if event_id or event.get("id"):
+        operation["event_id"] = event_id or event.get("id")
+    if "summary" in event:
+        operation["summary"] = event["summary"]
+        operation["start"] = event["start"]["dateTime"]
+    return operation
+
+
+def describe_plan(plan: SyncPlan, existing: dict[str, dict[str, Any]]) -> list[dict[str, Any]]:
+    """The plan as a flat list of insert/patch/delete operations, in the order the sync sends them."""
+    by_id = {event["id"]: event for event in existing.values()}
+    operations = [_event_operation("insert", event) for event in plan.inserts]
+    operations += [_event_operation("patch", event, event_id) for event_id, event in plan.patches]
+    operations += [_event_operation("delete", by_id.get(event_id, {}), event_id) for event_id in plan.deletes]
+    return operations
+
+
+def estimate_cost(writes: int, existing: int, calendar_known: bool, batch_size: int = CALENDAR_BATCH_SIZE) -> SyncCost:
+    """Requests, batches and latency of a sync, timed with this process' real batch latency when available."""
+    batches = math.ceil(writes / batch_size) if writes else 0
+    if calendar_known:
+        # Listing the managed events of the window, one page at a time.
+        reads = max(1, math.ceil(existing / EVENTS_LIST_PAGE_SIZE))
+        direct = reads
+    else:
+        # Looking the calendar up and listing legacy calendars to clean up, then creating it outside any batch;
+        # the new calendar has no events to list.
+        reads = 2
+        direct = 3
+        writes += 1
+    batch_seconds = calendar_batch_seconds.mean() or CALENDAR_BATCH_SECONDS_ESTIMATE
+    return SyncCost(
+        read_requests=reads,
+        write_requests=writes,
+        batches=batches,
+        http_requests=direct + batches,
+        quota_units=reads + writes,
+        expected_seconds=round(direct * CALENDAR_READ_SECONDS_ESTIMATE + batches * batch_seconds, 3),
+    )
+
+
+def preview_sync(
+    service: Resource,
+    calendar_id: str | None,
+    schedule_data: list[Lesson],
+    window: tuple[date, date],
+) -> SyncPreview:
+    """What ``sync_events`` would send to ``calendar_id`` (None: the calendar does not exist yet), read-only."""
+    desired = build_desired_events(schedule_data)
+    existing: dict[str, dict[str, Any]] = {}
+    if calendar_id is not None:
+        time_min, time_max = schedule_window(window)
+        existing = list_managed_events(service, calendar_id, time_min, time_max)
+
+    plan = compute_sync_plan(desired, existing)
+    preview = SyncPreview(calendar_id=calendar_id, operations=describe_plan(plan, existing), unchanged=plan.unchanged)
+    if calendar_id is None:
+        preview.operations.insert(0, {"op": "create_calendar"})
+    writes = len(plan.inserts) + len(plan.patches) + len(plan.deletes)
+    preview.cost = estimate_cost(writes, len(existing), calendar_known=calendar_id is not None)
+    return preview
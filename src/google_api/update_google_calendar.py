@@ -1,40 +1,45 @@
-import os
-from datetime import date, datetime
-from typing import Any
+import threading
+from datetime import date
 
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import Resource, build
+from googleapiclient.discovery import Resource
 from googleapiclient.errors import HttpError
 
-from src.config import SCOPES, TOKEN_PATH, TIMEZONE
+from src.config import (
+    CALENDAR_NAME_TEMPLATE,
+    DEFAULT_GROUP,
+    DEFAULT_USER,
+    LEGACY_CALENDAR_PREFIX,
+    TIMEZONE,
+)
+from src.google_api.batch_executor import error_status
+from src.google_api.calendar_housekeeping import delete_old_calendars, find_calendar
+from src.google_api.calendar_service import calendar_accounts
+from src.google_api.calendar_sync import SyncResult, sync_events
+from src.google_api.sync_preview import SyncPreview, preview_sync
+from src.models.lesson import Lesson
+from src.scraper.scheduler_scraper import week_window
+from src.store.subscription_store import subscription_store
 from src.utils.custom_logger import google_api_logger as logger
 
+_calendar_locks: dict[tuple[str, str], threading.Lock] = {}
+_calendar_locks_lock = threading.Lock()
 
-def get_calendar_service() -> Resource | None:
-    creds: Credentials | None = None
 
-    if os.path.exists(TOKEN_PATH):
-        creds = Credentials.from_authorized_user_file(TOKEN_PATH, SCOPES)
+def calendar_lock(user_id: str, group: str) -> threading.Lock:
+    """Lock serializing every change to one account's calendar of ``group``.
 
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            logger.info("Refreshing expired credentials")
-            creds.refresh(Request())
-        else:
-            logger.info("No valid credentials found. Visit /login to authorize the application.")
-            return None
+    Without it two concurrent syncs could both miss the calendar and create
+    duplicates, or patch and delete the same events against each other.
+    """
+    with _calendar_locks_lock:
+        lock = _calendar_locks.get((user_id, group))
+        if lock is None:
+            lock = _calendar_locks[(user_id, group)] = threading.Lock()
+        return lock
 
-        logger.info("Saving credentials to token.json")
-        with open(TOKEN_PATH, "w") as token:
-            token.write(creds.to_json())
 
-    try:
-        logger.info("Building calendar service")
-        return build("calendar", "v3", credentials=creds)
-    except HttpError as error:
-        logger.error(f"An error occurred: {error}")
-        return None
+def get_calendar_service(user_id: str = DEFAULT_USER) -> Resource | None:
+    return calendar_accounts.manager(user_id).service()
 
 
 def create_calendar(service: Resource, calendar_name: str) -> str | None:
@@ -51,89 +56,127 @@ def create_calendar(service: Resource, calendar_name: str) -> str | None:
         return None
 
 
-def delete_old_calendars(service: Resource, prefix: str = "WAT-calendar") -> None:
+def lookup_group_calendar(service: Resource, group: str, user_id: str = DEFAULT_USER) -> str | None:
+    """Id of the account's existing calendar for ``group`` (cached, else looked up by name), or None.
+
+    Raises ``HttpError`` when the calendar list cannot be read.
+    """
+    calendar_id = subscription_store.calendar_id(user_id, group)
+    if calendar_id:
+        return calendar_id
+    calendar_id = find_calendar(service, CALENDAR_NAME_TEMPLATE.format(group=group))
+    if calendar_id:
+        subscription_store.remember_calendar(user_id, group, calendar_id)
+    return calendar_id
+
+
+def get_group_calendar(service: Resource, group: str, user_id: str = DEFAULT_USER) -> tuple[str | None, bool]:
+    """Id of the account's calendar for ``group`` (cached, else looked up by name, else created) and
+    whether it was created just now.
+
+    Only the first sync of a group (or one after the calendar disappeared) lists
+    the account's calendars; every later run uses the cached id.
+    """
     try:
-        calendar_result = service.calendarList().list().execute()
-        for calendar_entry in calendar_result["items"]:
-            if calendar_entry["summary"].startswith(prefix):
-                calendar_id = calendar_entry["id"]
-                logger.debug(f"Deleting calendar: {calendar_entry['summary']} (ID: {calendar_id})")
-                service.calendars().delete(calendarId=calendar_id).execute()
-                logger.debug(f"Deleted calendar: {calendar_entry['summary']} (ID: {calendar_id})")
-    except HttpError as error:
-        logger.error(f"Error occurred: {error}")
-
-
-def update_calendar_with_schedule(service: Resource, schedule_data: list[dict[str, Any]]) -> None:
+        calendar_id = lookup_group_calendar(service, group, user_id)
+    except HttpError as e:
+        logger.error(f"An error occurred: {e}")
+        return None, False
+    if calendar_id:
+        return calendar_id, False
+
+    calendar_name = CALENDAR_NAME_TEMPLATE.format(group=group)
+    delete_old_calendars(service, prefix=LEGACY_CALENDAR_PREFIX)
+    logger.info(f"Creating new calendar: {calendar_name}")
+    calendar_id = create_calendar(service, calendar_name)
+    if calendar_id:
+        subscription_store.remember_calendar(user_id, group, calendar_id)
+    return calendar_id, calendar_id is not None
+
+
+def update_calendar_with_schedule(
+    service: Resource,
+    schedule_data: list[Lesson],
+    group: str = DEFAULT_GROUP,
+    window: tuple[date, date] | None = None,
+    user_id: str = DEFAULT_USER,
+) -> SyncResult | None:
     logger.info(f"Starting calendar update with {len(schedule_data)} events")
+    if not schedule_data:
+        logger.warning("Refusing to sync an empty schedule")
+        return None
+    # Without a range the lessons are one scraped week: sync all of it, not just the days that still have lessons.
+    window = window or week_window()
 
     try:
-        delete_old_calendars(service, prefix="WAT-calendar")
-        logger.info("Old calendars deleted")
-
-        calendar_name = f"WAT-calendar+{date.today().isoformat()}"
-        logger.info(f"Creating new calendar: {calendar_name}")
-        calendar_id = create_calendar(service, calendar_name)
-
+        calendar_id, created = get_group_calendar(service, group, user_id)
         if not calendar_id:
-            logger.error("Failed to create new calendar")
-            return
-
-        logger.info(f"Created new calendar ID: {calendar_id}")
-
-        def batch_callback(request_id: str, response: Any, exception: Exception | None) -> None:
-            if exception is not None:
-                logger.error(f"Error in batch request {request_id}: {exception}")
-            else:
-                logger.debug(f"Event created successfully: {response.get('id', 'unknown')}")
-
-        batch = service.new_batch_http_request(callback=batch_callback)
-        batch_start_index = 0
-
-        for index, lesson in enumerate(schedule_data):
-            try:
-                start_date = datetime.strptime(lesson["Start Date"], "%d/%m/%Y").strftime("%Y-%m-%d")
-                end_date = datetime.strptime(lesson["End Date"], "%d/%m/%Y").strftime("%Y-%m-%d")
-
-                event: dict[str, Any] = {
-                    "summary": lesson["Subject"],
-                    "location": lesson["Location"],
-                    "description": lesson["Description"],
-                    "start": {
-                        "dateTime": f"{start_date}T{lesson['Start Time']}:00",
-                        "timeZone": TIMEZONE,
-                    },
-                    "end": {
-                        "dateTime": f"{end_date}T{lesson['End Time']}:00",
-                        "timeZone": TIMEZONE,
-                    },
-                }
-
-                batch.add(service.events().insert(calendarId=calendar_id, body=event))
-
-                if (index + 1) % 50 == 0:
-                    logger.info(f"Executing batch request for events {batch_start_index + 1}-{index + 1}")
-                    batch.execute()
-                    batch = service.new_batch_http_request(callback=batch_callback)
-                    batch_start_index = index + 1
-
-            except Exception as e:
-                logger.error(f"Error creating event {index + 1}: {e}")
-
-        if len(batch._requests) > 0:
-            logger.info(f"Executing batch request for events {batch_start_index + 1}-{len(schedule_data)}")
-            batch.execute()
-
-        logger.info("Calendar update completed successfully")
+            logger.error(f"Failed to get calendar for group {group}")
+            return None
+
+        try:
+            result = sync_events(service, calendar_id, schedule_data, window, new_calendar=created)
+        except HttpError as e:
+            if error_status(e) not in (404, 410):
+                raise
+            # The cached calendar was deleted on Google's side: find or create it again.
+            logger.warning(f"Calendar {calendar_id} of group {group} is gone, looking it up again")
+            subscription_store.forget_calendars(user_id, group)
+            subscription_store.forget_synced(user_id, group)
+            calendar_id, created = get_group_calendar(service, group, user_id)
+            if not calendar_id:
+                logger.error(f"Failed to get calendar for group {group}")
+                return None
+            result = sync_events(service, calendar_id, schedule_data, window, new_calendar=created)
+        logger.info(
+            f"Calendar update completed: {result.inserted} inserted, {result.patched} patched, "
+            f"{result.deleted} deleted, {result.unchanged} unchanged, {result.failed} failed"
+        )
+        return result
     except Exception as e:
         logger.error(f"Error during calendar update: {e}")
+        return None
 
 
-def main(schedule_data: list[dict[str, Any]]) -> None:
-    service = get_calendar_service()
+def preview(
+    schedule_data: list[Lesson],
+    group: str = DEFAULT_GROUP,
+    window: tuple[date, date] | None = None,
+    user_id: str = DEFAULT_USER,
+) -> SyncPreview | None:
+    """What ``main`` would change in the account's calendar, without changing anything."""
+    if not schedule_data:
+        logger.warning("An empty schedule would not be synced")
+        return None
+    window = window or week_window()
+    service = get_calendar_service(user_id)
     if not service:
-        return
-    update_calendar_with_schedule(service, schedule_data)
+        return None
+    try:
+        calendar_id = lookup_group_calendar(service, group, user_id)
+        result = preview_sync(service, calendar_id, schedule_data, window)
+    except HttpError as e:
+        logger.error(f"Error during calendar preview: {e}")
+        return None
+    counts = result.counts()
+    logger.info(
+        f"Calendar preview for {group}: {counts['insert']} to insert, {counts['patch']} to patch, "
+        f"{counts['delete']} to delete, {result.unchanged} unchanged"
+    )
+    return result
+
+
+def main(
+    schedule_data: list[Lesson],
+    group: str = DEFAULT_GROUP,
+    window: tuple[date, date] | None = None,
+    user_id: str = DEFAULT_USER,
+) -> SyncResult | None:
+    service = get_calendar_service(user_id)
+    if not service:
+        return None
+    with calendar_lock(user_id, group):
+        return update_calendar_with_schedule(service, schedule_data, group, window, user_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+from .fanout import run_groups
@@ -0,0 +1,421 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Any
+
+from src.config import (
+    ACCOUNT_MAX_CONCURRENT_SYNCS,
+    ACCOUNT_SYNC_MIN_INTERVAL_SECONDS,
+    DEFAULT_USER,
+    FANOUT_MAX_WORKERS,
+    SCRAPE_GROUP_MIN_INTERVAL_SECONDS,
+    SYNC_MAX_WORKERS,
+)
+from src.jobs.revalidator import revalidator
+from src.models.lesson import Lesson, content_hash
+from src.scraper.http_client import default_client
+from src.scraper.lesson_parser import NO_LESSONS_ERROR
+from src.scraper.range_scraper import scrape_range_changes
+from src.scraper.scheduler_scraper import scrape_schedule_changes, week_window
+from src.store.lesson_index import lesson_index
+from src.store.snapshot_store import snapshot_store
+from src.store.subscription_store import subscription_store
+from src.utils.custom_logger import log_context, main_logger as logger
+from src.utils.metrics import group_job_seconds, group_stage_seconds
+from src.utils.progress import emit, emit_lessons
+from src.utils.rate_limiter import RateLimiter
+from src.utils.single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from src.google_api.calendar_sync import SyncResult
+    from src.google_api.sync_preview import SyncPreview
+
+group_limiter = RateLimiter(SCRAPE_GROUP_MIN_INTERVAL_SECONDS)
+account_limiter = RateLimiter(ACCOUNT_SYNC_MIN_INTERVAL_SECONDS)
+_account_slots: dict[str, threading.BoundedSemaphore] = {}
+_account_slots_lock = threading.Lock()
+sync_pool = ThreadPoolExecutor(max_workers=SYNC_MAX_WORKERS, thread_name_prefix="sync")
+group_flight: "SingleFlight[GroupResult]" = SingleFlight()
+
+
+@dataclass
+class GroupResult:
+    group: str
+    lessons: list[Lesson] | None = None
+    error: str | None = None
+    changed: bool = True
+    syncs: "dict[str, SyncResult | None]" = field(default_factory=dict)
+    previews: "dict[str, SyncPreview | None]" = field(default_factory=dict)
+    # Set when the scrape failed and ``lessons`` is the last good schedule instead.
+    stale_reason: str | None = None
+    scrape_seconds: float = 0.0
+    sync_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def stale(self) -> bool:
+        return self.stale_reason is not None
+
+    def as_dict(self, include_lessons: bool = False) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "group": self.group,
+            "lessons": len(self.lessons or []),
+            "error": self.error,
+            "changed": self.changed,
+            "stale": self.stale,
+            "scrape_seconds": round(self.scrape_seconds, 3),
+            "sync_seconds": round(self.sync_seconds, 3),
+        }
+        if self.stale:
+            data["stale_reason"] = self.stale_reason
+        if self.syncs:
+            data["sync"] = {user_id: asdict(sync) if sync else None for user_id, sync in self.syncs.items()}
+        if self.previews:
+            data["plan"] = {user_id: plan.as_dict() if plan else None for user_id, plan in self.previews.items()}
+        if include_lessons:
+            data["lessons"] = [lesson.to_dict() for lesson in self.lessons or []]
+        return data
+
+
+@dataclass
+class RunSummary:
+    results: list[GroupResult] = field(default_factory=list)
+    wall_seconds: float = 0.0
+    client_stats: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> int:
+        return sum(1 for result in self.results if result.ok)
+
+    @property
+    def failed(self) -> int:
+        return len(self.results) - self.succeeded
+
+    @property
+    def stale(self) -> int:
+        return sum(1 for result in self.results if result.stale)
+
+    @property
+    def lessons(self) -> int:
+        return sum(len(result.lessons or []) for result in self.results)
+
+    @property
+    def groups_per_second(self) -> float:
+        return len(self.results) / self.wall_seconds if self.wall_seconds else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "groups": len(self.results),
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "stale": self.stale,
+            "lessons": self.lessons,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "groups_per_second": round(self.groups_per_second, 3),
+            "results": [result.as_dict() for result in self.results],
+            "client": self.client_stats,
+        }
+
+
+def rate_limited_scrape(
+    group: str,
+    user_agent: str | None = None,
+    date_range: tuple[date, date] | None = None,
+    moment: datetime | None = None,
+) -> tuple[list[Lesson], None, bool] | tuple[None, str, bool]:
+    """Scrape the week containing ``moment`` (default: now), or every week of ``date_range``, for one group."""
+    group_limiter.acquire(group)
+    if date_range is not None:
+        return scrape_range_changes(group, date_range[0], date_range[1], user_agent)
+    return scrape_schedule_changes(group, user_agent, moment=moment)
+
+
+def record_snapshot(group: str, data: list[Lesson], window: tuple[date, date]) -> None:
+    """Persist a successful scrape and refresh the read index; store errors never fail the scrape."""
+    try:
+        if snapshot_store is not None:
+            snapshot_store.record(group, data, window)
+        lesson_index.refresh(group, data)
+    except Exception as e:
+        logger.error(f"Could not store snapshot of {group}: {e}")
+
+
+def last_good_schedule(group: str, date_range: tuple[date, date] | None = None) -> list[Lesson] | None:
+    """Stored lessons of ``group`` in ``date_range`` (default: the current week), or None if never scraped.
+
+    Store errors are logged and count as never scraped, so they never hide the scrape error.
+    """
+    try:
+        index = lesson_index.get(group)
+        if index is None:
+            return None
+        return index.lesson_models(*(date_range or week_window()))
+    except Exception as e:
+        logger.error(f"Could not read the last good schedule of {group}: {e}")
+        return None
+
+
+def _refresh_group(group: str, user_agent: str | None, sync: bool, date_range: tuple[date, date] | None) -> bool:
+    with log_context(group=group):
+        result = process_group(group, user_agent, sync, date_range)
+    return result.ok and not result.stale
+
+
+def serve_stale(
+    result: GroupResult,
+    error: str,
+    user_agent: str | None,
+    sync: bool,
+    date_range: tuple[date, date] | None,
+) -> bool:
+    """Answer a failed scrape with the last good schedule and retry it in the background.
+
+    Returns False (the error stands) when the site answered that the week has no
+    lessons, or when nothing of the requested days was ever stored.
+    """
+    if error == NO_LESSONS_ERROR:
+        return False
+    lessons = last_good_schedule(result.group, date_range)
+    if not lessons:
+        return False
+    logger.warning(
+        f"Scrape of {result.group} failed ({error}), serving the last good schedule ({len(lessons)} lessons)"
+    )
+    result.lessons = lessons
+    result.changed = False
+    result.stale_reason = error
+    emit("stale", reason=error)
+    emit_lessons(lessons)
+    group, key = result.group, f"{result.group}|{date_range!r}|{sync}"
+    revalidator.schedule(key, lambda: _refresh_group(group, user_agent, sync, date_range))
+    return True
+
+
+def _sync_hash(data: list[Lesson], window: tuple[date, date]) -> str:
+    return content_hash(data, salt=repr(window))
+
+
+def _account_slot(user_id: str) -> threading.BoundedSemaphore:
+    with _account_slots_lock:
+        slot = _account_slots.get(user_id)
+        if slot is None:
+            slot = threading.BoundedSemaphore(ACCOUNT_MAX_CONCURRENT_SYNCS)
+            _account_slots[user_id] = slot
+        return slot
+
+
+def sync_targets(group: str) -> list[str]:
+    """Users whose calendars follow ``group``: its subscribers plus the default account once authorized."""
+    from src.google_api.calendar_service import calendar_accounts
+
+    targets = subscription_store.subscribers(group)
+    if DEFAULT_USER not in targets and calendar_accounts.has_token(DEFAULT_USER):
+        targets.insert(0, DEFAULT_USER)
+    return targets
+
+
+def sync_account(user_id: str, group: str, data: list[Lesson], window: tuple[date, date]) -> "SyncResult | None":
+    """Sync one user's calendar of ``group``, within that account's concurrency and rate budget."""
+    # Imported on first use: the Google API client is the slowest import of the application.
+    from src.google_api.update_google_calendar import main as update_google_calendar
+
+    with _account_slot(user_id):
+        account_limiter.acquire(user_id)
+        with log_context(user=user_id):
+            return update_google_calendar(data, group, window, user_id)
+
+
+def sync_group(group: str, data: list[Lesson], window: tuple[date, date]) -> "dict[str, SyncResult | None]":
+    """Fan one scrape out to every calendar following ``group``.
+
+    Calendars already synced with this exact schedule are skipped; a calendar
+    is only marked synced once its sync fully succeeded, so failures retry on
+    the next run. An empty schedule is never synced.
+    """
+    if not data:
+        logger.warning(f"Not syncing an empty schedule of {group}")
+        return {}
+    digest = _sync_hash(data, window)
+    pending = [user_id for user_id in sync_targets(group) if subscription_store.synced_hash(user_id, group) != digest]
+    if not pending:
+        logger.info(f"All calendars of {group} are up to date")
+        return {}
+
+    futures = {
+        user_id: sync_pool.submit(contextvars.copy_context().run, sync_account, user_id, group, data, window)
+        for user_id in pending
+    }
+    results: dict[str, SyncResult | None] = {}
+    for user_id, future in futures.items():
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.exception(f"Sync of {group} for {user_id} failed: {e}")
+            result = None
+        results[user_id] = result
+        emit("sync", user=user_id, result=asdict(result) if result else None)
+        if result is not None and not result.failed:
+            subscription_store.mark_synced(user_id, group, digest)
+    return results
+
+
+def preview_account(user_id: str, group: str, data: list[Lesson], window: tuple[date, date]) -> "SyncPreview | None":
+    from src.google_api.update_google_calendar import preview
+
+    with log_context(user=user_id):
+        return preview(data, group, window, user_id)
+
+
+def plan_group(
+    group: str, user_agent: str | None = None, date_range: tuple[date, date] | None = None
+) -> GroupResult:
+    """Scrape ``group`` and preview the sync of each calendar a real run would update.
+
+    Nothing is stored and no calendar is written; calendars already synced with
+    this schedule are left out, as the real run would skip them.
+    """
+    result = GroupResult(group=group)
+    moment = datetime.now()
+    window = date_range or week_window(moment)
+    with log_context(group=group):
+        try:
+            started = time.perf_counter()
+            data, error, changed = rate_limited_scrape(group, user_agent, date_range, moment)
+            result.scrape_seconds = time.perf_counter() - started
+            if error:
+                result.error = error
+                return result
+            result.lessons = data
+            result.changed = changed
+            if date_range is None:
+                emit_lessons(data)
+
+            started = time.perf_counter()
+            digest = _sync_hash(data, window)
+            for user_id in sync_targets(group):
+                if subscription_store.synced_hash(user_id, group) == digest:
+                    continue
+                plan = preview_account(user_id, group, data, window)
+                result.previews[user_id] = plan
+                emit("plan", user=user_id, plan=plan.as_dict() if plan else None)
+            result.sync_seconds = time.perf_counter() - started
+            if not result.previews:
+                logger.info(f"All calendars of {group} are up to date")
+        except Exception as e:
+            logger.exception(f"Unexpected error while planning group {group}: {e}")
+            result.error = f"An unexpected error occurred: {e}"
+    return result
+
+
+def process_group(
+    group: str,
+    user_agent: str | None = None,
+    sync: bool = True,
+    date_range: tuple[date, date] | None = None,
+) -> GroupResult:
+    """Scrape ``group`` and sync it to its calendars.
+
+    Concurrent calls for the same group and range (a manual scrape during the
+    scheduled run, a feed request...) share one in-flight run and its result.
+    """
+    key = f"{group}|{date_range!r}|{sync}"
+    result, shared = group_flight.do(key, lambda: _process_group(group, user_agent, sync, date_range))
+    if shared:
+        logger.info(f"Joined the in-flight run of group {group}")
+        # The progress of the shared run went to its own caller; replay the lessons for this one.
+        with log_context(group=group):
+            emit_lessons(result.lessons or [])
+    return result
+
+
+def _process_group(
+    group: str,
+    user_agent: str | None,
+    sync: bool,
+    date_range: tuple[date, date] | None,
+) -> GroupResult:
+    result = GroupResult(group=group)
+    # The days this scrape covers; a single-week scrape is pinned to its week even across midnight on Sunday.
+    moment = datetime.now()
+    window = date_range or week_window(moment)
+    with log_context(group=group):
+        try:
+            started = time.perf_counter()
+            data, error, changed = rate_limited_scrape(group, user_agent, date_range, moment)
+            result.scrape_seconds = time.perf_counter() - started
+            group_stage_seconds.observe(result.scrape_seconds, group=group, stage="scrape")
+            if error:
+                # A failed scrape never reaches the sync: calendars keep their events until fresh data arrives.
+                if not serve_stale(result, error, user_agent, sync, date_range):
+                    result.error = error
+                return result
+            result.lessons = data
+            result.changed = changed
+            if date_range is None:
+                # Range scrapes already reported their lessons week by week.
+                emit_lessons(data)
+            record_snapshot(group, data, window)
+
+            if sync:
+                started = time.perf_counter()
+                result.syncs = sync_group(group, data, window)
+                result.sync_seconds = time.perf_counter() - started
+                group_stage_seconds.observe(result.sync_seconds, group=group, stage="sync")
+        except Exception as e:
+            logger.exception(f"Unexpected error while processing group {group}: {e}")
+            result.error = f"An unexpected error occurred: {e}"
+        finally:
+            group_job_seconds.observe(
+                result.scrape_seconds + result.sync_seconds,
+                group=group,
+                outcome="stale" if result.stale else "ok" if result.ok else "error",
+            )
+    return result
+
+
+def run_groups(
+    groups: list[str],
+    user_agent: str | None = None,
+    sync: bool = True,
+    max_workers: int = FANOUT_MAX_WORKERS,
+    date_range: tuple[date, date] | None = None,
+) -> RunSummary:
+    """Scrape (and optionally sync) every group in a bounded thread pool."""
+    summary = RunSummary()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fanout") as executor:
+        # Each task runs in a copy of the caller's context so the job id follows it into the pool.
+        futures = {
+            executor.submit(contextvars.copy_context().run, process_group, group, user_agent, sync, date_range): group
+            for group in groups
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            summary.results.append(result)
+            emit("group", group=result.group, result=result.as_dict())
+            if result.stale:
+                logger.warning(f"Group {result.group}: served {len(result.lessons or [])} stale lessons")
+            elif result.ok:
+                state = "changed" if result.changed else "unchanged"
+                logger.info(
+                    f"Group {result.group}: {len(result.lessons or [])} lessons, {state} "
+                    f"(scrape {result.scrape_seconds:.2f}s, sync {result.sync_seconds:.2f}s)"
+                )
+            else:
+                logger.error(f"Group {result.group} failed: {result.error}")
+    summary.wall_seconds = time.perf_counter() - started
+    summary.client_stats = default_client.stats()
+
+    logger.info(
+        f"Fan-out run finished: {summary.succeeded}/{len(summary.results)} groups succeeded "
+        f"({summary.stale} from the last good schedule), "
+        f"{summary.lessons} lessons in {summary.wall_seconds:.2f}s "
+        f"({summary.groups_per_second:.2f} groups/s), scraper client: {summary.client_stats}"
+    )
+    return summary
@@ -0,0 +1,139 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable
+
+from src.config import JOB_QUEUE_MAX_WORKERS, JOB_RETENTION_SECONDS
+from src.utils.custom_logger import log_context, main_logger as logger
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+@dataclass
+class Job:
+    kind: str
+    key: str
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: Any = None
+    error: str | None = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+    def as_dict(self) -> dict[str, Any]:
+        queued_until = self.started_at or time.time()
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "key": self.key,
+            "status": self.status.value,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "queue_seconds": round(queued_until - self.created_at, 3),
+            "run_seconds": round(self.finished_at - self.started_at, 3)
+            if self.started_at and self.finished_at
+            else None,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """In-process worker pool for scrape/sync jobs.
+
+    A job submitted under a key that already has a queued or running job is
+    merged into that job instead of being scheduled again. With ``reuse_seconds``
+    a job that succeeded that recently under the same key is returned instead
+    of running again, unless ``reuse_if`` rejects its result. Finished jobs
+    stay queryable for ``retention_seconds``.
+    """
+
+    def __init__(self, max_workers: int, retention_seconds: int) -> None:
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: dict[str, Job] = {}
+        self._in_flight: dict[str, Job] = {}
+        self._succeeded: dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        key: str,
+        func: Callable[[], Any],
+        reuse_seconds: float = 0.0,
+        reuse_if: Callable[[Any], bool] | None = None,
+    ) -> tuple[Job, bool]:
+        """Queue ``func`` and return ``(job, created)``; ``created`` is False when merged or reused."""
+        with self._lock:
+            self._prune()
+            existing = self._in_flight.get(key)
+            if existing is not None:
+                logger.info(f"Merged {kind} request into in-flight job {existing.id} ({key})")
+                return existing, False
+            recent = self._succeeded.get(key)
+            if (
+                recent is not None
+                and recent.finished_at >= time.time() - reuse_seconds
+                and (reuse_if is None or reuse_if(recent.result))
+            ):
+                logger.info(f"Reused {kind} job {recent.id} ({key}) finished {time.time() - recent.finished_at:.0f}s ago")
+                return recent, False
+            job = Job(kind=kind, key=key)
+            self._jobs[job.id] = job
+            self._in_flight[key] = job
+        self._executor.submit(self._run, job, func)
+        logger.info(f"Queued {kind} job {job.id} ({key})")
+        return job, True
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: Job, func: Callable[[], Any]) -> None:
+        with log_context(job_id=job.id):
+            self._execute(job, func)
+
+    def _execute(self, job: Job, func: Callable[[], Any]) -> None:
+        job.started_at = time.time()
+        job.status = JobStatus.RUNNING
+        try:
+            job.result = func()
+            job.status = JobStatus.SUCCEEDED
+        except Exception as e:
+            logger.exception(f"Job {job.id} ({job.key}) failed: {e}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                if self._in_flight.get(job.key) is job:
+                    del self._in_flight[job.key]
+                if job.status is JobStatus.SUCCEEDED:
+                    self._succeeded[job.key] = job
+            logger.info(f"Job {job.id} ({job.key}) {job.status.value} in {job.finished_at - job.started_at:.2f}s")
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.done and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+        for key in [key for key, job in self._succeeded.items() if job.finished_at < cutoff]:
+            del self._succeeded[key]
+
+
+job_queue = JobQueue(JOB_QUEUE_MAX_WORKERS, JOB_RETENTION_SECONDS)
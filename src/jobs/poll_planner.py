@@ -0,0 +1,144 @@
+import math
+import random
+import threading
+import time
+from datetime import date, datetime
+
+from src.config import (
+    POLL_CHANGE_RATE_ALPHA,
+    POLL_JITTER_RATIO,
+    POLL_MAX_INTERVAL_HOURS,
+    POLL_MIN_INTERVAL_HOURS,
+    POLL_STARTUP_SPREAD_MINUTES,
+    SCHEDULE_INTERVAL_HOURS,
+    SCHEDULE_RUN_ON_STARTUP,
+)
+from src.models.lesson import Lesson, content_hash
+from src.scraper.scheduler_scraper import week_key
+from src.store.poll_state_store import PollState, PollStateStore, poll_state_store
+from src.utils.custom_logger import scheduler_logger as logger
+from src.utils.metrics import group_change_rate, group_poll_interval_seconds
+
+
+class PollPlanner:
+    """Decides when each group is scraped next, from how often its plan changed so far.
+
+    Every successful scrape is one observation: its content hash either differs
+    from the previous one or not. The per-group change rate is an exponential
+    moving average of those observations, and the interval follows it
+    geometrically, from ``max_interval`` for a plan that never changes down to
+    ``min_interval`` for one that changes on every check. Next runs are jittered
+    so groups spread over the window instead of being scraped in one burst.
+    """
+
+    def __init__(
+        self,
+        store: PollStateStore,
+        min_interval: float = POLL_MIN_INTERVAL_HOURS * 3600,
+        max_interval: float = POLL_MAX_INTERVAL_HOURS * 3600,
+        initial_interval: float = SCHEDULE_INTERVAL_HOURS * 3600,
+        alpha: float = POLL_CHANGE_RATE_ALPHA,
+        jitter: float = POLL_JITTER_RATIO,
+        startup_spread: float | None = POLL_STARTUP_SPREAD_MINUTES * 60 if SCHEDULE_RUN_ON_STARTUP else None,
+        seed: int | None = None,
+    ) -> None:
+        self.store = store
+        self.min_interval = min(min_interval, max_interval)
+        self.max_interval = max_interval
+        self.initial_interval = min(max(initial_interval, self.min_interval), self.max_interval)
+        self.alpha = alpha
+        self.jitter = jitter
+        self.startup_spread = startup_spread
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def interval_for(self, change_rate: float) -> float:
+        return self.max_interval * (self.min_interval / self.max_interval) ** change_rate
+
+    def rate_for(self, interval: float) -> float:
+        """Inverse of ``interval_for``: the change rate a new group starts with."""
+        if self.min_interval == self.max_interval:
+            return 0.0
+        return math.log(interval / self.max_interval) / math.log(self.min_interval / self.max_interval)
+
+    def _jittered(self, interval: float) -> float:
+        return interval * self._random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _new_state(self, group: str, now: float) -> PollState:
+        if self.startup_spread is not None:
+            first_run = now + self._random.uniform(0, self.startup_spread)
+        else:
+            first_run = now + self._jittered(self.initial_interval)
+        return PollState(
+            group=group,
+            content_hash=None,
+            window=None,
+            change_rate=self.rate_for(self.initial_interval),
+            interval_seconds=self.initial_interval,
+            next_run_at=first_run,
+        )
+
+    def state(self, group: str, now: float | None = None) -> PollState:
+        now = now or time.time()
+        with self._lock:
+            state = self.store.get(group)
+            if state is None:
+                state = self._new_state(group, now)
+                self.store.put(state)
+            return state
+
+    def due(self, groups: list[str], now: float | None = None, limit: int | None = None) -> list[str]:
+        """Groups whose next run has come, most overdue first, at most ``limit`` of them."""
+        now = now or time.time()
+        states = [self.state(group, now) for group in groups]
+        due = sorted((state for state in states if state.next_run_at <= now), key=lambda state: state.next_run_at)
+        return [state.group for state in due[:limit]]
+
+    def observe(
+        self,
+        group: str,
+        lessons: list[Lesson] | None,
+        date_range: tuple[date, date] | None = None,
+        now: float | None = None,
+    ) -> PollState:
+        """Record one scheduled scrape of ``group`` and plan the next one.
+
+        ``lessons`` is empty for a week without lessons and None if the scrape failed.
+        """
+        now = now or time.time()
+        with self._lock:
+            state = self.store.get(group) or self._new_state(group, now)
+            if lessons is None:
+                # Nothing was learned about the plan; try again soon without touching the rate.
+                state.next_run_at = now + self._jittered(min(self.min_interval, state.interval_seconds))
+                self.store.put(state)
+                return state
+
+            digest = content_hash(lessons)
+            # A single-week scrape covers the ISO week it ran in.
+            window = repr(date_range) if date_range is not None else week_key(datetime.fromtimestamp(now))
+            # A scrape of another window (e.g. the next week) is a new baseline, not a change of the plan.
+            if state.content_hash is not None and state.window == window:
+                changed = digest != state.content_hash
+                state.change_rate = self.alpha * changed + (1 - self.alpha) * state.change_rate
+                if changed:
+                    state.changes += 1
+                    state.changed_at = now
+            state.content_hash = digest
+            state.window = window
+            state.checks += 1
+            state.checked_at = now
+            state.interval_seconds = self.interval_for(state.change_rate)
+            state.next_run_at = now + self._jittered(state.interval_seconds)
+            self.store.put(state)
+
+        group_change_rate.set(state.change_rate, group=group)
+        group_poll_interval_seconds.set(state.interval_seconds, group=group)
+        logger.info(
+            f"Group {group}: change rate {state.change_rate:.2f}, "
+            f"next check in {(state.next_run_at - now) / 3600:.1f}h"
+        )
+        return state
+
+
+poll_planner = PollPlanner(poll_state_store)
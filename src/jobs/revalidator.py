@@ -0,0 +1,52 @@
+import random
+import threading
+import time
+from typing import Callable
+
+from src.config import REVALIDATE_BASE_SECONDS, REVALIDATE_MAX_ATTEMPTS, REVALIDATE_MAX_SECONDS
+from src.utils.custom_logger import main_logger as logger
+
+
+class Revalidator:
+    """Retries failed refreshes in the background, at most one retry loop per key.
+
+    ``refresh`` returns True once it got fresh data. Attempts are spaced by a
+    jittered exponential backoff between ``base_delay`` and ``max_delay``; the
+    loop gives up after ``max_attempts`` and the next regular run tries again.
+    Loops run on daemon threads, so a pending retry never delays shutdown.
+    """
+
+    def __init__(self, base_delay: float, max_delay: float, max_attempts: int) -> None:
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max_attempts
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+
+    def schedule(self, key: str, refresh: Callable[[], bool]) -> bool:
+        """Start a retry loop for ``key`` unless one is already running; True if one was started."""
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+        threading.Thread(target=self._run, args=(key, refresh), name="revalidate", daemon=True).start()
+        return True
+
+    def _run(self, key: str, refresh: Callable[[], bool]) -> None:
+        try:
+            for attempt in range(self.max_attempts):
+                delay = min(self.max_delay, self.base_delay * 2**attempt)
+                time.sleep(random.uniform(delay / 2, delay))
+                try:
+                    if refresh():
+                        logger.info(f"Background refresh of {key} succeeded (attempt {attempt + 1})")
+                        return
+                except Exception as e:
+                    logger.exception(f"Background refresh of {key} failed: {e}")
+            logger.error(f"Giving up the background refresh of {key} after {self.max_attempts} attempts")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+
+revalidator = Revalidator(REVALIDATE_BASE_SECONDS, REVALIDATE_MAX_SECONDS, REVALIDATE_MAX_ATTEMPTS)
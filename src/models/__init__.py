@@ -0,0 +1 @@
+from .lesson import Lesson, content_hash, keyed_lessons
@@ -0,0 +1,93 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import date, time
+from typing import Any
+
+from src.config import BLOCK_HOURS, LOCATION
+
+BLOCK_TIMES: dict[str, tuple[time, time]] = {
+    block_id: (time.fromisoformat(hours["START"]), time.fromisoformat(hours["END"]))
+    for block_id, hours in BLOCK_HOURS.items()
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Lesson:
+    subject: str
+    day: date
+    block_id: str
+    description: str
+    location: str = LOCATION
+
+    @property
+    def start(self) -> time | None:
+        block = BLOCK_TIMES.get(self.block_id)
+        return block[0] if block else None
+
+    @property
+    def end(self) -> time | None:
+        block = BLOCK_TIMES.get(self.block_id)
+        return block[1] if block else None
+
+    @property
+    def key(self) -> str:
+        """Stable identity of a lesson: date + block id + subject."""
+        return f"{self.day.isoformat()}|{self.block_id}|{self.subject}"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize to the Swagger ``Lesson`` / Google CSV import shape."""
+        day = self.day.strftime("%d/%m/%Y")
+        start, end = self.start, self.end
+        return {
+            "Subject": self.subject,
+            "Start Date": day,
+            "Start Time": start.strftime("%H:%M") if start else "",
+            "End Date": day,
+            "End Time": end.strftime("%H:%M") if end else "",
+            "All Day Event": False,
+            "Description": self.description,
+            "Location": self.location,
+            "Private": True,
+        }
+
+    def to_record(self) -> dict[str, str]:
+        """Compact JSON-safe form used for on-disk storage."""
+        return {
+            "subject": self.subject,
+            "day": self.day.isoformat(),
+            "block_id": self.block_id,
+            "description": self.description,
+            "location": self.location,
+        }
+
+    @classmethod
+    def from_record(cls, record: dict[str, str]) -> "Lesson":
+        return cls(
+            subject=record["subject"],
+            day=date.fromisoformat(record["day"]),
+            block_id=record["block_id"],
+            description=record["description"],
+            location=record.get("location", LOCATION),
+        )
+
+
+def keyed_lessons(lessons: list[Lesson]) -> dict[str, Lesson]:
+    """Map lessons to their keys. Repeated keys get an occurrence suffix (``key#1``, ``key#2``...)."""
+    keyed: dict[str, Lesson] = {}
+    for lesson in lessons:
+        base_key = lesson.key
+        key = base_key
+        occurrence = 1
+        while key in keyed:
+            key = f"{base_key}#{occurrence}"
+            occurrence += 1
+        keyed[key] = lesson
+    return keyed
+
+
+def content_hash(lessons: list[Lesson], salt: str = "") -> str:
+    """Digest of what a schedule shows: every lesson's key, description and location."""
+    digest = hashlib.sha1(salt.encode("utf-8"))
+    for key, lesson in keyed_lessons(lessons).items():
+        digest.update(f"\n{key}|{lesson.description}|{lesson.location}".encode("utf-8"))
+    return digest.hexdigest()
@@ -1,2 +1,2 @@
 # This file can be empty, or you can use it to export specific functions or classes
-from .scheduler_scraper import scrape_schedule
+from .scheduler_scraper import scrape_schedule, scrape_schedule_changes
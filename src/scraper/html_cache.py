@@ -0,0 +1,181 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from src.config import HTML_CACHE_DIR, HTML_CACHE_ENABLED, HTML_CACHE_MAX_ENTRIES, HTML_CACHE_TTL_SECONDS
+from src.models.lesson import Lesson
+from src.utils.custom_logger import scheduler_logger as logger
+
+
+@dataclass
+class CacheEntry:
+    group: str
+    week: str
+    content_hash: str
+    lessons: list[Lesson] = field(default_factory=list)
+    etag: str | None = None
+    last_modified: str | None = None
+    fetched_at: float = 0.0
+
+
+def _entry_to_json(entry: CacheEntry) -> dict[str, Any]:
+    data = asdict(entry)
+    data["lessons"] = [lesson.to_record() for lesson in entry.lessons]
+    return data
+
+
+def _entry_from_json(data: dict[str, Any]) -> CacheEntry:
+    data["lessons"] = [Lesson.from_record(record) for record in data.get("lessons", [])]
+    return CacheEntry(**data)
+
+
+def cache_key(group: str, week: str) -> str:
+    return f"{group}:{week}"
+
+
+def content_hash(fragment: str) -> str:
+    return hashlib.sha256(fragment.encode("utf-8")).hexdigest()
+
+
+class HtmlCache(ABC):
+    """Interface for conditional-fetch caches of scraped schedule pages."""
+
+    @abstractmethod
+    def get(self, group: str, week: str) -> CacheEntry | None:
+        """The fresh entry of ``group`` for ``week``, or None on a miss."""
+
+    @abstractmethod
+    def put(self, entry: CacheEntry) -> None:
+        """Store ``entry``, replacing any entry of the same group and week."""
+
+    @abstractmethod
+    def invalidate(self, group: str, week: str) -> None:
+        """Drop the entry of ``group`` for ``week``, if any."""
+
+
+class NullHtmlCache(HtmlCache):
+    """Cache that never stores anything; every scrape is a full fetch and parse."""
+
+    def get(self, group: str, week: str) -> CacheEntry | None:
+        return None
+
+    def put(self, entry: CacheEntry) -> None:
+        pass
+
+    def invalidate(self, group: str, week: str) -> None:
+        pass
+
+
+class DiskHtmlCache(HtmlCache):
+    """One JSON file per (group, week) with TTL expiry and LRU eviction by entry count.
+
+    Access order is persisted through file mtimes so it survives restarts.
+    Disk errors are logged and treated as cache misses, never as scrape failures.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: int, max_entries: int) -> None:
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._index: OrderedDict[str, str] | None = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json")
+
+    def _load_index(self) -> OrderedDict[str, str]:
+        if self._index is not None:
+            return self._index
+        self._index = OrderedDict()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            files = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")]
+        except OSError as e:
+            logger.warning(f"Could not load HTML cache index from {self.directory}: {e}")
+            return self._index
+        by_mtime = []
+        for path in files:
+            try:
+                by_mtime.append((os.path.getmtime(path), path))
+            except OSError:
+                continue
+        for _, path in sorted(by_mtime):
+            try:
+                with open(path, "r") as f:
+                    data = json.load(f)
+                self._index[cache_key(data["group"], data["week"])] = path
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logger.warning(f"Skipping unreadable cache entry {path}: {e}")
+        return self._index
+
+    def get(self, group: str, week: str) -> CacheEntry | None:
+        key = cache_key(group, week)
+        with self._lock:
+            index = self._load_index()
+            path = index.get(key)
+            if path is None:
+                return None
+            try:
+                with open(path, "r") as f:
+                    entry = _entry_from_json(json.load(f))
+            except (OSError, ValueError, TypeError, KeyError) as e:
+                logger.warning(f"Dropping unreadable cache entry {key}: {e}")
+                self._remove(key)
+                return None
+            if time.time() - entry.fetched_at > self.ttl_seconds:
+                logger.debug(f"Cache entry {key} expired")
+                self._remove(key)
+                return None
+            index.move_to_end(key)
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            return entry
+
+    def put(self, entry: CacheEntry) -> None:
+        key = cache_key(entry.group, entry.week)
+        with self._lock:
+            index = self._load_index()
+            path = self._path(key)
+            tmp_path = f"{path}.tmp"
+            try:
+                with open(tmp_path, "w") as f:
+                    json.dump(_entry_to_json(entry), f)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not write cache entry {key}: {e}")
+                return
+            index[key] = path
+            index.move_to_end(key)
+            while len(index) > self.max_entries:
+                oldest = next(iter(index))
+                logger.debug(f"Evicting cache entry {oldest}")
+                self._remove(oldest)
+
+    def invalidate(self, group: str, week: str) -> None:
+        with self._lock:
+            self._load_index()
+            self._remove(cache_key(group, week))
+
+    def _remove(self, key: str) -> None:
+        path = self._index.pop(key, None) if self._index is not None else None
+        if path is None:
+            return
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+default_cache: HtmlCache = (
+    DiskHtmlCache(HTML_CACHE_DIR, HTML_CACHE_TTL_SECONDS, HTML_CACHE_MAX_ENTRIES)
+    if HTML_CACHE_ENABLED
+    else NullHtmlCache()
+)
@@ -0,0 +1,170 @@
+import random
+import threading
+import time
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.config import (
+    SCRAPER_BACKOFF_BASE_SECONDS,
+    SCRAPER_BACKOFF_MAX_SECONDS,
+    SCRAPER_CIRCUIT_FAILURE_THRESHOLD,
+    SCRAPER_CIRCUIT_RESET_SECONDS,
+    SCRAPER_CONNECT_TIMEOUT_SECONDS,
+    SCRAPER_MAX_CONCURRENCY_PER_HOST,
+    SCRAPER_MAX_RETRIES,
+    SCRAPER_POOL_SIZE,
+    SCRAPER_READ_TIMEOUT_SECONDS,
+    SCRAPER_VERIFY_TLS,
+    SCRAPE_HOST_MIN_INTERVAL_SECONDS,
+)
+from src.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from src.utils.custom_logger import scheduler_logger as logger
+from src.utils.metrics import http_circuit_rejected_total, http_circuit_state, http_fetch_seconds
+from src.utils.rate_limiter import RateLimiter
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+CIRCUIT_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised without contacting the host while its circuit breaker is open."""
+
+
+class ScraperClient:
+    """Pooled HTTP client for the WAT site shared by the scheduler and the HTTP routes.
+
+    Keeps TCP/TLS connections alive through one ``requests.Session``, retries
+    transient failures with full-jitter exponential backoff, spaces requests
+    to the same host by ``min_host_interval`` and caps in-flight requests per host.
+    A host whose requests keep failing after their retries is not contacted
+    again until its circuit breaker lets a trial request through.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = SCRAPER_CONNECT_TIMEOUT_SECONDS,
+        read_timeout: float = SCRAPER_READ_TIMEOUT_SECONDS,
+        max_retries: int = SCRAPER_MAX_RETRIES,
+        backoff_base: float = SCRAPER_BACKOFF_BASE_SECONDS,
+        backoff_max: float = SCRAPER_BACKOFF_MAX_SECONDS,
+        max_concurrency_per_host: int = SCRAPER_MAX_CONCURRENCY_PER_HOST,
+        pool_size: int = SCRAPER_POOL_SIZE,
+        verify: bool = SCRAPER_VERIFY_TLS,
+        min_host_interval: float = SCRAPE_HOST_MIN_INTERVAL_SECONDS,
+        circuit_failure_threshold: int = SCRAPER_CIRCUIT_FAILURE_THRESHOLD,
+        circuit_reset_timeout: float = SCRAPER_CIRCUIT_RESET_SECONDS,
+    ) -> None:
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_concurrency_per_host = max_concurrency_per_host
+        self.verify = verify
+        self.circuit_failure_threshold = circuit_failure_threshold
+        self.circuit_reset_timeout = circuit_reset_timeout
+
+        self._adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+        self._spacing = RateLimiter(min_host_interval)
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._retries = 0
+        self._failures = 0
+
+    def _slot(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_concurrency_per_host)
+                self._host_slots[host] = slot
+            return slot
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.circuit_failure_threshold, self.circuit_reset_timeout)
+                self._breakers[host] = breaker
+            return breaker
+
+    def _backoff(self, attempt: int, response: requests.Response | None) -> float:
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def get(self, url: str, headers: dict[str, str] | None = None) -> requests.Response:
+        """GET with retries. Returns the last response, or raises the last transport error.
+
+        Raises ``CircuitOpenError`` right away while the host's circuit is open.
+        """
+        host = urlsplit(url).netloc
+        breaker = self.breaker(host)
+        if not breaker.allow():
+            http_circuit_rejected_total.inc(host=host)
+            raise CircuitOpenError(f"Circuit open for {host}")
+        attempt = 0
+        while True:
+            response: requests.Response | None = None
+            error: requests.RequestException | None = None
+            self._spacing.acquire(host)
+            with self._slot(host):
+                with self._lock:
+                    self._requests += 1
+                started = time.perf_counter()
+                try:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout, verify=self.verify)
+                except (requests.ConnectionError, requests.Timeout) as e:
+                    error = e
+                status = str(response.status_code) if response is not None else "error"
+                http_fetch_seconds.observe(time.perf_counter() - started, status=status)
+
+            transient = error is not None or response.status_code in RETRYABLE_STATUS_CODES
+            if not transient or attempt >= self.max_retries:
+                if transient:
+                    with self._lock:
+                        self._failures += 1
+                    if breaker.record_failure():
+                        logger.error(f"Circuit opened for {host} for {self.circuit_reset_timeout:.0f}s")
+                else:
+                    breaker.record_success()
+                http_circuit_state.set(CIRCUIT_STATE_VALUES[breaker.state], host=host)
+                if error is not None:
+                    raise error
+                return response
+
+            delay = self._backoff(attempt, response)
+            reason = error or f"HTTP {response.status_code}"
+            logger.warning(f"Transient failure for {host} ({reason}), retry {attempt + 1} in {delay:.2f}s")
+            with self._lock:
+                self._retries += 1
+            time.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> dict[str, Any]:
+        opened = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                opened += pool.num_connections
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "retries": self._retries,
+                "failures": self._failures,
+                "connections_opened": opened,
+                "connections_reused": max(self._requests - opened, 0),
+                "circuits": {host: breaker.state for host, breaker in self._breakers.items()},
+            }
+
+
+default_client = ScraperClient()
@@ -0,0 +1,108 @@
+from datetime import date, datetime
+from functools import lru_cache
+from html.parser import HTMLParser
+
+from src.models.lesson import Lesson
+from src.utils.custom_logger import scheduler_logger as logger
+
+LESSON_FIELDS = frozenset({"date", "block_id", "name", "info"})
+NO_LESSONS_ERROR = "No lessons found in the schedule"
+
+
+def parse_date(date_str: str) -> datetime:
+    return datetime.strptime(date_str, "%Y_%m_%d")
+
+
+@lru_cache(maxsize=1024)
+def parse_lesson_date(date_str: str) -> date:
+    """``2024_10_01`` -> ``date(2024, 10, 1)``; dates repeat across lessons so results are memoized."""
+    return parse_date(date_str).date()
+
+
+class LessonsHTMLParser(HTMLParser):
+    """Single-pass event parser that collects the spans of every ``div.lesson``
+    inside the ``lessons hidden`` div and ignores everything else."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.found_container = False
+        self.lessons: list[dict[str, str]] = []
+        self._container_depth = 0
+        self._current: dict[str, str] | None = None
+        self._lesson_level = 0
+        self._field: str | None = None
+        self._field_depth = 0
+        self._buffer: list[str] = []
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag == "div":
+            classes = self._classes(attrs)
+            if self._container_depth:
+                self._container_depth += 1
+                if "lesson" in classes:
+                    self._current = {}
+                    self._lesson_level = self._container_depth
+                    self.lessons.append(self._current)
+            elif "lessons" in classes and "hidden" in classes:
+                self.found_container = True
+                self._container_depth = 1
+            return
+
+        if tag != "span" or self._current is None:
+            return
+        if self._field is not None:
+            self._field_depth += 1
+            return
+        for css_class in self._classes(attrs):
+            if css_class in LESSON_FIELDS and css_class not in self._current:
+                self._field = css_class
+                self._field_depth = 1
+                self._buffer = []
+                return
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "span" and self._field is not None:
+            self._field_depth -= 1
+            if self._field_depth == 0:
+                self._current[self._field] = "".join(self._buffer)
+                self._field = None
+        elif tag == "div" and self._container_depth:
+            if self._current is not None and self._container_depth == self._lesson_level:
+                self._current = None
+            self._container_depth -= 1
+
+    def handle_data(self, data: str) -> None:
+        if self._field is not None:
+            self._buffer.append(data)
+
+    @staticmethod
+    def _classes(attrs: list[tuple[str, str | None]]) -> list[str]:
+        for name, value in attrs:
+            if name == "class" and value:
+                return value.split()
+        return []
+
+
+def parse_lessons(lessons_html: str) -> tuple[list[Lesson], None] | tuple[None, str]:
+    parser = LessonsHTMLParser()
+    parser.feed(lessons_html)
+    parser.close()
+
+    if not parser.found_container:
+        logger.error("Could not find 'lessons hidden' div")
+        return None, "Schedule data not found on the page"
+
+    if not parser.lessons:
+        logger.warning("No lessons found on the page.")
+        return None, NO_LESSONS_ERROR
+
+    schedule_data = [
+        Lesson(
+            subject=raw.get("name", "").replace("<br>", " ").strip(),
+            day=parse_lesson_date(raw["date"]),
+            block_id=raw.get("block_id", ""),
+            description=raw.get("info", ""),
+        )
+        for raw in parser.lessons
+    ]
+    return schedule_data, None
@@ -0,0 +1,119 @@
+import contextvars
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+
+from src.config import RANGE_MAX_WORKERS, SEMESTER_SUMMER_END, SEMESTER_SUMMER_START, SEMESTER_WINTER_START
+from src.models.lesson import Lesson
+from src.scraper.lesson_parser import NO_LESSONS_ERROR
+from src.scraper.scheduler_scraper import scrape_schedule_changes
+from src.utils.custom_logger import scheduler_logger as logger
+from src.utils.progress import emit, emit_lessons
+
+
+@dataclass
+class WeekResult:
+    week_start: date
+    lessons: list[Lesson] = field(default_factory=list)
+    error: str | None = None
+    changed: bool = True
+
+
+def _month_day(value: str, year: int) -> date:
+    month, day = (int(part) for part in value.split("-"))
+    return date(year, month, day)
+
+
+def semester_range(today: date | None = None) -> tuple[date, date]:
+    """Bounds of the semester containing ``today``; during the summer break, the upcoming winter one."""
+    today = today or date.today()
+    year = today.year
+    winter_start = _month_day(SEMESTER_WINTER_START, year)
+    summer_start = _month_day(SEMESTER_SUMMER_START, year)
+    summer_end = _month_day(SEMESTER_SUMMER_END, year)
+    if today < summer_start:
+        return _month_day(SEMESTER_WINTER_START, year - 1), summer_start - timedelta(days=1)
+    if today <= summer_end:
+        return summer_start, summer_end
+    return winter_start, _month_day(SEMESTER_SUMMER_START, year + 1) - timedelta(days=1)
+
+
+def week_starts(start: date, end: date) -> list[date]:
+    """Mondays of every ISO week overlapping ``[start, end]``."""
+    monday = start - timedelta(days=start.weekday())
+    weeks: list[date] = []
+    while monday <= end:
+        weeks.append(monday)
+        monday += timedelta(days=7)
+    return weeks
+
+
+def _week_moment(monday: date) -> datetime:
+    # Noon on Wednesday keeps the timestamp well inside the week whatever the timezone.
+    return datetime.combine(monday + timedelta(days=2), time(12, 0))
+
+
+def _scrape_week(group: str, monday: date, user_agent: str | None) -> WeekResult:
+    data, error, changed = scrape_schedule_changes(group, user_agent, moment=_week_moment(monday))
+    if error == NO_LESSONS_ERROR:
+        return WeekResult(week_start=monday, changed=changed)
+    if error:
+        return WeekResult(week_start=monday, error=error)
+    return WeekResult(week_start=monday, lessons=data, changed=changed)
+
+
+def iter_schedule_range(
+    group: str,
+    start: date,
+    end: date,
+    user_agent: str | None = None,
+    max_workers: int = RANGE_MAX_WORKERS,
+) -> Iterator[WeekResult]:
+    """Fetch every week in ``[start, end]`` concurrently and yield them as they complete.
+
+    Lessons outside the range and lessons already yielded for another week
+    (overlapping responses) are dropped, so each lesson is streamed once.
+    """
+    seen: set[Lesson] = set()
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="range") as executor:
+        futures = [
+            executor.submit(contextvars.copy_context().run, _scrape_week, group, monday, user_agent)
+            for monday in week_starts(start, end)
+        ]
+        try:
+            for future in as_completed(futures):
+                week = future.result()
+                week.lessons = [
+                    lesson for lesson in week.lessons if start <= lesson.day <= end and lesson not in seen
+                ]
+                seen.update(week.lessons)
+                yield week
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def scrape_range_changes(
+    group: str, start: date, end: date, user_agent: str | None = None
+) -> tuple[list[Lesson], None, bool] | tuple[None, str, bool]:
+    """Collect a date range into one sorted lesson list.
+
+    Any failed week fails the whole range: a partial result would make the
+    calendar sync delete the lessons of the missing weeks.
+    """
+    lessons: list[Lesson] = []
+    changed = False
+    for week in iter_schedule_range(group, start, end, user_agent):
+        if week.error:
+            logger.error(f"Week of {week.week_start} for {group} failed: {week.error}")
+            return None, f"Week of {week.week_start.isoformat()}: {week.error}", True
+        lessons.extend(week.lessons)
+        changed = changed or week.changed
+        emit("week", week_start=week.week_start.isoformat(), lessons=len(week.lessons))
+        emit_lessons(week.lessons)
+
+    if not lessons:
+        return None, NO_LESSONS_ERROR, True
+    lessons.sort(key=lambda lesson: (lesson.day, lesson.block_id, lesson.subject))
+    return lessons, None, changed
@@ -1,75 +1,151 @@
 import random
-from datetime import datetime
-from typing import Any
+import time
+from datetime import date, datetime, timedelta
 
 import requests
-from bs4 import BeautifulSoup
 
-from src.config import BLOCK_HOURS, LOCATION, USER_AGENTS
+from src.config import USER_AGENTS, WAT_BASE_URL
+from src.models.lesson import Lesson
+from src.scraper.html_cache import CacheEntry, HtmlCache, content_hash, default_cache
+from src.scraper.http_client import ScraperClient, default_client
+from src.scraper.lesson_parser import NO_LESSONS_ERROR, parse_lessons
 from src.utils.custom_logger import scheduler_logger as logger
+from src.utils.metrics import lessons_per_page, parse_seconds, scrape_cache_total
+
+LESSONS_DIV_MARKER = '<div class="lessons hidden"'
 
 
 def get_random_user_agent() -> str:
     return random.choice(USER_AGENTS)
 
 
-def parse_date(date_str: str) -> datetime:
-    return datetime.strptime(date_str, "%Y_%m_%d")
-
-
-def scrape_schedule(
-    group: str, user_agent: str | None = None
-) -> tuple[list[dict[str, Any]], None] | tuple[None, str]:
-    current_timestamp = int(datetime.now().timestamp())
-    url = f"https://planzajec.wcy.wat.edu.pl/pl/rozklad?date={current_timestamp}&grupa_id={group}"
+def week_key(moment: datetime) -> str:
+    iso_year, iso_week, _ = moment.isocalendar()
+    return f"{iso_year}-W{iso_week:02d}"
+
+
+def week_window(moment: datetime | None = None) -> tuple[date, date]:
+    """Monday and Sunday of the week ``week_key`` assigns to ``moment`` (default: now)."""
+    iso_year, iso_week, _ = (moment or datetime.now()).isocalendar()
+    monday = date.fromisocalendar(iso_year, iso_week, 1)
+    return monday, monday + timedelta(days=6)
+
+
+def extract_lessons_html(html: str) -> str | None:
+    """Cut the ``lessons hidden`` div out of the page by counting nested div tags."""
+    start = html.find(LESSONS_DIV_MARKER)
+    if start == -1:
+        return None
+    depth = 0
+    position = start
+    while True:
+        next_open = html.find("<div", position)
+        next_close = html.find("</div", position)
+        if next_close == -1:
+            return html[start:]
+        if next_open != -1 and next_open < next_close:
+            depth += 1
+            position = next_open + 4
+            continue
+        depth -= 1
+        position = next_close + 5
+        if depth == 0:
+            end = html.find(">", position)
+            return html[start : end + 1 if end != -1 else len(html)]
+
+
+def _cached_result(cached: CacheEntry) -> tuple[list[Lesson], None, bool] | tuple[None, str, bool]:
+    if not cached.lessons:
+        return None, NO_LESSONS_ERROR, False
+    return cached.lessons, None, False
+
+
+def scrape_schedule_changes(
+    group: str,
+    user_agent: str | None = None,
+    cache: HtmlCache | None = None,
+    client: ScraperClient | None = None,
+    moment: datetime | None = None,
+) -> tuple[list[Lesson], None, bool] | tuple[None, str, bool]:
+    """Scrape the week containing ``moment`` (default: now) and report whether it
+    changed since the cached copy.
+
+    Sends a conditional request when a fresh cache entry exists. A 304 or an
+    identical ``lessons hidden`` div returns the cached lessons without parsing.
+    """
+    cache = cache or default_cache
+    client = client or default_client
+    moment = moment or datetime.now()
+    week = week_key(moment)
+    url = f"{WAT_BASE_URL}/pl/rozklad?date={int(moment.timestamp())}&grupa_id={group}"
     headers = {"User-Agent": user_agent or get_random_user_agent()}
 
+    cached = cache.get(group, week)
+    if cached:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+
     try:
-        response = requests.get(url, headers=headers, verify=False)
+        response = client.get(url, headers=headers)
+        if cached and response.status_code == 304:
+            logger.info(f"Schedule for {group} ({week}) not modified")
+            scrape_cache_total.inc(result="not_modified")
+            cached.fetched_at = time.time()
+            cache.put(cached)
+            return _cached_result(cached)
         response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        schedule_data: list[dict[str, Any]] = []
-
-        lessons = soup.find("div", class_="lessons hidden")
-        if not lessons:
+        lessons_html = extract_lessons_html(response.text)
+        if lessons_html is None:
             logger.error("Could not find 'lessons hidden' div")
-            return None, "Schedule data not found on the page"
-
-        lesson_divs = lessons.find_all("div", class_="lesson")
-        if not lesson_divs:
-            logger.warning("No lessons found on the page.")
-            return None, "No lessons found in the schedule"
-
-        for lesson in lesson_divs:
-            lesson_date = parse_date(lesson.find("span", class_="date").text)
-            block_id: str = lesson.find("span", class_="block_id").text
-            name: str = lesson.find("span", class_="name").text.replace("<br>", " ").strip()
-            info: str = lesson.find("span", class_="info").text
-
-            block_time = BLOCK_HOURS.get(block_id, {})
-            lesson_info: dict[str, Any] = {
-                "Subject": name,
-                "Start Date": lesson_date.strftime("%d/%m/%Y"),
-                "Start Time": block_time.get("START", ""),
-                "End Date": lesson_date.strftime("%d/%m/%Y"),
-                "End Time": block_time.get("END", ""),
-                "All Day Event": False,
-                "Description": info,
-                "Location": LOCATION,
-                "Private": True,
-            }
-            schedule_data.append(lesson_info)
-
-        if not schedule_data:
-            logger.warning("No lessons found in the schedule.")
-            return None, "No lessons found in the schedule"
-
-        return schedule_data, None
+            return None, "Schedule data not found on the page", True
+
+        fragment_hash = content_hash(lessons_html)
+        if cached and cached.content_hash == fragment_hash:
+            logger.info(f"Schedule for {group} ({week}) unchanged, skipping parse")
+            scrape_cache_total.inc(result="unchanged")
+            cached.etag = response.headers.get("ETag")
+            cached.last_modified = response.headers.get("Last-Modified")
+            cached.fetched_at = time.time()
+            cache.put(cached)
+            return _cached_result(cached)
+
+        scrape_cache_total.inc(result="miss")
+        with parse_seconds.time():
+            schedule_data, error = parse_lessons(lessons_html)
+        lessons_per_page.observe(len(schedule_data or []))
+        if error and error != NO_LESSONS_ERROR:
+            return None, error, True
+
+        cache.put(
+            CacheEntry(
+                group=group,
+                week=week,
+                content_hash=fragment_hash,
+                lessons=schedule_data or [],
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                fetched_at=time.time(),
+            )
+        )
+        if error:
+            return None, error, True
+        return schedule_data, None, True
 
     except requests.RequestException as e:
         logger.error(f"Request failed: {e}")
-        return None, f"Failed to retrieve the page: {e}"
+        return None, f"Failed to retrieve the page: {e}", True
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
-        return None, f"An unexpected error occurred: {e}"
+        return None, f"An unexpected error occurred: {e}", True
+
+
+def scrape_schedule(
+    group: str, user_agent: str | None = None
+) -> tuple[list[Lesson], None] | tuple[None, str]:
+    data, error, _ = scrape_schedule_changes(group, user_agent)
+    if error:
+        return None, error
+    return data, None
@@ -0,0 +1,4 @@
+from .lesson_index import GroupIndex, LessonIndex, lesson_index
+from .poll_state_store import PollState, PollStateStore, poll_state_store
+from .snapshot_store import SnapshotStore, snapshot_store
+from .subscription_store import SubscriptionStore, subscription_store
@@ -0,0 +1,36 @@
+import os
+import sqlite3
+import threading
+
+
+class SqliteDatabase:
+    """Base for the SQLite-backed stores in ``STORAGE_DIR``.
+
+    Each thread gets its own connection (WAL mode, busy timeout) and the
+    subclass' ``SCHEMA`` is applied on first use, so nothing touches the disk
+    at import time. Writers serialize on ``_write_lock`` within a process.
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._schema_lock = threading.Lock()
+        self._schema_ready = False
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5.0)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        with self._schema_lock:
+            if not self._schema_ready:
+                connection.executescript(self.SCHEMA)
+                self._schema_ready = True
+        return connection
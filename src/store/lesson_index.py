@@ -0,0 +1,138 @@
+import bisect
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any
+
+from src.config import BLOCK_HOURS
+from src.models.lesson import Lesson, content_hash
+from src.store.snapshot_store import SnapshotStore, snapshot_store
+from src.utils.custom_logger import main_logger as logger
+
+BLOCK_ORDER: dict[str, int] = {block_id: position for position, block_id in enumerate(BLOCK_HOURS)}
+
+DayBucket = tuple[tuple[Lesson, dict[str, Any]], ...]
+
+
+def _sort_key(lesson: Lesson) -> tuple[int, str]:
+    return BLOCK_ORDER.get(lesson.block_id, len(BLOCK_ORDER)), lesson.subject
+
+
+@dataclass
+class GroupIndex:
+    """Lessons of one group bucketed by day (in block order), each with its rendered dict."""
+
+    group: str
+    content_hash: str
+    scraped_at: float | None
+    days: dict[date, DayBucket] = field(default_factory=dict)
+    sorted_days: list[date] = field(default_factory=list)
+
+    def _days_between(self, start: date | None, end: date | None) -> list[date]:
+        low = bisect.bisect_left(self.sorted_days, start) if start else 0
+        high = bisect.bisect_right(self.sorted_days, end) if end else len(self.sorted_days)
+        return self.sorted_days[low:high]
+
+    def lessons(
+        self, start: date | None = None, end: date | None = None, subject: str | None = None
+    ) -> list[dict[str, Any]]:
+        """Rendered lessons in ``[start, end]``, optionally only those whose subject contains ``subject``."""
+        needle = subject.casefold() if subject else None
+        return [
+            rendered
+            for day in self._days_between(start, end)
+            for lesson, rendered in self.days[day]
+            if needle is None or needle in lesson.subject.casefold()
+        ]
+
+    def lesson_models(self, start: date | None = None, end: date | None = None) -> list[Lesson]:
+        """``Lesson`` objects in ``[start, end]``, by day and block."""
+        return [lesson for day in self._days_between(start, end) for lesson, _ in self.days[day]]
+
+    def free_blocks(self, day: date) -> list[str]:
+        """Block ids of ``BLOCK_HOURS`` without any lesson on ``day``."""
+        busy = {lesson.block_id for lesson, _ in self.days.get(day, ())}
+        return [block_id for block_id in BLOCK_HOURS if block_id not in busy]
+
+
+class LessonIndex:
+    """In-memory read index over the stored schedule of every group.
+
+    An index is rebuilt only when the group's content hash changes, and then
+    reuses the rendered buckets of days whose lessons are unchanged. With the
+    snapshot store enabled the index covers every stored lesson of the group
+    and notices scrapes made by other worker processes (one primary-key lookup
+    per read); without it, it holds the last scrape made by this process.
+    """
+
+    def __init__(self, store: SnapshotStore | None) -> None:
+        self.store = store
+        self._indexes: dict[str, GroupIndex] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, group: str, lessons: list[Lesson] | None = None) -> GroupIndex | None:
+        """Re-read ``group`` (from the store, or from ``lessons`` when there is none) and rebuild if it changed."""
+        if self.store is not None:
+            scraped_at = self.store.scraped_at(group)
+            if scraped_at is None:
+                return None
+            lessons = [stored.lesson for stored in self.store.lessons(group)]
+        elif lessons is None:
+            return self._indexes.get(group)
+        else:
+            scraped_at = time.time()
+
+        digest = content_hash(lessons)
+        with self._lock:
+            current = self._indexes.get(group)
+            if current is not None and current.content_hash == digest:
+                current.scraped_at = scraped_at
+                return current
+            index = self._build(group, digest, scraped_at, lessons, current)
+            self._indexes[group] = index
+        return index
+
+    def get(self, group: str) -> GroupIndex | None:
+        current = self._indexes.get(group)
+        if self.store is None:
+            return current
+        if current is None or current.scraped_at != self.store.scraped_at(group):
+            return self.refresh(group)
+        return current
+
+    @staticmethod
+    def _build(
+        group: str, digest: str, scraped_at: float | None, lessons: list[Lesson], previous: GroupIndex | None
+    ) -> GroupIndex:
+        started = time.perf_counter()
+        by_day: dict[date, list[Lesson]] = {}
+        for lesson in lessons:
+            by_day.setdefault(lesson.day, []).append(lesson)
+
+        index = GroupIndex(group=group, content_hash=digest, scraped_at=scraped_at)
+        reused = 0
+        for day, day_lessons in by_day.items():
+            day_lessons.sort(key=_sort_key)
+            old = previous.days.get(day) if previous else None
+            if old is not None and [lesson for lesson, _ in old] == day_lessons:
+                index.days[day] = old
+                reused += 1
+            else:
+                index.days[day] = tuple((lesson, lesson.to_dict()) for lesson in day_lessons)
+        index.sorted_days = sorted(index.days)
+        logger.info(
+            f"Indexed {len(lessons)} lessons of {group} over {len(index.days)} days "
+            f"({reused} days reused) in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return index
+
+
+def week_range(iso_week: str) -> tuple[date, date]:
+    """Monday and Sunday of an ISO week given as ``YYYY-Www`` (e.g. ``2024-W46``)."""
+    year, _, week = iso_week.upper().partition("-W")
+    monday = date.fromisocalendar(int(year), int(week), 1)
+    return monday, monday + timedelta(days=6)
+
+
+lesson_index = LessonIndex(snapshot_store)
@@ -0,0 +1,94 @@
+from dataclasses import dataclass
+from typing import Any
+
+from src.config import POLL_STATE_DB_PATH
+from src.store.database import SqliteDatabase
+
+POLL_STATE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS poll_state (
+    group_name TEXT PRIMARY KEY,
+    content_hash TEXT,
+    scrape_window TEXT,
+    change_rate REAL NOT NULL,
+    interval_seconds REAL NOT NULL,
+    checks INTEGER NOT NULL,
+    changes INTEGER NOT NULL,
+    checked_at REAL,
+    changed_at REAL,
+    next_run_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+@dataclass
+class PollState:
+    group: str
+    content_hash: str | None
+    window: str | None
+    change_rate: float
+    interval_seconds: float
+    checks: int = 0
+    changes: int = 0
+    checked_at: float | None = None
+    changed_at: float | None = None
+    next_run_at: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "group": self.group,
+            "change_rate": round(self.change_rate, 3),
+            "interval_hours": round(self.interval_seconds / 3600, 2),
+            "checks": self.checks,
+            "changes": self.changes,
+            "checked_at": self.checked_at,
+            "changed_at": self.changed_at,
+            "next_run_at": self.next_run_at,
+        }
+
+
+class PollStateStore(SqliteDatabase):
+    """Per-group polling state of the adaptive scheduler, kept across restarts."""
+
+    SCHEMA = POLL_STATE_SCHEMA
+
+    def get(self, group: str) -> PollState | None:
+        row = self._connection().execute("SELECT * FROM poll_state WHERE group_name = ?", (group,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def put(self, state: PollState) -> None:
+        with self._write_lock, self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO poll_state (group_name, content_hash, scrape_window, change_rate, "
+                "interval_seconds, checks, changes, checked_at, changed_at, next_run_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    state.group,
+                    state.content_hash,
+                    state.window,
+                    state.change_rate,
+                    state.interval_seconds,
+                    state.checks,
+                    state.changes,
+                    state.checked_at,
+                    state.changed_at,
+                    state.next_run_at,
+                ),
+            )
+
+    @staticmethod
+    def _from_row(row: Any) -> PollState:
+        return PollState(
+            group=row["group_name"],
+            content_hash=row["content_hash"],
+            window=row["scrape_window"],
+            change_rate=row["change_rate"],
+            interval_seconds=row["interval_seconds"],
+            checks=row["checks"],
+            changes=row["changes"],
+            checked_at=row["checked_at"],
+            changed_at=row["changed_at"],
+            next_run_at=row["next_run_at"],
+        )
+
+
+poll_state_store = PollStateStore(POLL_STATE_DB_PATH)
@@ -0,0 +1,238 @@
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any
+
+from src.config import SNAPSHOT_DB_PATH, SNAPSHOT_STORE_ENABLED
+from src.models.lesson import Lesson, keyed_lessons
+from src.store.database import SqliteDatabase
+from src.utils.custom_logger import main_logger as logger
+
+SNAPSHOT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS lessons (
+    group_name TEXT NOT NULL,
+    lesson_key TEXT NOT NULL,
+    day TEXT NOT NULL,
+    block_id TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    description TEXT NOT NULL,
+    location TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    removed_at REAL,
+    PRIMARY KEY (group_name, lesson_key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS lessons_by_day ON lessons (group_name, day, block_id);
+CREATE TABLE IF NOT EXISTS changes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    group_name TEXT NOT NULL,
+    lesson_key TEXT NOT NULL,
+    change TEXT NOT NULL,
+    at REAL NOT NULL,
+    day TEXT NOT NULL,
+    block_id TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    description TEXT NOT NULL,
+    location TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_by_group ON changes (group_name, at);
+CREATE TABLE IF NOT EXISTS snapshots (
+    group_name TEXT PRIMARY KEY,
+    scraped_at REAL NOT NULL,
+    window_start TEXT NOT NULL,
+    window_end TEXT NOT NULL
+);
+"""
+
+LESSON_COLUMNS = "lesson_key, day, block_id, subject, description, location"
+
+
+def _iso(timestamp: float | None) -> str | None:
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def _lesson_from_row(row: sqlite3.Row) -> Lesson:
+    return Lesson(
+        subject=row["subject"],
+        day=date.fromisoformat(row["day"]),
+        block_id=row["block_id"],
+        description=row["description"],
+        location=row["location"],
+    )
+
+
+@dataclass
+class StoredLesson:
+    key: str
+    lesson: Lesson
+    first_seen: float
+    last_seen: float
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            **self.lesson.to_dict(),
+            "key": self.key,
+            "first_seen": _iso(self.first_seen),
+            "last_seen": _iso(self.last_seen),
+        }
+
+
+@dataclass
+class LessonChange:
+    id: int
+    key: str
+    change: str
+    at: float
+    lesson: Lesson
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"id": self.id, "key": self.key, "change": self.change, "at": _iso(self.at), "lesson": self.lesson.to_dict()}
+
+
+@dataclass
+class RecordResult:
+    added: int = 0
+    updated: int = 0
+    removed: int = 0
+    unchanged: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+class SnapshotStore(SqliteDatabase):
+    """SQLite store of the latest scraped lessons per group and of every change between scrapes."""
+
+    SCHEMA = SNAPSHOT_SCHEMA
+
+    def record(
+        self,
+        group: str,
+        lessons: list[Lesson],
+        window: tuple[date, date],
+        now: float | None = None,
+    ) -> RecordResult:
+        """Store a scrape covering every day of ``window``.
+
+        Stored lessons inside the window that are missing from the scrape are
+        marked removed, on its first and last day too; lessons outside it are
+        left untouched.
+        """
+        now = now or time.time()
+        desired = keyed_lessons(lessons)
+        result = RecordResult()
+
+        with self._write_lock:
+            connection = self._connection()
+            with connection:
+                rows = connection.execute(
+                    f"SELECT {LESSON_COLUMNS}, removed_at FROM lessons "
+                    "WHERE group_name = ? AND day BETWEEN ? AND ?",
+                    (group, window[0].isoformat(), window[1].isoformat()),
+                ).fetchall()
+                existing = {row["lesson_key"]: row for row in rows}
+
+                changes: list[tuple[str, str, Lesson]] = []
+                upserts: list[tuple[Any, ...]] = []
+                seen: list[tuple[float, str, str]] = []
+                for key, lesson in desired.items():
+                    row = existing.get(key)
+                    if row is None or row["removed_at"] is not None:
+                        changes.append((key, "added", lesson))
+                        upserts.append((group, key, *self._lesson_values(lesson), now, now))
+                        result.added += 1
+                    elif _lesson_from_row(row) != lesson:
+                        changes.append((key, "updated", lesson))
+                        upserts.append((group, key, *self._lesson_values(lesson), now, now))
+                        result.updated += 1
+                    else:
+                        seen.append((now, group, key))
+                        result.unchanged += 1
+
+                removed: list[tuple[float, str, str]] = []
+                for key, row in existing.items():
+                    if key not in desired and row["removed_at"] is None:
+                        changes.append((key, "removed", _lesson_from_row(row)))
+                        removed.append((now, group, key))
+                        result.removed += 1
+
+                connection.executemany(
+                    "INSERT INTO lessons (group_name, lesson_key, day, block_id, subject, description, location, "
+                    "first_seen, last_seen, removed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, NULL) "
+                    "ON CONFLICT (group_name, lesson_key) DO UPDATE SET "
+                    "day = excluded.day, block_id = excluded.block_id, subject = excluded.subject, "
+                    "description = excluded.description, location = excluded.location, last_seen = excluded.last_seen, "
+                    "first_seen = CASE WHEN lessons.removed_at IS NULL THEN lessons.first_seen "
+                    "ELSE excluded.first_seen END, removed_at = NULL",
+                    upserts,
+                )
+                connection.executemany(
+                    "UPDATE lessons SET last_seen = ? WHERE group_name = ? AND lesson_key = ?", seen
+                )
+                connection.executemany(
+                    "UPDATE lessons SET removed_at = ? WHERE group_name = ? AND lesson_key = ?", removed
+                )
+                connection.executemany(
+                    f"INSERT INTO changes (group_name, change, at, {LESSON_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(group, change, now, key, *self._lesson_values(lesson)) for key, change, lesson in changes],
+                )
+                connection.execute(
+                    "INSERT INTO snapshots (group_name, scraped_at, window_start, window_end) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (group_name) DO UPDATE SET scraped_at = excluded.scraped_at, "
+                    "window_start = excluded.window_start, window_end = excluded.window_end",
+                    (group, now, window[0].isoformat(), window[1].isoformat()),
+                )
+
+        if result.changed:
+            logger.info(
+                f"Snapshot of {group}: {result.added} added, {result.updated} updated, "
+                f"{result.removed} removed, {result.unchanged} unchanged"
+            )
+        return result
+
+    @staticmethod
+    def _lesson_values(lesson: Lesson) -> tuple[str, str, str, str, str]:
+        return lesson.day.isoformat(), lesson.block_id, lesson.subject, lesson.description, lesson.location
+
+    def scraped_at(self, group: str) -> float | None:
+        row = self._connection().execute(
+            "SELECT scraped_at FROM snapshots WHERE group_name = ?", (group,)
+        ).fetchone()
+        return row["scraped_at"] if row else None
+
+    def last_changed(self, group: str) -> float | None:
+        """Time of the most recent change recorded for ``group``."""
+        row = self._connection().execute("SELECT MAX(at) AS at FROM changes WHERE group_name = ?", (group,)).fetchone()
+        return row["at"] if row else None
+
+    def lessons(self, group: str, start: date | None = None, end: date | None = None) -> list[StoredLesson]:
+        """Current (not removed) lessons of ``group``, optionally restricted to ``[start, end]``."""
+        rows = self._connection().execute(
+            f"SELECT {LESSON_COLUMNS}, first_seen, last_seen FROM lessons "
+            "WHERE group_name = ? AND day BETWEEN ? AND ? AND removed_at IS NULL "
+            "ORDER BY day, block_id, subject",
+            (group, (start or date.min).isoformat(), (end or date.max).isoformat()),
+        ).fetchall()
+        return [
+            StoredLesson(row["lesson_key"], _lesson_from_row(row), row["first_seen"], row["last_seen"]) for row in rows
+        ]
+
+    def changes(self, group: str, since: float = 0.0) -> list[LessonChange]:
+        """Changes recorded for ``group`` strictly after ``since`` (unix time), oldest first.
+
+        All changes of one scrape share its timestamp, so the ``at`` of the last
+        change returned is a safe ``since`` for the next poll.
+        """
+        rows = self._connection().execute(
+            f"SELECT id, change, at, {LESSON_COLUMNS} FROM changes "
+            "WHERE group_name = ? AND at > ? ORDER BY at, id",
+            (group, since),
+        ).fetchall()
+        return [LessonChange(row["id"], row["lesson_key"], row["change"], row["at"], _lesson_from_row(row)) for row in rows]
+
+
+snapshot_store: SnapshotStore | None = SnapshotStore(SNAPSHOT_DB_PATH) if SNAPSHOT_STORE_ENABLED else None
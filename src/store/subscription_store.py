@@ -0,0 +1,137 @@
+import time
+
+from src.config import SUBSCRIPTIONS_DB_PATH
+from src.store.database import SqliteDatabase
+
+SUBSCRIPTION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+    user_id TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (user_id, group_name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS subscriptions_by_group ON subscriptions (group_name);
+CREATE TABLE IF NOT EXISTS sync_state (
+    user_id TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (user_id, group_name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS calendars (
+    user_id TEXT NOT NULL,
+    group_name TEXT NOT NULL,
+    calendar_id TEXT NOT NULL,
+    PRIMARY KEY (user_id, group_name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS accounts (
+    user_id TEXT PRIMARY KEY,
+    google_account TEXT NOT NULL,
+    bound_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class SubscriptionStore(SqliteDatabase):
+    """Which users' calendars follow which groups, their calendar ids, what each was last synced with,
+    and the Google account each user id belongs to."""
+
+    SCHEMA = SUBSCRIPTION_SCHEMA
+
+    def subscribe(self, user_id: str, group: str) -> bool:
+        """Subscribe ``user_id`` to ``group``; False if the subscription already existed."""
+        with self._write_lock, self._connection() as connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO subscriptions (user_id, group_name, created_at) VALUES (?, ?, ?)",
+                (user_id, group, time.time()),
+            )
+            return cursor.rowcount > 0
+
+    def unsubscribe(self, user_id: str, group: str) -> bool:
+        with self._write_lock, self._connection() as connection:
+            cursor = connection.execute(
+                "DELETE FROM subscriptions WHERE user_id = ? AND group_name = ?", (user_id, group)
+            )
+            connection.execute("DELETE FROM sync_state WHERE user_id = ? AND group_name = ?", (user_id, group))
+            return cursor.rowcount > 0
+
+    def groups(self, user_id: str | None = None) -> list[str]:
+        """Groups of one user, or every group with at least one subscriber."""
+        if user_id is None:
+            rows = self._connection().execute("SELECT DISTINCT group_name FROM subscriptions ORDER BY group_name")
+        else:
+            rows = self._connection().execute(
+                "SELECT group_name FROM subscriptions WHERE user_id = ? ORDER BY group_name", (user_id,)
+            )
+        return [row["group_name"] for row in rows]
+
+    def subscribers(self, group: str) -> list[str]:
+        rows = self._connection().execute(
+            "SELECT user_id FROM subscriptions WHERE group_name = ? ORDER BY user_id", (group,)
+        )
+        return [row["user_id"] for row in rows]
+
+    def synced_hash(self, user_id: str, group: str) -> str | None:
+        row = self._connection().execute(
+            "SELECT content_hash FROM sync_state WHERE user_id = ? AND group_name = ?", (user_id, group)
+        ).fetchone()
+        return row["content_hash"] if row else None
+
+    def mark_synced(self, user_id: str, group: str, content_hash: str) -> None:
+        with self._write_lock, self._connection() as connection:
+            connection.execute(
+                "INSERT INTO sync_state (user_id, group_name, content_hash, synced_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (user_id, group_name) DO UPDATE SET "
+                "content_hash = excluded.content_hash, synced_at = excluded.synced_at",
+                (user_id, group, content_hash, time.time()),
+            )
+
+    def forget_synced(self, user_id: str, group: str | None = None) -> None:
+        """Make the calendars of ``user_id`` (all, or just the one of ``group``) sync again on the next run."""
+        with self._write_lock, self._connection() as connection:
+            if group is None:
+                connection.execute("DELETE FROM sync_state WHERE user_id = ?", (user_id,))
+            else:
+                connection.execute("DELETE FROM sync_state WHERE user_id = ? AND group_name = ?", (user_id, group))
+
+    def calendar_id(self, user_id: str, group: str) -> str | None:
+        row = self._connection().execute(
+            "SELECT calendar_id FROM calendars WHERE user_id = ? AND group_name = ?", (user_id, group)
+        ).fetchone()
+        return row["calendar_id"] if row else None
+
+    def remember_calendar(self, user_id: str, group: str, calendar_id: str) -> None:
+        with self._write_lock, self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO calendars (user_id, group_name, calendar_id) VALUES (?, ?, ?)",
+                (user_id, group, calendar_id),
+            )
+
+    def forget_calendars(self, user_id: str, group: str | None = None) -> None:
+        """Drop cached calendar ids of ``user_id`` (all, or just the one of ``group``)."""
+        with self._write_lock, self._connection() as connection:
+            if group is None:
+                connection.execute("DELETE FROM calendars WHERE user_id = ?", (user_id,))
+            else:
+                connection.execute("DELETE FROM calendars WHERE user_id = ? AND group_name = ?", (user_id, group))
+
+    def google_account(self, user_id: str) -> str | None:
+        row = self._connection().execute(
+            "SELECT google_account FROM accounts WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return row["google_account"] if row else None
+
+    def bind_account(self, user_id: str, google_account: str) -> None:
+        """Tie ``user_id`` to ``google_account``: only that account may authorize it from now on."""
+        with self._write_lock, self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO accounts (user_id, google_account, bound_at) VALUES (?, ?, ?)",
+                (user_id, google_account, time.time()),
+            )
+
+    def unbind_account(self, user_id: str) -> None:
+        with self._write_lock, self._connection() as connection:
+            connection.execute("DELETE FROM accounts WHERE user_id = ?", (user_id,))
+
+
+subscription_store = SubscriptionStore(SUBSCRIPTIONS_DB_PATH)
@@ -0,0 +1,64 @@
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails fast after ``failure_threshold`` consecutive failures.
+
+    Once open, calls are refused for ``reset_timeout`` seconds. Then a single
+    trial call is let through (half-open): its success closes the circuit,
+    its failure opens it for another ``reset_timeout``. A trial that never
+    reports back is replaced by a new one after ``reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_started: float | None = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed now; each allowed call must end in ``record_success`` or ``record_failure``."""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = HALF_OPEN
+            now = time.monotonic()
+            if self._trial_started is not None and now - self._trial_started < self.reset_timeout:
+                return False
+            self._trial_started = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_started = None
+
+    def record_failure(self) -> bool:
+        """Count a failure and return True if it opened the circuit."""
+        with self._lock:
+            self._failures += 1
+            was_open = self._state == OPEN
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+            self._trial_started = None
+            return self._state == OPEN and not was_open
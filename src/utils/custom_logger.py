@@ -1,12 +1,23 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
 import os
+import queue
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 from logging import Logger
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Any
 
 import pytz
 
-from src.config import TIMEZONE
+from src.config import LOG_DIR, LOG_FORMAT, LOG_QUEUE_SIZE, TIMEZONE
+from src.utils.metrics import log_records_dropped_total
 
 os.environ["FORCE_COLOR"] = "1"
 
@@ -22,8 +33,66 @@ COLORS: dict[str, str] = {
     "RESET": "\033[0m",
 }
 
+CONTEXT_FIELDS: tuple[str, ...] = ("group", "job_id", "user")
+
+_log_context: contextvars.ContextVar[dict[str, str]] = contextvars.ContextVar("log_context", default={})
+
+
+@contextmanager
+def log_context(**fields: str) -> Iterator[None]:
+    """Attach ``fields`` (e.g. ``group``, ``job_id``) to every record logged inside the block."""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def current_log_context() -> dict[str, str]:
+    """The fields set by the enclosing ``log_context`` blocks."""
+    return dict(_log_context.get())
+
+
+class ContextFilter(logging.Filter):
+    """Copies the current log context onto the record in the thread that logged it."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        for name in CONTEXT_FIELDS:
+            setattr(record, name, context.get(name))
+        return True
+
+
+class CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders each wall-clock second once instead of once per record.
+
+    ``tz=None`` formats in the process' local time, like ``logging.Formatter``.
+    """
+
+    def __init__(self, *args: Any, tz: Any = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.tz = tz
+        self._cached_second: int | None = None
+        self._cached_format: str | None = None
+        self._cached_value = ""
+
+    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
+        second = int(record.created)
+        if second != self._cached_second or datefmt != self._cached_format:
+            if self.tz is None:
+                self._cached_value = time.strftime(datefmt or "%Y-%m-%d %H:%M:%S", time.localtime(second))
+            else:
+                self._cached_value = datetime.fromtimestamp(second, self.tz).strftime(datefmt or "%Y-%m-%d %H:%M:%S %Z")
+            self._cached_second = second
+            self._cached_format = datefmt
+        return self._cached_value
+
+
+class ColoredFormatter(CachedTimeFormatter):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        kwargs.setdefault("tz", POLAND_TZ)
+        super().__init__(*args, **kwargs)
 
-class ColoredFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         levelname = record.levelname
         timestamp = self.formatTime(record, self.datefmt)
@@ -34,38 +103,119 @@ class ColoredFormatter(logging.Formatter):
             f"{record.module}:{record.funcName}:{record.lineno} - {message}"
         )
 
-    def formatTime(self, record: logging.LogRecord, datefmt: str | None = None) -> str:
-        dt = datetime.fromtimestamp(record.created, POLAND_TZ)
-        return dt.strftime(datefmt or "%Y-%m-%d %H:%M:%S %Z")
 
+class JsonFormatter(CachedTimeFormatter):
+    """One JSON object per line, carrying the group/job context when set."""
 
-def setup_custom_logger(name: str, log_file: str, level: int = logging.INFO) -> Logger:
-    logger = logging.getLogger(name)
-    logger.setLevel(level)
+    def __init__(self) -> None:
+        super().__init__(datefmt="%Y-%m-%dT%H:%M:%S%z", tz=POLAND_TZ)
 
-    file_formatter = logging.Formatter(
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "time": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.module}:{record.funcName}:{record.lineno}",
+            "message": record.getMessage(),
+        }
+        for name in CONTEXT_FIELDS:
+            value = getattr(record, name, None)
+            if value is not None:
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """``QueueHandler`` that drops records instead of blocking when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self._exception_formatter = logging.Formatter()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments and render the traceback here, but leave layout to the listener's formatters.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or self._exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_records_dropped_total.inc()
+
+
+_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_console_handler = logging.StreamHandler()
+_console_handler.setFormatter(ColoredFormatter(datefmt="%Y-%m-%d %H:%M:%S"))
+_handlers: list[logging.Handler] = [_console_handler]
+_listener: QueueListener | None = None
+_listener_lock = threading.Lock()
+
+
+def _file_formatter() -> logging.Formatter:
+    if LOG_FORMAT == "json":
+        return JsonFormatter()
+    return CachedTimeFormatter(
         "{asctime} {levelname} {module}:{funcName}:{lineno} - {message}",
         datefmt="%Y-%m-%d %H:%M:%S %Z",
         style="{",
     )
+
+
+def _restart_listener() -> None:
+    """(Re)start the single writer thread that drains the queue into every file and console handler."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+        _listener = QueueListener(_queue, *_handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def setup_custom_logger(name: str, log_file: str, level: int = logging.INFO) -> Logger:
+    """Route ``name`` through the shared log queue; the file and console writes happen on the listener thread."""
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    logger.propagate = False
+
     file_handler = RotatingFileHandler(log_file, maxBytes=10 * 1024 * 1024, backupCount=5)
-    file_handler.setFormatter(file_formatter)
+    file_handler.setFormatter(_file_formatter())
     file_handler.setLevel(level)
+    file_handler.addFilter(logging.Filter(name))
+    _handlers.append(file_handler)
 
-    console_formatter = ColoredFormatter(datefmt="%Y-%m-%d %H:%M:%S")
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(console_formatter)
-    console_handler.setLevel(level)
-
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    queue_handler = DroppingQueueHandler(_queue)
+    queue_handler.addFilter(ContextFilter())
+    queue_handler.setLevel(level)
+    logger.addHandler(queue_handler)
 
+    _restart_listener()
     return logger
 
 
-log_dir = "logs"
+log_dir = LOG_DIR
 os.makedirs(log_dir, exist_ok=True)
 
 main_logger: Logger = setup_custom_logger("[Main]", os.path.join(log_dir, "main.log"))
 scheduler_logger: Logger = setup_custom_logger("[Scheduler]", os.path.join(log_dir, "scheduler.log"))
 google_api_logger: Logger = setup_custom_logger("[GoogleAPI]", os.path.join(log_dir, "google_api.log"))
+
+atexit.register(stop_logging)
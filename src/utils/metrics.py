@@ -0,0 +1,225 @@
+"""Minimal Prometheus text-format metrics, kept in-process without a client library.
+
+Values live in the memory of each process: behind gunicorn every worker keeps
+its own counters and histograms, and ``/metrics`` shows those of the worker
+that answered the scrape.
+"""
+
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+LabelValues = tuple[str, ...]
+
+DEFAULT_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def render(self) -> list[str]:
+        """Exposition lines of this metric, its HELP and TYPE header included."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def render(self) -> list[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[LabelValues, tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, totals = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            totals[0] += value
+
+    def mean(self, **labels: str) -> float | None:
+        """Average of the observations so far, or None before the first one."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None:
+                return None
+            counts, totals = series
+            return totals[0] / sum(counts)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self) -> list[str]:
+        with self._lock:
+            series = {key: (list(counts), totals[0]) for key, (counts, totals) in self._series.items()}
+        lines = self.header()
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+MetricT = TypeVar("MetricT", bound=_Metric)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: MetricT) -> MetricT:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_fetch_seconds: Histogram = registry.register(
+    Histogram("wat_http_fetch_seconds", "Latency of single requests to the WAT site.", ("status",))
+)
+scrape_cache_total: Counter = registry.register(
+    Counter("wat_scrape_cache_total", "Scrapes by cache outcome (miss, not_modified, unchanged).", ("result",))
+)
+parse_seconds: Histogram = registry.register(
+    Histogram("wat_parse_seconds", "Time spent parsing the lessons div of one page.")
+)
+lessons_per_page: Histogram = registry.register(
+    Histogram(
+        "wat_lessons_per_page",
+        "Number of lessons parsed from one page.",
+        buckets=(0, 5, 10, 25, 50, 100, 200, 500, 1000),
+    )
+)
+http_circuit_state: Gauge = registry.register(
+    Gauge("wat_http_circuit_state", "Circuit breaker state per host (0 closed, 1 half-open, 2 open).", ("host",))
+)
+http_circuit_rejected_total: Counter = registry.register(
+    Counter("wat_http_circuit_rejected_total", "Requests refused without contacting the host (circuit open).", ("host",))
+)
+calendar_batch_seconds: Histogram = registry.register(
+    Histogram("google_calendar_batch_seconds", "Latency of one Calendar API batch request.")
+)
+google_api_errors_total: Counter = registry.register(
+    Counter("google_api_errors_total", "Calendar API errors by HTTP status code.", ("status",))
+)
+group_stage_seconds: Histogram = registry.register(
+    Histogram("group_stage_seconds", "Duration of a scrape or sync stage for one group.", ("group", "stage"))
+)
+group_job_seconds: Histogram = registry.register(
+    Histogram("group_job_seconds", "End-to-end scrape-and-sync duration per group.", ("group", "outcome"))
+)
+log_records_dropped_total: Counter = registry.register(
+    Counter("log_records_dropped_total", "Log records dropped because the log queue was full.")
+)
+app_startup_seconds: Gauge = registry.register(
+    Gauge("app_startup_seconds", "Time from importing the application to create_app() returning.")
+)
+scheduler_leader: Gauge = registry.register(
+    Gauge("scheduler_leader", "1 if this process holds the scheduler lock and runs the scheduled job.")
+)
+group_poll_interval_seconds: Gauge = registry.register(
+    Gauge("group_poll_interval_seconds", "Current adaptive polling interval per group.", ("group",))
+)
+group_change_rate: Gauge = registry.register(
+    Gauge("group_change_rate", "Moving average of how often a check found the group's plan changed.", ("group",))
+)
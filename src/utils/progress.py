@@ -0,0 +1,82 @@
+import contextvars
+import queue
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from src.models.lesson import Lesson
+from src.utils.custom_logger import current_log_context
+
+ProgressSink = Callable[[dict[str, Any]], None]
+
+_sink: contextvars.ContextVar[ProgressSink | None] = contextvars.ContextVar("progress_sink", default=None)
+
+
+@contextmanager
+def progress_sink(sink: ProgressSink) -> Iterator[None]:
+    """Send the progress events emitted inside the block (and in pools it submits to) to ``sink``."""
+    token = _sink.set(sink)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
+
+
+def progress_enabled() -> bool:
+    return _sink.get() is not None
+
+
+def emit(event: str, **fields: Any) -> None:
+    """Report progress to the current sink, tagged with the group/user log context; a no-op without a sink."""
+    sink = _sink.get()
+    if sink is not None:
+        sink({"event": event, **current_log_context(), **fields})
+
+
+def emit_lessons(lessons: list[Lesson]) -> None:
+    if progress_enabled():
+        for lesson in lessons:
+            emit("lesson", lesson=lesson.to_dict())
+
+
+class ProgressChannel:
+    """Bounded hand-off of progress events from a worker thread to a streaming response.
+
+    A full channel makes the producer wait for the consumer, so memory stays
+    bounded whatever the size of the result. Once the consumer is gone
+    (``close``), events are dropped instead, and the work itself carries on.
+    """
+
+    _END = object()
+
+    def __init__(self, max_size: int) -> None:
+        self._queue: queue.Queue = queue.Queue(maxsize=max_size)
+        self._closed = threading.Event()
+
+    def put(self, event: dict[str, Any]) -> None:
+        self._put(event)
+
+    def finish(self) -> None:
+        self._put(self._END)
+
+    def close(self) -> None:
+        self._closed.set()
+
+    def _put(self, item: Any) -> None:
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=1.0)
+                return
+            except queue.Full:
+                continue
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is self._END:
+                    return
+                yield item
+        finally:
+            self.close()
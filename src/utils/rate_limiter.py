@@ -0,0 +1,26 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """Spaces out acquisitions for the same key by at least ``min_interval`` seconds.
+
+    Slots are reserved under the lock and waited for outside of it, so callers
+    for different keys never block each other.
+    """
+
+    def __init__(self, min_interval: float) -> None:
+        self.min_interval = min_interval
+        self._next_allowed: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> float:
+        """Block until ``key`` may be used again and return the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(key, now))
+            self._next_allowed[key] = slot + self.min_interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,48 @@
+import threading
+from typing import Callable, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call(Generic[T]):
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: T | None = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight(Generic[T]):
+    """Collapses concurrent calls with the same key into one execution.
+
+    The first caller runs ``func``; callers arriving while it runs wait for it
+    and get the same result (or exception). Nothing is kept once it finishes.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _Call[T]] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], T]) -> tuple[T, bool]:
+        """Run ``func`` once per in-flight ``key`` and return ``(result, shared)``."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True  # type: ignore[return-value]
+
+        try:
+            call.result = func()
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
@@ -0,0 +1,36 @@
+import os
+import tempfile
+
+# src.config reads the environment at import time: keep every store, cache and log of the run in a scratch directory.
+_STORAGE = tempfile.mkdtemp(prefix="wat-scheduler-tests-")
+os.environ.setdefault("STORAGE_DIR", _STORAGE)
+os.environ.setdefault("LOG_DIR", os.path.join(_STORAGE, "logs"))
+
+from collections.abc import Iterator  # noqa: E402
+from datetime import date  # noqa: E402
+
+import pytest  # noqa: E402
+
+from benchmarks.bench_parser import FIXTURES_DIR, parse_page_fast  # noqa: E402
+from benchmarks.fake_calendar import FakeCalendarServer  # noqa: E402
+from src.models.lesson import Lesson  # noqa: E402
+
+# The week of planzajec_week.html.
+FIXTURE_WEEK = (date(2024, 11, 11), date(2024, 11, 17))
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.fixture
+def week_lessons() -> list[Lesson]:
+    return parse_page_fast(read_fixture("planzajec_week.html"))
+
+
+@pytest.fixture
+def calendar_server() -> Iterator[FakeCalendarServer]:
+    server = FakeCalendarServer().start()
+    yield server
+    server.stop()
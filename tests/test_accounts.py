@@ -0,0 +1,112 @@
+import json
+from collections.abc import Callable
+
+import pytest
+from flask.testing import FlaskClient
+from google.oauth2.credentials import Credentials
+from werkzeug.test import TestResponse
+
+import src.app
+from src.app import app
+from src.google_api import calendar_service
+from src.google_api.calendar_service import calendar_accounts
+from src.store.subscription_store import subscription_store
+
+
+def _credentials(token: str) -> Credentials:
+    return Credentials(
+        token=token,
+        refresh_token=f"{token}-refresh",
+        client_id="client",
+        client_secret="secret",
+        token_uri="https://oauth2.googleapis.com/token",
+    )
+
+
+class FakeFlow:
+    """The OAuth flow after Google redirected back: the code exchange yields ``credentials``."""
+
+    def __init__(self, credentials: Credentials) -> None:
+        self.credentials = credentials
+
+    def fetch_token(self, **kwargs: object) -> None:
+        pass
+
+
+@pytest.fixture(autouse=True)
+def google(monkeypatch: pytest.MonkeyPatch) -> None:
+    # Each fake token acts for the Google account named before its dash.
+    monkeypatch.setattr(calendar_service, "google_account", lambda creds: f"{creds.token.split('-')[0]}@gmail.com")
+
+
+Authorize = Callable[[str, str], tuple[FlaskClient, TestResponse]]
+
+
+@pytest.fixture
+def authorize(monkeypatch: pytest.MonkeyPatch) -> Authorize:
+    """Run the OAuth callback for ``user_id`` with a token of ``google_user``, in a fresh browser session."""
+
+    def run(user_id: str, google_user: str) -> tuple[FlaskClient, TestResponse]:
+        client = app.test_client()
+        monkeypatch.setattr(src.app, "_oauth_flow", lambda **kwargs: FakeFlow(_credentials(f"{google_user}-{user_id}")))
+        with client.session_transaction() as session:
+            session["oauth_user"] = user_id
+        return client, client.get("/oauth2callback?state=s&code=c")
+
+    return run
+
+
+def _stored_token(user_id: str) -> str:
+    with open(calendar_accounts.token_path(user_id)) as f:
+        return json.load(f)["token"]
+
+
+def test_first_login_binds_the_user_id_and_signs_the_session_in(authorize: Authorize) -> None:
+    client, response = authorize("carol", "carol")
+    assert response.status_code == 302
+    assert subscription_store.google_account("carol") == "carol@gmail.com"
+    with client.session_transaction() as session:
+        assert session["user_id"] == "carol"
+
+    assert authorize("carol", "carol")[1].status_code == 302
+
+
+def test_another_google_account_cannot_take_a_user_id_over(authorize: Authorize) -> None:
+    authorize("erin", "erin")
+    intruder, response = authorize("erin", "mallory")
+    assert response.status_code == 403
+    assert _stored_token("erin") == "erin-erin"
+    with intruder.session_transaction() as session:
+        assert "user_id" not in session
+
+
+def test_token_stored_before_binding_keeps_its_owner(authorize: Authorize) -> None:
+    calendar_accounts.manager("dave").save(_credentials("dave-legacy"))
+    assert authorize("dave", "mallory")[1].status_code == 403
+    assert subscription_store.google_account("dave") == "dave@gmail.com"
+    assert _stored_token("dave") == "dave-legacy"
+
+
+def test_subscriptions_only_change_from_the_signed_in_session(authorize: Authorize) -> None:
+    owner, _ = authorize("frank", "frank")
+    intruder, _ = authorize("grace", "grace")
+
+    assert app.test_client().put("/users/frank/subscriptions/G1").status_code == 403
+    assert intruder.put("/users/frank/subscriptions/G1").status_code == 403
+    assert owner.put("/users/frank/subscriptions/G1").status_code == 201
+    assert intruder.delete("/users/frank/subscriptions/G1").status_code == 403
+    assert subscription_store.groups("frank") == ["G1"]
+    assert owner.delete("/users/frank/subscriptions/G1").status_code == 200
+
+
+def test_only_the_owner_deletes_the_token_and_releases_the_user_id(authorize: Authorize) -> None:
+    owner, _ = authorize("heidi", "heidi")
+    intruder, _ = authorize("ivan", "ivan")
+
+    assert intruder.delete("/delete-token?user=heidi").status_code == 403
+    assert calendar_accounts.has_token("heidi")
+    assert owner.delete("/delete-token?user=heidi").status_code == 200
+    assert not calendar_accounts.has_token("heidi")
+    assert subscription_store.google_account("heidi") is None
+
+    assert authorize("heidi", "judy")[1].status_code == 302
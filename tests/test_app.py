@@ -0,0 +1,83 @@
+from collections.abc import Iterator
+
+import pytest
+from flask.testing import FlaskClient
+
+import src.app
+from src.app import app, scheduled_job
+from src.jobs.fanout import GroupResult, RunSummary
+from src.models.lesson import Lesson
+from src.scraper.lesson_parser import NO_LESSONS_ERROR
+from src.store.snapshot_store import SnapshotStore, snapshot_store
+from tests.conftest import FIXTURE_WEEK
+
+
+@pytest.fixture
+def client() -> Iterator[FlaskClient]:
+    with app.test_client() as client:
+        yield client
+
+
+@pytest.fixture
+def stored_group(week_lessons: list[Lesson]) -> str:
+    assert snapshot_store is not None
+    snapshot_store.record("TEST-ICS", week_lessons, FIXTURE_WEEK)
+    return "TEST-ICS"
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["start=2024-13-01&end=2024-11-17", "start=2024-11-11", "start=2024-11-17&end=2024-11-11"],
+)
+def test_scrape_rejects_invalid_ranges(client: FlaskClient, query: str) -> None:
+    response = client.post(f"/scrape/G1?{query}")
+    assert response.status_code == 400
+    assert "Invalid date range" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("query", ["date=2024-11-31", "week=2024-W99", "week=soon"])
+def test_lessons_reject_invalid_days(client: FlaskClient, query: str) -> None:
+    response = client.get(f"/groups/G1/lessons?{query}")
+    assert response.status_code == 400
+
+
+def test_ical_feed_and_revalidation(
+    client: FlaskClient, stored_group: str, monkeypatch: pytest.MonkeyPatch, week_lessons: list[Lesson]
+) -> None:
+    response = client.get(f"/ical/{stored_group}.ics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/calendar"
+    assert response.data.count(b"BEGIN:VEVENT") == len(week_lessons)
+    etag = response.headers["ETag"]
+
+    def no_lessons(*args: object, **kwargs: object) -> None:
+        raise AssertionError("a revalidation must not read the lessons")
+
+    monkeypatch.setattr(SnapshotStore, "lessons", no_lessons)
+    revalidated = client.get(f"/ical/{stored_group}.ics", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    cached = client.get(f"/ical/{stored_group}.ics")
+    assert cached.status_code == 200
+    assert cached.data == response.data
+
+
+def test_scheduled_job_reports_empty_weeks_as_empty_plans(
+    monkeypatch: pytest.MonkeyPatch, week_lessons: list[Lesson]
+) -> None:
+    results = [
+        GroupResult("BREAK", error=NO_LESSONS_ERROR),
+        GroupResult("DOWN", error="Failed to retrieve the page"),
+        GroupResult("STALE", lessons=week_lessons, stale_reason="Failed to retrieve the page"),
+        GroupResult("FRESH", lessons=week_lessons),
+    ]
+    observed = {}
+    monkeypatch.setattr(src.app.poll_planner, "due", lambda groups, limit=None: [result.group for result in results])
+    monkeypatch.setattr(src.app, "run_groups", lambda *args, **kwargs: RunSummary(results=results))
+    monkeypatch.setattr(
+        src.app.poll_planner, "observe", lambda group, lessons, date_range=None: observed.update({group: lessons})
+    )
+
+    scheduled_job()
+
+    assert observed == {"BREAK": [], "DOWN": None, "STALE": None, "FRESH": week_lessons}
@@ -0,0 +1,46 @@
+from benchmarks.fake_calendar import FakeCalendarServer
+from src.google_api.batch_executor import BatchExecutor, is_rate_limited
+from src.google_api.calendar_sync import build_desired_events
+from src.models.lesson import Lesson
+
+
+def _inserts(server: FakeCalendarServer, lessons: list[Lesson]) -> tuple[str, list]:
+    service = server.service()
+    calendar_id = service.calendars().insert(body={"summary": "Test"}).execute()["id"]
+    events = build_desired_events(lessons).values()
+    requests = [(str(i), service.events().insert(calendarId=calendar_id, body=event)) for i, event in enumerate(events)]
+    return calendar_id, requests
+
+
+def test_rate_limited_sub_requests_are_retried(week_lessons: list[Lesson]) -> None:
+    server = FakeCalendarServer(rate_limit_ratio=0.3, seed=7).start()
+    try:
+        calendar_id, requests = _inserts(server, week_lessons)
+        executor = BatchExecutor(server.service(), max_size=8, min_size=1, max_attempts=20, backoff_base=0.0)
+
+        outcome = executor.execute(requests)
+
+        assert not outcome.errors
+        assert len(outcome.responses) == len(requests)
+        assert outcome.retried == server.stats()["rate_limited"] > 0
+        assert len(server.events[calendar_id]) == len(requests)
+        assert executor.size < 8
+    finally:
+        server.stop()
+
+
+def test_gives_up_after_max_attempts(week_lessons: list[Lesson]) -> None:
+    server = FakeCalendarServer(rate_limit_ratio=1.0).start()
+    try:
+        _, requests = _inserts(server, week_lessons[:3])
+        executor = BatchExecutor(server.service(), max_size=8, max_attempts=2, backoff_base=0.0)
+
+        outcome = executor.execute(requests)
+
+        assert not outcome.responses
+        assert sorted(outcome.errors) == ["0", "1", "2"]
+        assert all(is_rate_limited(error) for error in outcome.errors.values())
+        assert outcome.retried == 3
+        assert server.stats()["sub_requests"] == 6
+    finally:
+        server.stop()
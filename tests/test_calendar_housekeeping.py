@@ -0,0 +1,76 @@
+import sys
+
+import pytest
+
+from benchmarks.fake_calendar import FakeCalendarServer
+from src.google_api import calendar_housekeeping
+from src.google_api.calendar_housekeeping import delete_calendars, delete_old_calendars, find_calendar, iter_calendars
+from src.models.lesson import Lesson
+from src.store.subscription_store import subscription_store
+from tests.conftest import FIXTURE_WEEK
+
+# The package re-exports ``main`` under the module's name, so reach the module itself.
+update_google_calendar = sys.modules["src.google_api.update_google_calendar"]
+
+
+def _create(server: FakeCalendarServer, *summaries: str) -> list[str]:
+    calendars = server.service().calendars()
+    return [calendars.insert(body={"summary": summary}).execute()["id"] for summary in summaries]
+
+
+@pytest.fixture
+def small_pages(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(calendar_housekeeping, "CALENDAR_LIST_PAGE_SIZE", 2)
+
+
+@pytest.mark.usefixtures("small_pages")
+def test_calendar_list_is_read_page_by_page(calendar_server: FakeCalendarServer) -> None:
+    ids = _create(calendar_server, *(f"Calendar {i}" for i in range(5)))
+    calendar_server.reset_calls()
+
+    assert [entry["id"] for entry in iter_calendars(calendar_server.service())] == ids
+    assert calendar_server.stats()["calendarList.list"] == 3
+    assert find_calendar(calendar_server.service(), "Calendar 4") == ids[4]
+    assert find_calendar(calendar_server.service(), "Calendar 5") is None
+
+
+@pytest.mark.usefixtures("small_pages")
+def test_legacy_calendars_are_deleted_in_one_batch(calendar_server: FakeCalendarServer) -> None:
+    kept = _create(calendar_server, "WAT-calendar G1", "Personal")
+    _create(calendar_server, *(f"WAT-calendar+{i}" for i in range(5)))
+    calendar_server.reset_calls()
+
+    assert delete_old_calendars(calendar_server.service()) == 5
+
+    stats = calendar_server.stats()
+    assert stats["calendars.delete"] == 5
+    assert stats["batches"] == 1
+    assert sorted(calendar_server.calendars) == sorted(kept)
+
+
+def test_already_missing_calendars_count_as_deleted(calendar_server: FakeCalendarServer) -> None:
+    (calendar_id,) = _create(calendar_server, "WAT-calendar+old")
+    assert delete_calendars(calendar_server.service(), [calendar_id, "gone@group.calendar.fake"]) == 2
+    assert not calendar_server.calendars
+
+
+def test_group_calendar_id_is_cached_and_recreated_when_gone(
+    calendar_server: FakeCalendarServer, week_lessons: list[Lesson]
+) -> None:
+    service = calendar_server.service()
+    first = update_google_calendar.update_calendar_with_schedule(service, week_lessons, "CACHE-1", FIXTURE_WEEK, "kim")
+    assert first is not None and first.inserted == len(week_lessons)
+    calendar_id = subscription_store.calendar_id("kim", "CACHE-1")
+    assert calendar_id in calendar_server.calendars
+
+    calendar_server.reset_calls()
+    again = update_google_calendar.update_calendar_with_schedule(service, week_lessons, "CACHE-1", FIXTURE_WEEK, "kim")
+    assert again is not None and again.unchanged == len(week_lessons)
+    assert "calendarList.list" not in calendar_server.stats()
+
+    service.calendars().delete(calendarId=calendar_id).execute()
+    recreated = update_google_calendar.update_calendar_with_schedule(
+        service, week_lessons, "CACHE-1", FIXTURE_WEEK, "kim"
+    )
+    assert recreated is not None and recreated.inserted == len(week_lessons)
+    assert subscription_store.calendar_id("kim", "CACHE-1") not in (None, calendar_id)
@@ -0,0 +1,90 @@
+from datetime import date
+
+from benchmarks.fake_calendar import FakeCalendarServer
+from src.google_api.calendar_sync import (
+    LESSON_HASH_PROPERTY,
+    LESSON_KEY_PROPERTY,
+    build_desired_events,
+    compute_sync_plan,
+    list_managed_events,
+    schedule_window,
+    sync_events,
+)
+from src.models.lesson import Lesson
+from tests.conftest import FIXTURE_WEEK
+
+
+def _existing(desired: dict) -> dict:
+    """Events as the Calendar API lists them after ``desired`` was synced."""
+    return {key: {"id": f"id-{key}", **event} for key, event in desired.items()}
+
+
+def _new_calendar(server: FakeCalendarServer) -> tuple:
+    service = server.service()
+    calendar_id = service.calendars().insert(body={"summary": "Test"}).execute()["id"]
+    return service, calendar_id
+
+
+def test_plan_of_an_unchanged_schedule_is_empty(week_lessons: list[Lesson]) -> None:
+    desired = build_desired_events(week_lessons)
+    plan = compute_sync_plan(desired, _existing(desired))
+    assert plan.is_empty
+    assert plan.unchanged == len(week_lessons)
+
+
+def test_plan_sends_only_the_delta(week_lessons: list[Lesson]) -> None:
+    existing = _existing(build_desired_events(week_lessons))
+    first, second, *rest = week_lessons
+    moved = Lesson(second.subject, second.day, second.block_id, "moved", "room 42")
+    added = Lesson("New subject", date(2024, 11, 15), "block7", "")
+
+    plan = compute_sync_plan(build_desired_events([moved, *rest, added]), existing)
+
+    assert [event["summary"] for event in plan.inserts] == ["New subject"]
+    assert [(event_id, event["location"]) for event_id, event in plan.patches] == [(f"id-{second.key}", "room 42")]
+    assert plan.deletes == [f"id-{first.key}"]
+    assert plan.unchanged == len(rest)
+
+
+def test_patch_follows_the_content_hash(week_lessons: list[Lesson]) -> None:
+    desired = build_desired_events(week_lessons[:1])
+    existing = _existing(desired)
+    key = next(iter(existing))
+    existing[key]["extendedProperties"] = {"private": {LESSON_KEY_PROPERTY: key, LESSON_HASH_PROPERTY: "outdated"}}
+    plan = compute_sync_plan(desired, existing)
+    assert [event_id for event_id, _ in plan.patches] == [f"id-{key}"]
+
+
+def test_window_covers_first_and_last_day() -> None:
+    time_min, time_max = schedule_window(FIXTURE_WEEK)
+    assert time_min.startswith("2024-11-11T00:00:00")
+    assert time_max.startswith("2024-11-18T00:00:00")
+
+
+def test_sync_deletes_cancelled_lessons_on_the_window_edge(
+    calendar_server: FakeCalendarServer, week_lessons: list[Lesson]
+) -> None:
+    service, calendar_id = _new_calendar(calendar_server)
+    next_monday = Lesson("Next week", date(2024, 11, 18), "block1", "")
+    sync_events(service, calendar_id, [next_monday], (date(2024, 11, 18), date(2024, 11, 24)))
+    assert sync_events(service, calendar_id, week_lessons, FIXTURE_WEEK).inserted == len(week_lessons)
+
+    monday = [lesson for lesson in week_lessons if lesson.day == FIXTURE_WEEK[0]]
+    assert monday
+    result = sync_events(service, calendar_id, [lesson for lesson in week_lessons if lesson not in monday], FIXTURE_WEEK)
+
+    assert result.deleted == len(monday)
+    assert result.unchanged == len(week_lessons) - len(monday)
+    remaining = list_managed_events(service, calendar_id, *schedule_window((date(2024, 11, 1), date(2024, 11, 30))))
+    assert next_monday.key in remaining
+    assert not any(lesson.key in remaining for lesson in monday)
+
+
+def test_sync_of_a_new_calendar_does_not_list_it(
+    calendar_server: FakeCalendarServer, week_lessons: list[Lesson]
+) -> None:
+    service, calendar_id = _new_calendar(calendar_server)
+    calendar_server.reset_calls()
+    result = sync_events(service, calendar_id, week_lessons, FIXTURE_WEEK, new_calendar=True)
+    assert result.inserted == len(week_lessons)
+    assert "events.list" not in calendar_server.stats()
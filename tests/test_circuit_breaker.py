@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils import circuit_breaker
+from src.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(circuit_breaker, "time", SimpleNamespace(monotonic=lambda: clock.now))
+    return clock
+
+
+def test_opens_after_consecutive_failures(clock: SimpleNamespace) -> None:
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.state == CLOSED
+    assert breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_lets_one_trial_through(clock: SimpleNamespace) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_trial_opens_again(clock: SimpleNamespace) -> None:
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    assert breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.now += 29
+    assert not breaker.allow()
+
+
+def test_lost_trial_is_replaced_after_the_timeout(clock: SimpleNamespace) -> None:
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    clock.now += 29
+    assert not breaker.allow()
+    clock.now += 1
+    assert breaker.allow()
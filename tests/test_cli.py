@@ -0,0 +1,86 @@
+import csv
+import json
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+import src.__main__
+from src.__main__ import main
+from src.export import CSV_FIELDS, iter_csv
+from src.jobs.fanout import GroupResult, RunSummary
+from src.models.lesson import Lesson
+
+
+@pytest.mark.parametrize(
+    ("args", "message"),
+    [
+        (["--start", "2024-13-01", "--end", "2024-11-17"], "invalid date '2024-13-01'"),
+        (["--start", "2024-11-11"], "--start and --end must be given together"),
+        (["--start", "2024-11-17", "--end", "2024-11-11"], "--start must not be after --end"),
+    ],
+)
+@pytest.mark.parametrize("command", ["plan", "export"])
+def test_invalid_ranges_are_usage_errors(
+    capsys: pytest.CaptureFixture[str], command: str, args: list[str], message: str
+) -> None:
+    with pytest.raises(SystemExit) as exit_info:
+        main([command, "G1", *args])
+    assert exit_info.value.code == 2
+    err = capsys.readouterr().err
+    assert err.startswith("usage:")
+    assert message in err
+
+
+@pytest.fixture
+def runs(monkeypatch: pytest.MonkeyPatch, week_lessons: list[Lesson]) -> list[dict[str, Any]]:
+    """Replace the scrape with a run in which G1 has the fixture week and DOWN fails; record each call."""
+    calls: list[dict[str, Any]] = []
+
+    def run_groups(groups: list[str], user_agent: str, **kwargs: Any) -> RunSummary:
+        calls.append({"groups": groups, **kwargs})
+        results = [
+            GroupResult(group, lessons=week_lessons) if group != "DOWN" else GroupResult(group, error="unreachable")
+            for group in groups
+        ]
+        return RunSummary(results=results)
+
+    monkeypatch.setattr(src.__main__, "run_groups", run_groups)
+    return calls
+
+
+def test_export_writes_one_csv_per_group(
+    runs: list[dict[str, Any]], tmp_path: Path, capsys: pytest.CaptureFixture[str], week_lessons: list[Lesson]
+) -> None:
+    week = ["--start", "2024-11-11", "--end", "2024-11-17"]
+    assert main(["export", "G1", "--format", "csv", "--output-dir", str(tmp_path), *week]) == 0
+
+    assert runs[0]["groups"] == ["G1"]
+    assert runs[0]["date_range"] == (date(2024, 11, 11), date(2024, 11, 17))
+    path = tmp_path / "G1.csv"
+    assert capsys.readouterr().out.splitlines() == [str(path)]
+    with path.open(encoding="utf-8", newline="") as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == len(week_lessons)
+    assert list(rows[0]) == CSV_FIELDS
+    assert rows[0]["Subject"] == week_lessons[0].subject
+    assert rows[0]["Start Date"] == week_lessons[0].day.strftime("%d/%m/%Y")
+
+
+def test_export_skips_failed_groups_and_exits_1(runs: list[dict[str, Any]], tmp_path: Path) -> None:
+    assert main(["export", "G1", "DOWN", "--output-dir", str(tmp_path)]) == 1
+    assert runs[0]["date_range"] is None
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["G1.json"]
+    assert json.loads((tmp_path / "G1.json").read_text(encoding="utf-8"))[0]["Subject"]
+
+
+def test_export_ics(runs: list[dict[str, Any]], tmp_path: Path, week_lessons: list[Lesson]) -> None:
+    assert main(["export", "G1", "--format", "ics", "--output-dir", str(tmp_path)]) == 0
+    feed = (tmp_path / "G1.ics").read_bytes()
+    assert feed.startswith(b"BEGIN:VCALENDAR")
+    assert feed.count(b"BEGIN:VEVENT") == len(week_lessons)
+
+
+def test_csv_without_lessons_is_only_the_header() -> None:
+    assert "".join(iter_csv([])) == ",".join(CSV_FIELDS) + "\r\n"
@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+import pytest
+
+from src.jobs import fanout
+from src.jobs.fanout import process_group, record_snapshot
+from src.models.lesson import Lesson
+from src.scraper.lesson_parser import NO_LESSONS_ERROR
+from src.scraper.scheduler_scraper import week_window
+from src.store.lesson_index import lesson_index
+
+SCRAPE_ERROR = "Failed to retrieve the page"
+
+
+@pytest.fixture
+def scheduled(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    """Keys the background revalidator was asked to refresh; nothing is actually retried."""
+    keys: list[str] = []
+    monkeypatch.setattr(fanout.revalidator, "schedule", lambda key, refresh: keys.append(key) or True)
+    return keys
+
+
+def _fail_scrape(monkeypatch: pytest.MonkeyPatch, error: str = SCRAPE_ERROR) -> None:
+    monkeypatch.setattr(fanout, "rate_limited_scrape", lambda *args, **kwargs: (None, error, True))
+
+
+def _this_week() -> list[Lesson]:
+    monday, _ = week_window()
+    return [
+        Lesson("Algebra", monday, "block1", "Wyklad"),
+        Lesson("Physics", monday + timedelta(days=2), "block3", "Cwiczenia"),
+    ]
+
+
+def test_failed_scrape_serves_the_last_good_schedule(monkeypatch: pytest.MonkeyPatch, scheduled: list[str]) -> None:
+    lessons = _this_week()
+    record_snapshot("STALE-1", lessons, week_window())
+    _fail_scrape(monkeypatch)
+
+    result = process_group("STALE-1", sync=False)
+
+    assert result.ok and result.stale
+    assert result.stale_reason == SCRAPE_ERROR
+    assert result.lessons == lessons
+    assert not result.changed
+    assert scheduled == ["STALE-1|None|False"]
+
+
+def test_never_scraped_group_keeps_the_error(monkeypatch: pytest.MonkeyPatch, scheduled: list[str]) -> None:
+    _fail_scrape(monkeypatch)
+    result = process_group("STALE-NEVER", sync=False)
+    assert result.error == SCRAPE_ERROR
+    assert not result.stale
+    assert scheduled == []
+
+
+def test_week_without_stored_lessons_keeps_the_error(monkeypatch: pytest.MonkeyPatch, scheduled: list[str]) -> None:
+    monday, _ = week_window()
+    record_snapshot("STALE-EMPTY", [Lesson("Algebra", monday - timedelta(days=7), "block1", "")], week_window())
+    _fail_scrape(monkeypatch)
+    assert process_group("STALE-EMPTY", sync=False).error == SCRAPE_ERROR
+    assert scheduled == []
+
+
+def test_week_without_lessons_is_not_served_stale(monkeypatch: pytest.MonkeyPatch, scheduled: list[str]) -> None:
+    record_snapshot("STALE-BREAK", _this_week(), week_window())
+    _fail_scrape(monkeypatch, NO_LESSONS_ERROR)
+    result = process_group("STALE-BREAK", sync=False)
+    assert result.error == NO_LESSONS_ERROR
+    assert not result.stale
+
+
+def test_store_errors_keep_the_scrape_error(monkeypatch: pytest.MonkeyPatch, scheduled: list[str]) -> None:
+    def broken_store(group: str) -> None:
+        raise OSError(2, "No such file or directory")
+
+    monkeypatch.setattr(lesson_index, "get", broken_store)
+    _fail_scrape(monkeypatch)
+
+    result = process_group("STALE-BROKEN", sync=False)
+
+    assert result.error == SCRAPE_ERROR
+    assert not result.stale
@@ -0,0 +1,102 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+from flask.testing import FlaskClient
+
+from src.app import app
+from src.config import BLOCK_HOURS
+from src.models.lesson import Lesson
+from src.store.lesson_index import LessonIndex, week_range
+from src.store.snapshot_store import SnapshotStore, snapshot_store
+from tests.conftest import FIXTURE_WEEK
+
+T0 = 1_731_300_000.0
+MONDAY, SUNDAY = FIXTURE_WEEK
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> SnapshotStore:
+    return SnapshotStore(str(tmp_path / "schedule.sqlite3"))
+
+
+def test_week_range() -> None:
+    assert week_range("2024-W46") == FIXTURE_WEEK
+    assert week_range("2024-w46") == FIXTURE_WEEK
+    with pytest.raises(ValueError):
+        week_range("2024-W60")
+
+
+def test_lessons_are_filtered_by_range_and_subject(week_lessons: list[Lesson]) -> None:
+    index = LessonIndex(None).refresh("G1", week_lessons)
+    assert index is not None
+
+    assert len(index.lessons()) == len(week_lessons)
+    monday = index.lesson_models(MONDAY, MONDAY)
+    assert len(monday) == 2
+    assert [lesson.block_id for lesson in monday] == sorted(
+        (lesson.block_id for lesson in monday), key=list(BLOCK_HOURS).index
+    )
+    assert index.lessons(date(2024, 11, 18), date(2024, 11, 24)) == []
+
+    subject = week_lessons[0].subject
+    matching = index.lessons(subject=subject.upper())
+    assert matching and all(rendered["Subject"] == subject for rendered in matching)
+
+
+def test_free_blocks_leave_out_busy_blocks(week_lessons: list[Lesson]) -> None:
+    index = LessonIndex(None).refresh("G1", week_lessons)
+    assert index is not None
+
+    busy = {lesson.block_id for lesson in week_lessons if lesson.day == MONDAY}
+    assert index.free_blocks(MONDAY) == [block_id for block_id in BLOCK_HOURS if block_id not in busy]
+    assert index.free_blocks(date(2024, 11, 18)) == list(BLOCK_HOURS)
+
+
+def test_rebuild_reuses_unchanged_days(week_lessons: list[Lesson]) -> None:
+    index = LessonIndex(None)
+    first = index.refresh("G1", week_lessons)
+    assert first is not None
+    assert index.refresh("G1", list(week_lessons)) is first
+
+    dropped = next(lesson for lesson in week_lessons if lesson.day != MONDAY)
+    second = index.refresh("G1", [lesson for lesson in week_lessons if lesson is not dropped])
+    assert second is not None and second is not first
+    assert second.days[MONDAY] is first.days[MONDAY]
+    assert second.days.get(dropped.day) is not first.days[dropped.day]
+
+
+def test_get_follows_the_store(store: SnapshotStore, week_lessons: list[Lesson]) -> None:
+    index = LessonIndex(store)
+    assert index.get("G1") is None
+
+    store.record("G1", week_lessons, FIXTURE_WEEK, now=T0)
+    first = index.get("G1")
+    assert first is not None and len(first.lessons()) == len(week_lessons)
+    assert index.get("G1") is first
+
+    store.record("G1", week_lessons[1:], FIXTURE_WEEK, now=T0 + 60)
+    second = index.get("G1")
+    assert second is not None and len(second.lessons()) == len(week_lessons) - 1
+
+
+def test_free_blocks_route(week_lessons: list[Lesson]) -> None:
+    assert snapshot_store is not None
+    snapshot_store.record("FREE-1", week_lessons, FIXTURE_WEEK, now=T0)
+    client: FlaskClient = app.test_client()
+
+    response = client.get("/groups/FREE-1/free-blocks?week=2024-W46")
+    assert response.status_code == 200
+    days = response.get_json()["days"]
+    assert [day["date"] for day in days][0::6] == [MONDAY.isoformat(), SUNDAY.isoformat()]
+    busy = {lesson.block_id for lesson in week_lessons if lesson.day == MONDAY}
+    assert [free["block"] for free in days[0]["free"]] == [b for b in BLOCK_HOURS if b not in busy]
+    assert days[0]["free"][0]["start"] == BLOCK_HOURS[days[0]["free"][0]["block"]]["START"]
+
+    single = client.get(f"/groups/FREE-1/free-blocks?date={MONDAY.isoformat()}").get_json()
+    assert single["days"] == days[:1]
+
+    cached = client.get("/groups/FREE-1/free-blocks?week=2024-W46", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+    assert client.get("/groups/FREE-1/free-blocks?week=someday").status_code == 400
+    assert client.get("/groups/NEVER-SCRAPED/free-blocks").status_code == 404
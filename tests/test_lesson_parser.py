@@ -0,0 +1,20 @@
+import pytest
+
+from benchmarks.bench_parser import parse_page_soup
+from src.scraper.lesson_parser import NO_LESSONS_ERROR, parse_lessons
+from src.scraper.scheduler_scraper import extract_lessons_html
+from tests.conftest import read_fixture
+
+
+@pytest.mark.parametrize("fixture", ["planzajec_week.html", "planzajec_semester.html"])
+def test_matches_the_beautifulsoup_parser(fixture: str) -> None:
+    html = read_fixture(fixture)
+    lessons, error = parse_lessons(extract_lessons_html(html) or "")
+    assert error is None
+    assert [lesson.to_dict() for lesson in lessons] == parse_page_soup(html)
+
+
+def test_page_without_lessons() -> None:
+    html = read_fixture("planzajec_empty.html")
+    assert parse_page_soup(html) == []
+    assert parse_lessons(extract_lessons_html(html) or "") == (None, NO_LESSONS_ERROR)
@@ -0,0 +1,83 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+from src.jobs.poll_planner import PollPlanner
+from src.models.lesson import Lesson
+from src.store.poll_state_store import PollStateStore
+
+HOUR = 3600.0
+# Tuesday 2023-11-14 in any timezone; the minutes below stay within its ISO week.
+NOW = 1_699_963_200.0
+
+
+@pytest.fixture
+def planner(tmp_path: Path) -> PollPlanner:
+    return PollPlanner(
+        PollStateStore(str(tmp_path / "polling.sqlite3")),
+        min_interval=HOUR,
+        max_interval=16 * HOUR,
+        initial_interval=4 * HOUR,
+        alpha=0.5,
+        jitter=0.0,
+        startup_spread=None,
+        seed=1,
+    )
+
+
+def _plan(version: int) -> list[Lesson]:
+    return [Lesson(f"Subject {version}", date(2023, 11, 14), "block1", "")]
+
+
+def test_interval_spans_min_to_max(planner: PollPlanner) -> None:
+    assert planner.interval_for(0.0) == pytest.approx(16 * HOUR)
+    assert planner.interval_for(1.0) == pytest.approx(HOUR)
+    assert planner.interval_for(planner.rate_for(4 * HOUR)) == pytest.approx(4 * HOUR)
+
+
+def test_new_group_starts_at_the_initial_interval(planner: PollPlanner) -> None:
+    state = planner.state("G1", now=NOW)
+    assert state.interval_seconds == 4 * HOUR
+    assert state.next_run_at == NOW + 4 * HOUR
+    assert planner.due(["G1"], now=NOW) == []
+    assert planner.due(["G1"], now=NOW + 4 * HOUR) == ["G1"]
+
+
+def test_changing_plan_is_polled_more_often(planner: PollPlanner) -> None:
+    intervals = [planner.observe("G1", _plan(version), now=NOW + version * 60).interval_seconds for version in range(5)]
+    assert intervals[0] == pytest.approx(4 * HOUR)
+    assert intervals == sorted(intervals, reverse=True)
+    assert HOUR <= intervals[-1] < 2 * HOUR
+    assert planner.state("G1").changes == 4
+
+
+def test_stable_plan_is_polled_less_often(planner: PollPlanner) -> None:
+    intervals = [planner.observe("G1", _plan(0), now=NOW + minute * 60).interval_seconds for minute in range(5)]
+    assert intervals == sorted(intervals)
+    assert 12 * HOUR < intervals[-1] <= 16 * HOUR
+    assert planner.state("G1").changes == 0
+
+
+def test_failed_scrape_retries_soon_without_touching_the_rate(planner: PollPlanner) -> None:
+    before = planner.observe("G1", _plan(0), now=NOW)
+    state = planner.observe("G1", None, now=NOW + 60)
+    assert state.change_rate == before.change_rate
+    assert state.next_run_at == NOW + 60 + HOUR
+
+
+def test_new_week_is_a_new_baseline(planner: PollPlanner) -> None:
+    before = planner.observe("G1", _plan(0), now=NOW)
+    state = planner.observe("G1", _plan(1), now=NOW + 7 * 24 * HOUR)
+    assert state.changes == 0
+    assert state.change_rate == before.change_rate
+
+
+def test_break_is_polled_less_often(planner: PollPlanner) -> None:
+    planner.observe("G1", _plan(0), now=NOW)
+    states = [planner.observe("G1", [], now=NOW + minute * 60) for minute in range(1, 6)]
+    intervals = [state.interval_seconds for state in states]
+    assert intervals == sorted(intervals)
+    assert intervals[-1] > 12 * HOUR
+    assert states[-1].checks == 6
+    assert states[-1].changes == 1
@@ -0,0 +1,71 @@
+import json
+import threading
+from typing import Any
+
+import pytest
+from flask.testing import FlaskClient
+
+import src.app
+from src.app import app
+from src.jobs.fanout import GroupResult
+from src.models.lesson import Lesson
+from src.utils.progress import ProgressChannel, emit, emit_lessons, progress_enabled, progress_sink
+
+NDJSON = {"Accept": "application/x-ndjson"}
+
+
+def _events(response: Any) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_emit_is_a_no_op_without_a_sink() -> None:
+    assert not progress_enabled()
+    emit("week", lessons=1)
+
+    events: list[dict[str, Any]] = []
+    with progress_sink(events.append):
+        assert progress_enabled()
+        emit("week", lessons=1)
+    emit("week", lessons=2)
+    assert [event["lessons"] for event in events] == [1]
+
+
+def test_closed_channel_drops_events_instead_of_blocking() -> None:
+    channel = ProgressChannel(1)
+    channel.put({"event": "first"})
+    producer = threading.Thread(target=channel.put, args=({"event": "second"},))
+    producer.start()
+    producer.join(timeout=0.2)
+    assert producer.is_alive()
+
+    channel.close()
+    producer.join(timeout=2.0)
+    assert not producer.is_alive()
+
+
+def test_scrape_streams_lessons_then_the_summary(
+    monkeypatch: pytest.MonkeyPatch, week_lessons: list[Lesson]
+) -> None:
+    def process_group(group: str, user_agent: str | None, date_range: Any = None) -> GroupResult:
+        emit_lessons(week_lessons)
+        return GroupResult(group, lessons=week_lessons)
+
+    monkeypatch.setattr(src.app, "process_group", process_group)
+    response = app.test_client().post("/scrape/G1", headers=NDJSON)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    *lessons, done = _events(response)
+    assert [event["event"] for event in lessons] == ["lesson"] * len(week_lessons)
+    assert lessons[0]["lesson"] == week_lessons[0].to_dict()
+    assert done["event"] == "done"
+    # The lessons were streamed already, so the summary only counts them.
+    assert done["result"]["lessons"] == len(week_lessons)
+
+
+def test_failed_scrape_ends_the_stream_with_an_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        src.app, "process_group", lambda group, *args, **kwargs: GroupResult(group, error="Failed to retrieve the page")
+    )
+    events = _events(app.test_client().post("/scrape/G1", headers=NDJSON))
+    assert events == [{"event": "error", "error": "Failed to retrieve the page"}]
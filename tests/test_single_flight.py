@@ -0,0 +1,138 @@
+import threading
+import time
+
+import pytest
+from flask.testing import FlaskClient
+
+import src.app
+from src.app import app
+from src.jobs.fanout import GroupResult
+from src.jobs.job_queue import Job, JobQueue, JobStatus
+from src.utils.single_flight import SingleFlight
+
+
+def _wait(job: Job) -> Job:
+    deadline = time.monotonic() + 5
+    while not job.done and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert job.done
+    return job
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def work() -> int:
+        calls.append(1)
+        release.wait(5)
+        return 42
+
+    results: list[tuple[int, bool]] = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("G1", work))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(calls) == 1
+    assert sorted(results) == [(42, False)] + [(42, True)] * 4
+    assert flight.do("G1", lambda: 7) == (7, False)
+
+
+def test_waiting_callers_get_the_leaders_exception() -> None:
+    flight: SingleFlight[int] = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    errors: list[BaseException] = []
+
+    def fail() -> int:
+        started.set()
+        release.wait(5)
+        raise RuntimeError("site down")
+
+    def call() -> None:
+        try:
+            flight.do("G1", fail)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    time.sleep(0.1)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+
+    assert [str(error) for error in errors] == ["site down", "site down"]
+
+
+def test_queue_merges_in_flight_jobs_and_reuses_fresh_results() -> None:
+    queue = JobQueue(max_workers=2, retention_seconds=600)
+    release = threading.Event()
+    runs = []
+
+    def scrape() -> dict[str, bool]:
+        runs.append(1)
+        release.wait(5)
+        return {"stale": False}
+
+    first, created = queue.submit("scrape", "scrape:G1", scrape, reuse_seconds=60)
+    merged, merged_created = queue.submit("scrape", "scrape:G1", scrape, reuse_seconds=60)
+    assert created and not merged_created
+    assert merged is first
+    release.set()
+    _wait(first)
+
+    reused, reused_created = queue.submit("scrape", "scrape:G1", scrape, reuse_seconds=60)
+    assert reused is first and not reused_created
+    fresh, fresh_created = queue.submit("scrape", "scrape:G1", scrape, reuse_seconds=0)
+    assert fresh_created
+    _wait(fresh)
+    assert len(runs) == 2
+
+
+def test_queue_never_reuses_failed_or_rejected_results() -> None:
+    queue = JobQueue(max_workers=1, retention_seconds=600)
+
+    def fail() -> None:
+        raise RuntimeError("site down")
+
+    failed, _ = queue.submit("scrape", "scrape:G1", fail, reuse_seconds=60)
+    assert _wait(failed).status is JobStatus.FAILED
+    assert queue.submit("scrape", "scrape:G1", lambda: {"stale": False}, reuse_seconds=60)[1]
+
+    stale, _ = queue.submit("scrape", "scrape:G2", lambda: {"stale": True})
+    _wait(stale)
+    _, created = queue.submit(
+        "scrape", "scrape:G2", lambda: {"stale": False}, reuse_seconds=60, reuse_if=lambda result: not result["stale"]
+    )
+    assert created
+
+
+def test_scrape_route_answers_a_fresh_repeat_with_the_finished_job(monkeypatch: pytest.MonkeyPatch) -> None:
+    release = threading.Event()
+    runs = []
+
+    def process_group(group: str, user_agent: str | None = None, **kwargs: object) -> GroupResult:
+        runs.append(group)
+        release.wait(5)
+        return GroupResult(group, lessons=[])
+
+    monkeypatch.setattr(src.app, "process_group", process_group)
+    client: FlaskClient = app.test_client()
+
+    queued = client.post("/scrape/REUSE-1")
+    assert queued.status_code == 202
+    release.set()
+    job = _wait(src.app.job_queue.get(queued.get_json()["id"]))
+
+    repeated = client.post("/scrape/REUSE-1")
+    assert repeated.status_code == 200
+    assert repeated.get_json()["id"] == job.id
+    assert runs == ["REUSE-1"]
@@ -0,0 +1,81 @@
+from datetime import date
+from pathlib import Path
+
+import pytest
+from flask.testing import FlaskClient
+
+from src.app import app
+from src.models.lesson import Lesson
+from src.store.snapshot_store import SnapshotStore, snapshot_store
+from tests.conftest import FIXTURE_WEEK
+
+T0 = 1_731_300_000.0
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> SnapshotStore:
+    return SnapshotStore(str(tmp_path / "schedule.sqlite3"))
+
+
+def _changes(store: SnapshotStore, since: float = 0.0) -> list[tuple[str, str]]:
+    return [(change.change, change.lesson.subject) for change in store.changes("G1", since)]
+
+
+def test_record_tracks_added_updated_and_removed_lessons(store: SnapshotStore, week_lessons: list[Lesson]) -> None:
+    first = store.record("G1", week_lessons, FIXTURE_WEEK, now=T0)
+    assert (first.added, first.updated, first.removed) == (len(week_lessons), 0, 0)
+
+    assert not store.record("G1", week_lessons, FIXTURE_WEEK, now=T0 + 60).changed
+
+    cancelled, moved, *rest = week_lessons
+    moved_to = Lesson(moved.subject, moved.day, moved.block_id, moved.description, "room 42")
+    added = Lesson("Seminar", date(2024, 11, 16), "block2", "")
+    third = store.record("G1", [moved_to, *rest, added], FIXTURE_WEEK, now=T0 + 120)
+
+    assert (third.added, third.updated, third.removed, third.unchanged) == (1, 1, 1, len(rest))
+    assert sorted(_changes(store, since=T0 + 60)) == sorted(
+        [("added", "Seminar"), ("updated", moved.subject), ("removed", cancelled.subject)]
+    )
+    stored = {item.key: item for item in store.lessons("G1")}
+    assert cancelled.key not in stored
+    assert stored[moved.key].lesson.location == "room 42"
+    assert stored[moved.key].first_seen == T0
+    assert store.last_changed("G1") == T0 + 120
+
+
+def test_record_only_touches_its_window(store: SnapshotStore, week_lessons: list[Lesson]) -> None:
+    next_week = Lesson("Next week", date(2024, 11, 18), "block1", "")
+    store.record("G1", [next_week], (date(2024, 11, 18), date(2024, 11, 24)), now=T0)
+    store.record("G1", week_lessons, FIXTURE_WEEK, now=T0 + 60)
+
+    result = store.record("G1", [], FIXTURE_WEEK, now=T0 + 120)
+
+    assert result.removed == len(week_lessons)
+    assert [item.lesson for item in store.lessons("G1")] == [next_week]
+
+
+def test_removed_lesson_that_returns_is_added_again(store: SnapshotStore, week_lessons: list[Lesson]) -> None:
+    store.record("G1", week_lessons, FIXTURE_WEEK, now=T0)
+    store.record("G1", week_lessons[1:], FIXTURE_WEEK, now=T0 + 60)
+    store.record("G1", week_lessons, FIXTURE_WEEK, now=T0 + 120)
+    assert _changes(store, since=T0) == [("removed", week_lessons[0].subject), ("added", week_lessons[0].subject)]
+    assert {item.key: item for item in store.lessons("G1")}[week_lessons[0].key].first_seen == T0 + 120
+
+
+def test_changes_route_pages_with_next_since(week_lessons: list[Lesson]) -> None:
+    assert snapshot_store is not None
+    snapshot_store.record("CHANGES-1", week_lessons, FIXTURE_WEEK, now=T0)
+    snapshot_store.record("CHANGES-1", week_lessons[1:], FIXTURE_WEEK, now=T0 + 60)
+    client: FlaskClient = app.test_client()
+
+    everything = client.get("/schedule/CHANGES-1/changes").get_json()
+    assert len(everything["changes"]) == len(week_lessons) + 1
+    assert everything["next_since"] == T0 + 60
+
+    latest = client.get(f"/schedule/CHANGES-1/changes?since={T0}").get_json()
+    assert [(change["change"], change["key"]) for change in latest["changes"]] == [("removed", week_lessons[0].key)]
+    assert latest["changes"][0]["at"].startswith("2024-11-11T04:41:00")
+
+    caught_up = client.get(f"/schedule/CHANGES-1/changes?since={latest['next_since']}").get_json()
+    assert caught_up["changes"] == []
+    assert client.get("/schedule/CHANGES-1/changes?since=yesterday").status_code == 400